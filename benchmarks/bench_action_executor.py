@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""ActionAgent actions: one after another vs the dependency DAG"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from action_agent import ActionAgent
+
+ROUND_TRIP = 0.1
+WORKFLOWS = 8
+
+
+class SlowStepFunctions:
+    """start_execution that blocks like a real round trip"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def start_execution(self, stateMachineArn, name, input):
+        self.calls += 1
+        time.sleep(ROUND_TRIP)
+        return {'executionArn': f'{stateMachineArn}:{name}'}
+
+
+def make_agent():
+    agent = ActionAgent()
+    agent.stepfunctions = SlowStepFunctions()
+
+    async def approve(action):
+        if action.get('reject'):
+            raise ValueError('approver unavailable')
+        return {'status': 'approved', 'action_type': 'approval_decision'}
+
+    async def notify(action):
+        return {'status': 'sent', 'action_type': 'notification'}
+
+    agent._process_approval = approve
+    agent._send_notification = notify
+    return agent
+
+
+def workflows():
+    return [{'id': f'wf-{i}', 'type': 'workflow_trigger', 'workflow_arn': f'arn:aws:states:wf-{i}',
+             'payload': {'document': i}} for i in range(WORKFLOWS)]
+
+
+async def serial(agent, actions):
+    return [await agent._execute_single_action(action) for action in actions]
+
+
+async def dag(agent, actions):
+    return await agent.executor.run(actions, agent._execute_single_action)
+
+
+def timed(coroutine):
+    start = time.perf_counter()
+    result = asyncio.run(coroutine)
+    return result, time.perf_counter() - start
+
+
+def main():
+    concurrency = make_agent().executor.default_concurrency
+    print(f"📊 {WORKFLOWS} independent workflow triggers, {ROUND_TRIP * 1000:.0f} ms start_execution, "
+          f"{concurrency} per action type in flight")
+    agent = make_agent()
+    _, one_by_one = timed(serial(agent, workflows()))
+    print(f"   one after another  {one_by_one * 1000:6.0f} ms")
+    agent = make_agent()
+    results, parallel = timed(dag(agent, workflows()))
+    print(f"   dependency DAG     {parallel * 1000:6.0f} ms  ({one_by_one / parallel:.1f}x)")
+    assert all(result['status'] == 'triggered' for result in results)
+    assert parallel < one_by_one / 2, "blocking calls must not serialise the DAG"
+
+    # A failed approval skips what waits on it; the unrelated branch still runs
+    actions = [
+        {'id': 'approve', 'type': 'approval_decision', 'reject': True},
+        {'id': 'notify', 'type': 'notification', 'depends_on': ['approve']},
+        {'id': 'archive', 'type': 'workflow_trigger', 'workflow_arn': 'arn:aws:states:archive', 'payload': {}},
+        {'id': 'loop-a', 'type': 'notification', 'depends_on': ['loop-b']},
+        {'id': 'loop-b', 'type': 'notification', 'depends_on': ['loop-a']},
+    ]
+    results, _ = timed(dag(make_agent(), actions))
+    statuses = {action['id']: result['status'] for action, result in zip(actions, results)}
+    print(f"   failure and cycle handling {statuses}")
+    assert statuses == {'approve': 'failed', 'notify': 'skipped', 'archive': 'triggered',
+                        'loop-a': 'skipped', 'loop-b': 'skipped'}
+    print("✅ independent actions overlap; failed dependencies and cycles skip only their dependents")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Audit logging: one put_item per action vs buffered BatchWriteItem"""
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from audit_writer import BATCH_WRITE_LIMIT, AuditLogWriter, AuditWriteError
+
+ROUND_TRIP = 0.01
+RECORDS = 200
+
+
+class StubDynamoDB:
+    """Table put_item and batch_write_item with a fixed round trip
+
+    unprocessed_share of each batch comes back as UnprocessedItems, the way
+    a throttled table answers.
+    """
+
+    def __init__(self, unprocessed_share=0.0, rng=None):
+        self.unprocessed_share = unprocessed_share
+        self.rng = rng or random.Random(10)
+        self.calls = 0
+        self.stored = []
+
+    def Table(self, name):
+        return self
+
+    def put_item(self, Item):
+        self.calls += 1
+        time.sleep(ROUND_TRIP)
+        self.stored.append(Item)
+
+    def batch_write_item(self, RequestItems):
+        self.calls += 1
+        time.sleep(ROUND_TRIP)
+        unprocessed = {}
+        for table, requests in RequestItems.items():
+            assert len(requests) <= BATCH_WRITE_LIMIT
+            for request in requests:
+                if self.rng.random() < self.unprocessed_share:
+                    unprocessed.setdefault(table, []).append(request)
+                else:
+                    self.stored.append(request['PutRequest']['Item'])
+        return {'UnprocessedItems': unprocessed}
+
+
+def record(i):
+    return {'audit_id': f'audit-{i}', 'timestamp': 1700000000 + i, 'action_type': 'notification',
+            'execution_result': {'status': 'sent', 'confidence': 0.93}}
+
+
+async def per_record(dynamodb):
+    """Baseline: _log_action's old put_item per completed action"""
+    table = dynamodb.Table('audit-log')
+    for i in range(RECORDS):
+        await asyncio.to_thread(table.put_item, Item=record(i))
+
+
+async def buffered(dynamodb, **options):
+    writer = AuditLogWriter('audit-log', dynamodb, base_delay=0.001, **options)
+    for i in range(RECORDS):
+        await writer.write(record(i))
+    await writer.close()
+    return writer
+
+
+def timed(coroutine):
+    start = time.perf_counter()
+    result = asyncio.run(coroutine)
+    return result, time.perf_counter() - start
+
+
+def main():
+    print(f"📊 {RECORDS} audit records, {ROUND_TRIP * 1000:.0f} ms per DynamoDB call")
+    stub = StubDynamoDB()
+    _, elapsed = timed(per_record(stub))
+    print(f"   put_item per record  {elapsed * 1000:6.0f} ms  {stub.calls} calls")
+    baseline = elapsed
+
+    stub = StubDynamoDB()
+    writer, elapsed = timed(buffered(stub))
+    print(f"   batched writer       {elapsed * 1000:6.0f} ms  {stub.calls} calls")
+    assert len(stub.stored) == RECORDS and stub.calls == RECORDS // BATCH_WRITE_LIMIT
+    assert elapsed < baseline / 5
+
+    # Throttled batches: unprocessed items are retried until every record lands
+    stub = StubDynamoDB(unprocessed_share=0.3)
+    writer, _ = timed(buffered(stub))
+    assert sorted(item['audit_id'] for item in stub.stored) == sorted(f'audit-{i}' for i in range(RECORDS))
+    print(f"   30% unprocessed      {stub.calls} calls, all {len(stub.stored)} records stored")
+
+    # A table that never accepts anything surfaces an error instead of dropping records
+    try:
+        timed(buffered(StubDynamoDB(unprocessed_share=1.0), max_retries=2))
+    except AuditWriteError as e:
+        print(f"   always unprocessed   raises AuditWriteError ({e})")
+    else:
+        raise AssertionError('unprocessed records must not be dropped silently')
+    print("✅ batched audit writes cut DynamoDB calls and never lose a record silently")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Warm invocations: clients built per agent instance vs the shared registry"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'memory'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+import boto3
+
+from aws_clients import get_aws_clients
+
+REQUESTS = 20
+
+# What each request built before: one set per agent, plus per-call Bedrock clients
+PER_REQUEST_CLIENTS = [
+    ('client', 'bedrock-runtime'), ('client', 'events'),
+    ('client', 'textract'), ('client', 'bedrock-runtime'), ('client', 'comprehend'), ('client', 's3'),
+    ('client', 'bedrock-runtime'), ('client', 'opensearch'), ('resource', 'dynamodb'),
+    ('client', 'lambda'), ('client', 'bedrock-runtime'), ('client', 'stepfunctions'), ('resource', 'dynamodb'),
+    ('resource', 'dynamodb'), ('client', 's3'), ('client', 'opensearch'), ('client', 'bedrock-runtime'),
+]
+
+
+def per_instance():
+    for kind, service in PER_REQUEST_CLIENTS:
+        getattr(boto3, kind)(service)
+
+
+def shared(registry):
+    for kind, service in PER_REQUEST_CLIENTS:
+        getattr(registry, kind)(service)
+
+
+def main():
+    print(f"📊 {REQUESTS} warm requests, {len(PER_REQUEST_CLIENTS)} client lookups each")
+
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        per_instance()
+    baseline = time.perf_counter() - start
+    print(f"   new clients per request   {baseline * 1000 / REQUESTS:7.2f} ms/request")
+
+    registry = get_aws_clients()
+    start = time.perf_counter()
+    for request in range(REQUESTS):
+        registry.start_request()
+        shared(registry)
+        if request == 0:
+            first = registry.request_stats()
+    elapsed = time.perf_counter() - start
+    stats = registry.request_stats()
+    print(f"   shared registry           {elapsed * 1000 / REQUESTS:7.2f} ms/request "
+          f"({first['construction_ms_total']:.1f} ms once on the cold request)")
+    # The registry prices each reuse at its first (cold) construction, so it can only overstate
+    saving = (baseline - elapsed) * 1000 / REQUESTS
+    bound = stats['construction_ms_saved_upper_bound']
+    print(f"   per warm request: {stats['reused']} reuses, measured saving {saving:.1f} ms, "
+          f"registry upper bound {bound:.1f} ms")
+    assert bound >= saving
+    print(f"✅ {stats['clients']} clients shared across {REQUESTS} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Batched Comprehend entity extraction vs one call per chunk, on a stub"""
+import asyncio
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+
+from chunking import ChunkCache, map_bounded
+from entity_extraction import detect_entities_batched, sentence_chunks
+
+CALL_LATENCY = 0.05
+NAME = re.compile(r'\b(?:Acme Holdings|Globex Corporation|Initech)\b')
+
+
+class StubComprehend:
+    """Finds a fixed set of organisation names, sleeping like a real call"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def detect_entities(self, Text, LanguageCode):
+        self.calls += 1
+        time.sleep(CALL_LATENCY)
+        return {'Entities': self._entities(Text)}
+
+    def batch_detect_entities(self, TextList, LanguageCode):
+        self.calls += 1
+        time.sleep(CALL_LATENCY)
+        return {
+            'ResultList': [{'Index': i, 'Entities': self._entities(text)} for i, text in enumerate(TextList)],
+            'ErrorList': []
+        }
+
+    @staticmethod
+    def _entities(text):
+        return [
+            {'Type': 'ORGANIZATION', 'Text': m.group(), 'Score': 0.99,
+             'BeginOffset': m.start(), 'EndOffset': m.end()}
+            for m in NAME.finditer(text)
+        ]
+
+
+def contract_text(clauses):
+    parties = ['Acme Holdings', 'Globex Corporation', 'Initech']
+    return ' '.join(
+        f"Clause {i}. {parties[i % 3]} shall deliver the goods described in schedule {i} "
+        f"within thirty days of the effective date, subject to the terms agreed herein."
+        for i in range(clauses)
+    )
+
+
+async def per_chunk(comprehend, text):
+    chunks = sentence_chunks(text)
+    return await map_bounded(
+        chunks, lambda chunk: asyncio.to_thread(comprehend.detect_entities, Text=chunk.text, LanguageCode='en'), 4
+    )
+
+
+def main():
+    text = contract_text(3000)
+    chunks = sentence_chunks(text)
+    print(f"📊 {len(text)} characters, {len(chunks)} sentence-aligned chunks, "
+          f"{CALL_LATENCY * 1000:.0f} ms per call")
+
+    comprehend = StubComprehend()
+    start = time.perf_counter()
+    asyncio.run(per_chunk(comprehend, text))
+    print(f"   detect_entities per chunk   {comprehend.calls:>4} calls  {time.perf_counter() - start:.2f}s")
+
+    comprehend = StubComprehend()
+    cache = ChunkCache()
+    start = time.perf_counter()
+    entities = asyncio.run(detect_entities_batched(comprehend, text, cache=cache))
+    print(f"   batch_detect_entities       {comprehend.calls:>4} calls  {time.perf_counter() - start:.2f}s")
+
+    assert len(entities) == len(NAME.findall(text))
+    assert all(text[e['BeginOffset']:e['EndOffset']] == e['Text'] for e in entities)
+    print(f"✅ {len(entities)} entities with offsets into the full text")
+
+    comprehend.calls = 0
+    asyncio.run(detect_entities_batched(comprehend, text + ' Initech signs.', cache=cache))
+    print(f"✅ re-run after an edit sent {comprehend.calls} call(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Episodic archive: one S3 object per episode vs gzip JSONL segments with an index"""
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'memory'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from episode_archive import EpisodeArchiveReader, EpisodeArchiveWriter
+
+EPISODES = 2000
+REQUEST_LATENCY = 0.002
+LIST_PAGE = 1000
+
+
+class StubS3:
+    """put/get (with Range) and list_objects_v2 paging over a dict, with per-request latency"""
+
+    def __init__(self):
+        self.objects = {}
+        self.requests = 0
+        # Key suffixes whose next put fails, as an outage would
+        self.failing = set()
+
+    def _request(self):
+        self.requests += 1
+        time.sleep(REQUEST_LATENCY)
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self._request()
+        for suffix in list(self.failing):
+            if Key.endswith(suffix):
+                self.failing.discard(suffix)
+                raise ConnectionError('S3 unavailable')
+        self.objects[Key] = Body if isinstance(Body, bytes) else Body.encode('utf-8')
+
+    def get_object(self, Bucket, Key, Range=None):
+        self._request()
+        data = self.objects[Key]
+        if Range:
+            start, end = map(int, Range[len('bytes='):].split('-'))
+            data = data[start:end + 1]
+        return {'Body': io.BytesIO(data)}
+
+    def get_paginator(self, operation):
+        stub = self
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix):
+                keys = sorted(key for key in stub.objects if key.startswith(Prefix))
+                for start in range(0, len(keys), LIST_PAGE):
+                    stub._request()
+                    yield {'Contents': [{'Key': key} for key in keys[start:start + LIST_PAGE]]}
+
+        return Paginator()
+
+
+def episode(i):
+    return {
+        'id': f'interaction-{i:06d}',
+        'request': f'Review contract {i} for termination clauses and renewal terms',
+        'response': {'summary': 'Standard terms; auto-renews annually', 'risk': random.choice(['low', 'medium'])},
+        'outcome': random.choice(['approved', 'escalated', 'rejected']),
+        'metrics': {'latency_ms': random.randint(200, 4000), 'tokens': random.randint(500, 3000)}
+    }
+
+
+def per_object(s3, episodes):
+    """Baseline: the old one-object-per-interaction layout, and reading it all back"""
+    for record in episodes:
+        s3.put_object(Bucket='archive', Key=f"episodes/{record['id']}.json", Body=json.dumps(record))
+    start = time.perf_counter()
+    read = 0
+    for page in s3.get_paginator('list_objects_v2').paginate(Bucket='archive', Prefix='episodes/'):
+        for entry in page['Contents']:
+            json.loads(s3.get_object(Bucket='archive', Key=entry['Key'])['Body'].read())
+            read += 1
+    return read, time.perf_counter() - start
+
+
+async def segmented(s3, episodes):
+    writer = EpisodeArchiveWriter(s3, 'archive', max_bytes=8 * 1024)
+    locations = {}
+    for record in episodes:
+        locations[record['id']] = await writer.append(record)
+    await writer.flush()
+
+    reader = EpisodeArchiveReader(s3, 'archive')
+    start = time.perf_counter()
+    read = 0
+    async for _ in reader.iter_segments():
+        read += 1
+    bulk = time.perf_counter() - start
+
+    target = episodes[EPISODES // 2]
+    await reader.get(locations[target['id']], target['id'])  # loads and caches the segment's index
+    before = s3.requests
+    assert await reader.get(locations[target['id']], target['id']) == target
+    return read, bulk, s3.requests - before
+
+
+async def failed_upload(episodes):
+    """A failed put keeps the segment, and the next flush uploads it whole"""
+    s3 = StubS3()
+    writer = EpisodeArchiveWriter(s3, 'archive')
+    for record in episodes[:10]:
+        segment_key = await writer.append(record)
+    # The segment body goes up but its index put fails
+    s3.failing.add('.index.json')
+    try:
+        await writer.flush()
+    except ConnectionError:
+        pass
+    else:
+        raise AssertionError('expected the upload to fail')
+    assert writer.uploaded == []
+    assert await writer.flush() == segment_key and writer.uploaded == [segment_key]
+    return await EpisodeArchiveReader(s3, 'archive').get(segment_key, episodes[3]['id'])
+
+
+def main():
+    random.seed(18)
+    episodes = [episode(i) for i in range(EPISODES)]
+    print(f"📊 {EPISODES} episodes, {REQUEST_LATENCY * 1000:.0f} ms per S3 request")
+
+    s3 = StubS3()
+    read, elapsed = per_object(s3, episodes)
+    size = sum(len(body) for body in s3.objects.values())
+    print(f"   object per episode  {len(s3.objects):5d} objects  {size / 1024:7.0f} KB  read all {elapsed:5.2f}s")
+
+    s3 = StubS3()
+    read, elapsed, point_requests = asyncio.run(segmented(s3, episodes))
+    assert read == EPISODES
+    size = sum(len(body) for key, body in s3.objects.items() if key.endswith('.jsonl.gz'))
+    print(f"   gzip segments       {len(s3.objects):5d} objects  {size / 1024:7.0f} KB  read all {elapsed:5.2f}s")
+    print(f"✅ a single episode reads back with {point_requests} ranged GET once its index is cached")
+
+    assert asyncio.run(failed_upload(episodes)) == episodes[3]
+    print("✅ a failed upload keeps the sealed segment and the next flush uploads it")
+
+
+if __name__ == "__main__":
+    main()
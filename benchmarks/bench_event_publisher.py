@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Task fan-out: one PutEvents call per task vs batched publishing"""
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from event_publisher import PUT_EVENTS_MAX_BYTES, EventPublisher, entry_size
+
+ROUND_TRIP = 0.02
+FAN_OUT = 12
+
+
+class StubEventBridge:
+    """put_events with a fixed round trip and a share of throttled entries"""
+
+    def __init__(self, failure_rate=0.0):
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.delivered = []
+
+    def put_events(self, Entries):
+        assert len(Entries) <= 10
+        assert sum(entry_size(entry) for entry in Entries) <= PUT_EVENTS_MAX_BYTES
+        self.calls += 1
+        time.sleep(ROUND_TRIP)
+        results = []
+        for entry in Entries:
+            if random.random() < self.failure_rate:
+                results.append({'ErrorCode': 'ThrottlingException', 'ErrorMessage': 'Rate exceeded'})
+            else:
+                self.delivered.append(json.loads(entry['Detail'])['task_id'])
+                results.append({'EventId': f'event-{len(self.delivered)}'})
+        failed = sum(1 for result in results if 'ErrorCode' in result)
+        return {'FailedEntryCount': failed, 'Entries': results}
+
+
+def task_entry(i, padding=0):
+    return {
+        'Source': 'supervisor-agent',
+        'DetailType': 'Task Assignment',
+        'Detail': json.dumps({'task_id': f'task-{i}', 'agent': 'analysis-agent', 'payload': 'x' * padding})
+    }
+
+
+async def per_task(stub, entries):
+    """Baseline: each delegation sends its own single-entry call"""
+    await asyncio.gather(*(asyncio.to_thread(stub.put_events, Entries=[entry]) for entry in entries))
+
+
+async def batched(stub, entries):
+    await EventPublisher(stub, base_delay=0.001).publish_many(entries)
+
+
+async def abandoned(publisher):
+    """An invocation that ends with a publish still lingering, leaving its timer behind"""
+    asyncio.get_running_loop().create_task(publisher.publish(task_entry(0)))
+    await asyncio.sleep(0)
+
+
+async def warm(publisher):
+    """The next invocation on a fresh loop must still flush on its own timer"""
+    return await asyncio.wait_for(publisher.publish_many([task_entry(1), task_entry(2)]), timeout=1)
+
+
+def timed(coroutine):
+    start = time.perf_counter()
+    asyncio.run(coroutine)
+    return time.perf_counter() - start
+
+
+def main():
+    random.seed(13)
+    entries = [task_entry(i) for i in range(FAN_OUT)]
+    print(f"📊 Fan-out of {FAN_OUT} tasks, {ROUND_TRIP * 1000:.0f} ms per PutEvents round trip")
+
+    stub = StubEventBridge()
+    elapsed = timed(per_task(stub, entries))
+    print(f"   one call per task   {elapsed * 1000:6.1f} ms  {stub.calls} calls")
+    stub = StubEventBridge()
+    elapsed = timed(batched(stub, entries))
+    print(f"   batched publisher   {elapsed * 1000:6.1f} ms  {stub.calls} calls")
+
+    # Large payloads split on the 256 KB limit, not just the 10 entry limit
+    stub = StubEventBridge()
+    large = [task_entry(i, padding=60 * 1024) for i in range(FAN_OUT)]
+    timed(batched(stub, large))
+    print(f"   60 KB payloads      {stub.calls} calls for {FAN_OUT} entries")
+
+    # Throttled entries are retried alone; accepted ones are never resent
+    stub = StubEventBridge(failure_rate=0.2)
+    many = [task_entry(i) for i in range(200)]
+    timed(batched(stub, many))
+    assert sorted(stub.delivered) == sorted(f'task-{i}' for i in range(200))
+    print(f"✅ 200 entries at 20% throttling delivered exactly once in {stub.calls} calls")
+
+    # The process-wide publisher outlives each invocation's event loop
+    stub = StubEventBridge()
+    publisher = EventPublisher(stub, base_delay=0.001)
+    asyncio.run(abandoned(publisher))
+    assert len(asyncio.run(warm(publisher))) == 2
+    print("✅ a warm invocation on a new event loop flushes on its own linger timer")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Analysis hot path: separate reasoning/compliance/insights calls vs one fused call with fallback"""
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from analysis_agent import AnalysisAgent
+from model_router import ModelRouter
+from model_streaming import message, message_text
+
+DOCUMENTS = 40
+ROUND_TRIP = 0.05
+# Share of fused replies with one malformed section
+MALFORMED_SHARE = 0.15
+
+REASONING = {'key_information': ['Vendor Acme', 'Total $12,400'], 'reasoning_chain': ['Totals reconcile'],
+             'completeness': 'complete', 'business_implications': ['Payable within 30 days'],
+             'risks': ['Missing PO reference']}
+COMPLIANCE = {'compliant': False, 'violations': ['Missing PO reference']}
+INSIGHTS = [{'insight': 'Acme invoices trend up', 'recommendation': 'Review rate card'}]
+
+
+class StubModel:
+    """Answers every prompt after ROUND_TRIP; fused replies are sometimes malformed"""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.calls = 0
+
+    async def _reply(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(ROUND_TRIP)
+        if 'in one response' not in prompt:
+            return message(json.dumps({'text': 'separate reply'}), 'end_turn')
+        fused = {'reasoning': REASONING, 'compliance': COMPLIANCE, 'insights': INSIGHTS}
+        if self.rng.random() < MALFORMED_SHARE:
+            broken = self.rng.choice(list(fused))
+            fused[broken] = {'compliant': 'maybe'} if broken == 'compliance' else 'unparseable'
+        return message('```json\n' + json.dumps(fused) + '\n```', 'end_turn')
+
+    async def invoke(self, model_id, body, cache_kind=None):
+        return await self._reply(body['messages'][0]['content'])
+
+    async def invoke_stream(self, model_id, body, stop=None, on_text=None, cache_kind=None):
+        return await self._reply(body['messages'][0]['content'])
+
+
+def make_agent(fused, model):
+    agent = AnalysisAgent(fused=fused)
+    agent.router = ModelRouter(model)
+
+    async def context(data):
+        return {'similar_documents': [], 'historical_patterns': {'approval_rate': 0.91}}
+
+    async def insights(analysis, compliance):
+        # The separate insights step is a model call of its own
+        return await model.invoke('model', {'messages': [{'role': 'user', 'content': 'insights'}]})
+
+    async def store(data, analysis, insights):
+        return None
+
+    agent._retrieve_context = context
+    agent._generate_insights = insights
+    agent._store_analysis_memory = store
+    agent._parse_reasoning_response = message_text
+    agent._parse_compliance_response = message_text
+    agent._calculate_confidence = lambda analysis: 1.0
+    return agent
+
+
+async def run(fused):
+    model = StubModel(random.Random(23))
+    agent = make_agent(fused, model)
+    data = {'document_type': 'invoice', 'extracted_text': 'INVOICE #1042 Acme Holdings total $12,400',
+            'entities': [{'Type': 'ORGANIZATION', 'Text': 'Acme Holdings', 'Score': 0.99}]}
+    latencies = []
+    reported = Counter()
+    for _ in range(DOCUMENTS):
+        start = time.perf_counter()
+        result = await agent.analyze_document(data)
+        latencies.append(time.perf_counter() - start)
+        reported.update(result.get('fused_fallbacks', {}).keys())
+    # Each result names its own fallbacks, and the agent's counter adds them up
+    assert reported == agent.fused_fallbacks
+    return model.calls, latencies, agent.fused_fallbacks
+
+
+def main():
+    print(f"📊 {DOCUMENTS} documents, {ROUND_TRIP * 1000:.0f} ms per model call, "
+          f"{MALFORMED_SHARE:.0%} of fused replies with a malformed section")
+    for name, fused in (('separate calls', False), ('fused + fallback', True)):
+        calls, latencies, fallbacks = asyncio.run(run(fused))
+        print(f"   {name:17} {calls / DOCUMENTS:4.2f} calls/doc  p50 {statistics.median(latencies) * 1000:5.0f} ms  "
+              f"max {max(latencies) * 1000:5.0f} ms  fallbacks {dict(fallbacks)}")
+        if fused:
+            assert calls == DOCUMENTS + sum(fallbacks.values())
+    print("✅ fused mode makes one call per document and redoes only the malformed section")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Document classification: Bedrock for every document vs the local fast path with fallback"""
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from document_perception_agent import DocumentPerceptionAgent
+from local_classifier import DOCUMENT_TYPES, LocalClassifier
+from model_router import ModelRouter
+
+TRAIN = 1500
+TEST = 600
+# Share of documents mixing the wording of two types, which the fast path should hand on
+HARD_SHARE = 0.2
+MODEL_LATENCY = 0.02
+
+PHRASES = {
+    'contract': ['this agreement is entered into by and between', 'the parties agree as follows',
+                 'term and termination', 'governing law', 'in witness whereof', 'effective date',
+                 'service level commitments', 'renewal term', 'confidentiality obligations'],
+    'invoice': ['invoice number', 'bill to', 'amount due', 'payment terms net 30', 'unit price',
+                'subtotal', 'tax', 'remit payment to', 'purchase order reference', 'due date'],
+    'report': ['executive summary', 'key findings', 'quarterly results', 'methodology',
+               'recommendations', 'year over year growth', 'appendix', 'figure 3 shows', 'kpi dashboard'],
+    'correspondence': ['dear', 'i am writing to', 'thank you for your letter', 'kind regards',
+                       'please let me know', 'further to our conversation', 'sincerely', 'best wishes'],
+    'legal_document': ['in the matter of', 'plaintiff', 'defendant', 'the court hereby orders',
+                       'pursuant to section', 'affidavit', 'filed with the clerk', 'notice of motion',
+                       'subpoena'],
+}
+FILLER = ['the company', 'acme holdings', 'north region', 'as described below', 'on the date above',
+          'customer account', 'the following items', 'project alpha', 'attached', 'reference 2024']
+
+
+def document(label, rng, mix=None):
+    """A few hundred words drawn from the label's phrases, filler and, for hard ones, another type"""
+    parts = []
+    for _ in range(rng.randint(25, 60)):
+        roll = rng.random()
+        if mix and roll < 0.3:
+            parts.append(rng.choice(PHRASES[mix]))
+        elif roll < (0.6 if mix else 0.4):
+            parts.append(rng.choice(PHRASES[label]))
+        else:
+            parts.append(rng.choice(FILLER))
+    return '. '.join(parts)
+
+
+def fixtures(count, rng):
+    labelled = []
+    for _ in range(count):
+        label = rng.choice(DOCUMENT_TYPES)
+        mix = rng.choice([other for other in DOCUMENT_TYPES if other != label]) if rng.random() < HARD_SHARE else None
+        labelled.append((document(label, rng, mix), label, mix is not None))
+    return labelled
+
+
+class OracleModel:
+    """Model client stand-in that knows the answer but takes MODEL_LATENCY"""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.calls = 0
+
+    async def invoke_stream(self, model_id, body, stop=None, on_text=None, cache_kind=None):
+        self.calls += 1
+        await asyncio.sleep(MODEL_LATENCY)
+        prompt = body['messages'][0]['content']
+        label = next(label for text, label, _ in self.documents if text[:1000] in prompt)
+        return {'content': [{'type': 'text', 'text': label}]}
+
+
+async def classify_all(agent, documents):
+    results = []
+    for text, _, _ in documents:
+        results.append(await agent._classify_document(text))
+    return results
+
+
+def main():
+    rng = random.Random(21)
+    train, test = fixtures(TRAIN, rng), fixtures(TEST, rng)
+    classifier = LocalClassifier()
+    start = time.perf_counter()
+    classifier.fit((text, label) for text, label, _ in train)
+    print(f"📊 {TRAIN} training / {TEST} test documents, {HARD_SHARE:.0%} mixed-type; "
+          f"trained in {time.perf_counter() - start:.1f}s")
+
+    # The saved form is what agents load, so measure that
+    with tempfile.TemporaryDirectory() as directory:
+        classifier.save(directory)
+        classifier = LocalClassifier.load(directory)
+        timings, confident, correct = [], [], 0
+        for text, label, hard in test:
+            start = time.perf_counter()
+            predicted, confidence = classifier.predict(text)
+            timings.append(time.perf_counter() - start)
+            correct += predicted == label
+            if confidence >= classifier.threshold:
+                confident.append((predicted == label, hard))
+
+    timings.sort()
+    print(f"   local predict      p50 {statistics.median(timings) * 1e6:5.0f} µs  "
+          f"p99 {timings[int(0.99 * len(timings))] * 1e6:5.0f} µs  top-1 accuracy {correct / TEST:.1%}")
+    easy = sum(1 for _, hard in confident if not hard)
+    print(f"   above threshold {classifier.threshold:.2f}: {len(confident) / TEST:.1%} of documents "
+          f"({easy / sum(1 for _, _, hard in test if not hard):.1%} of easy ones), "
+          f"accuracy {sum(ok for ok, _ in confident) / len(confident):.1%}")
+
+    agent = DocumentPerceptionAgent()
+    agent._parse_classification = lambda response: response['content'][0]['text']
+    for name, local in (('Bedrock only', LocalClassifier()), ('local + fallback', classifier)):
+        agent.classifier = local
+        agent.router = ModelRouter(OracleModel(test))
+        start = time.perf_counter()
+        results = asyncio.run(classify_all(agent, test))
+        elapsed = time.perf_counter() - start
+        accuracy = sum(label == expected for (label, _), (_, expected, _) in zip(results, test)) / TEST
+        print(f"   {name:18} {elapsed / TEST * 1000:6.2f} ms/doc  {agent.router.client.calls:4d} model calls  "
+              f"accuracy {accuracy:.1%}")
+    assert statistics.median(timings) < 0.001
+    print("✅ the easy majority classifies locally in under a millisecond")
+
+
+if __name__ == "__main__":
+    main()
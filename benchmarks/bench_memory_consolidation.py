@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Memory consolidation: one sequential full scan vs incremental parallel segments"""
+import asyncio
+import json
+import os
+import sys
+import time
+import tracemalloc
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'memory'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+import memory_consolidation
+from memory_consolidation import CheckpointStore, ConsolidationEngine
+
+ITEMS = 40000
+PAGE_ROUND_TRIP = 0.01
+SEGMENTS = 4
+CHANGED = 400
+
+
+class StubTable:
+    """scan with Segment/TotalSegments, Limit paging and the engine's timestamp filter"""
+
+    def __init__(self, items, total_segments=1):
+        self.items = items
+        self.pages = 0
+        self.segments = {}
+        for key in items:
+            self.segments.setdefault(zlib.crc32(key.encode()) % total_segments, []).append(key)
+
+    def scan(self, Segment=0, TotalSegments=1, Limit=1000, ExclusiveStartKey=None, FilterExpression=None,
+             ExpressionAttributeNames=None, ExpressionAttributeValues=None):
+        self.pages += 1
+        time.sleep(PAGE_ROUND_TRIP)
+        # Like DynamoDB, Limit caps items read, before the filter
+        keys = self.segments.get(Segment, []) if TotalSegments > 1 else list(self.items)
+        start = int(ExclusiveStartKey['position']) if ExclusiveStartKey else 0
+        page = keys[start:start + Limit]
+        # Every response is freshly deserialised, as from the wire
+        items = [json.loads(json.dumps(self.items[key])) for key in page]
+        if FilterExpression:
+            attribute = ExpressionAttributeNames['#ts']
+            low, high = ExpressionAttributeValues[':low'], ExpressionAttributeValues[':high']
+            items = [item for item in items if low < item[attribute] <= high]
+        response = {'Items': items}
+        if start + Limit < len(keys):
+            response['LastEvaluatedKey'] = {'position': start + Limit}
+        return response
+
+    # CheckpointStore's view of the same stub
+    def get_item(self, Key):
+        item = self.items.get(Key['checkpoint_id'])
+        return {'Item': item} if item else {}
+
+    def put_item(self, Item):
+        self.items[Item['checkpoint_id']] = Item
+
+
+def full_scan(table):
+    """Baseline: page through the whole table in one segment and hold every item"""
+    items, kwargs = [], {'Limit': 500}
+    while True:
+        page = table.scan(**kwargs)
+        items.extend(page['Items'])
+        if 'LastEvaluatedKey' not in page:
+            return len(items)
+        kwargs['ExclusiveStartKey'] = page['LastEvaluatedKey']
+
+
+async def incremental(engine, table):
+    async def count(items):
+        seen = 0
+        async for _ in items:
+            seen += 1
+        return seen
+
+    return await engine.run('bench', table, 'timestamp', count)
+
+
+def measured(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    old = int(time.time()) - 86400
+    items = {f'item-{i:06d}': {'id': f'item-{i:06d}', 'timestamp': old, 'context': {'notes': 'x' * 200}}
+             for i in range(ITEMS)}
+    table = StubTable(items, SEGMENTS)
+    # Let the bench's changes show up a second later rather than after the skew margin
+    memory_consolidation.CLOCK_SKEW_SECONDS = 0
+    engine = ConsolidationEngine(CheckpointStore(StubTable({})), total_segments=SEGMENTS)
+    print(f"📊 {ITEMS} items, {PAGE_ROUND_TRIP * 1000:.0f} ms per scan page")
+
+    count, elapsed, peak = measured(lambda: full_scan(table))
+    print(f"   sequential full scan       {elapsed:5.2f}s  {count:6d} records  peak {peak / 1e6:6.1f} MB")
+
+    report, elapsed, peak = measured(lambda: asyncio.run(incremental(engine, table)))
+    print(f"   {SEGMENTS} segments, first run     {elapsed:5.2f}s  {report['records']:6d} records  "
+          f"peak {peak / 1e6:6.1f} MB")
+
+    # Later changes land after the checkpoint; the next run handles only those
+    time.sleep(1)
+    changed_at = int(time.time())
+    for i in range(0, ITEMS, ITEMS // CHANGED):
+        items[f'item-{i:06d}']['timestamp'] = changed_at
+    time.sleep(1)
+    report, elapsed, peak = measured(lambda: asyncio.run(incremental(engine, table)))
+    assert report['records'] == CHANGED
+    print(f"   {SEGMENTS} segments, next run      {elapsed:5.2f}s  {report['records']:6d} records  "
+          f"peak {peak / 1e6:6.1f} MB")
+    print("✅ the checkpointed run only handles records changed since the last one")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Show concurrent agent calls overlapping on a stubbed slow Bedrock"""
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from model_client import AsyncModelClient
+from model_router import ModelRouter
+from document_perception_agent import DocumentPerceptionAgent
+from analysis_agent import AnalysisAgent
+
+MODEL_LATENCY = 0.2
+DOCUMENTS = 8
+
+
+class SlowBedrock:
+    """Stand-in for bedrock-runtime that blocks like a real round trip"""
+
+    def invoke_model(self, modelId, body):
+        time.sleep(MODEL_LATENCY)
+        payload = {'content': [{'type': 'text', 'text': 'invoice'}]}
+        return {'body': io.BytesIO(json.dumps(payload).encode())}
+
+    def invoke_model_with_response_stream(self, modelId, body):
+        time.sleep(MODEL_LATENCY)
+        delta = {'type': 'content_block_delta', 'index': 0, 'delta': {'type': 'text_delta', 'text': 'invoice'}}
+        return {'body': Stream([{'chunk': {'bytes': json.dumps(delta).encode()}}])}
+
+
+class Stream(list):
+    """Event stream stand-in: iterable and closeable"""
+
+    def close(self):
+        pass
+
+
+def make_perception_agent(client):
+    agent = DocumentPerceptionAgent()
+    agent.router = ModelRouter(client)
+
+    async def extract(document_path):
+        return {'text': f'Invoice {document_path}', 'tables': [], 'forms': [], 'confidence': 0.99}
+
+    async def entities(text):
+        return []
+
+    agent._extract_document_data = extract
+    agent._extract_entities = entities
+    agent._parse_classification = lambda response: response['content'][0]['text']
+    return agent
+
+
+def make_analysis_agent(client):
+    agent = AnalysisAgent()
+    agent.router = ModelRouter(client)
+
+    async def context(data):
+        return {}
+
+    async def insights(analysis, compliance):
+        return []
+
+    async def store(data, analysis, insights):
+        return None
+
+    agent._retrieve_context = context
+    agent._generate_insights = insights
+    agent._store_analysis_memory = store
+    agent._parse_reasoning_response = lambda response: response['content'][0]
+    agent._parse_compliance_response = lambda response: response['content'][0]
+    agent._calculate_confidence = lambda analysis: 1.0
+    return agent
+
+
+async def run_batch(concurrency):
+    client = AsyncModelClient(bedrock=SlowBedrock(), default_concurrency=concurrency)
+    perception = make_perception_agent(client)
+    analysis = make_analysis_agent(client)
+
+    async def pipeline(i):
+        data = await perception.process_document(f'doc-{i}.pdf')
+        return await analysis.analyze_document(data)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(pipeline(i) for i in range(DOCUMENTS)))
+    return time.perf_counter() - start
+
+
+def main():
+    # Each pipeline makes three model calls: classify, reason, compliance
+    serial_estimate = DOCUMENTS * 3 * MODEL_LATENCY
+    print(f"📊 {DOCUMENTS} documents, {MODEL_LATENCY:.1f}s per model call "
+          f"(serial estimate {serial_estimate:.2f}s)")
+    for concurrency in (1, 4, DOCUMENTS):
+        elapsed = asyncio.run(run_batch(concurrency))
+        print(f"   concurrency={concurrency:<3} {elapsed:.2f}s  "
+              f"({serial_estimate / elapsed:.1f}x vs serial)")
+
+
+if __name__ == "__main__":
+    main()
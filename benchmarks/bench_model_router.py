@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Model routing: every call site on the large model vs latency tiers with escalation"""
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from model_router import TIER_MODELS, ModelRouter, json_reply
+from model_streaming import message, stop_on_label
+from local_classifier import DOCUMENT_TYPES
+
+CALLS = 200
+LATENCY = {TIER_MODELS['fast']: 0.02, TIER_MODELS['large']: 0.08}
+# Share of fast-tier replies that are unusable (no label, bad JSON or unsure)
+FAST_FAILURE_SHARE = 0.08
+
+
+class TieredModel:
+    """Model client stand-in: the fast model answers sooner and is occasionally wrong"""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    async def _reply(self, model_id, prompt):
+        await asyncio.sleep(LATENCY[model_id] * self.rng.uniform(0.8, 1.3))
+        weak = model_id == TIER_MODELS['fast'] and self.rng.random() < FAST_FAILURE_SHARE
+        if 'Classify' in prompt:
+            return message('I cannot tell' if weak else 'invoice', 'end_turn')
+        actions = {'actions': [{'id': 'a1', 'type': 'notification'}], 'confidence': 0.4 if weak else 0.9}
+        return message(json.dumps(actions), 'end_turn')
+
+    async def invoke(self, model_id, body, cache_kind=None):
+        return await self._reply(model_id, body['messages'][0]['content'])
+
+    async def invoke_stream(self, model_id, body, stop=None, on_text=None, cache_kind=None):
+        return await self._reply(model_id, body['messages'][0]['content'])
+
+
+def body(prompt):
+    return {'anthropic_version': 'bedrock-2023-05-31', 'messages': [{'role': 'user', 'content': prompt}]}
+
+
+async def run(router):
+    """Caller-observed latency per call site, escalations included"""
+    has_label = stop_on_label(DOCUMENT_TYPES)
+    observed = {'classification': [], 'actions': []}
+    for _ in range(CALLS):
+        start = time.perf_counter()
+        await router.invoke_stream('classification', body('Classify this document'),
+                                   validate=lambda reply: has_label(reply['content'][0]['text']), stop=has_label)
+        observed['classification'].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        await router.invoke('actions', body('Determine required actions'), validate=json_reply())
+        observed['actions'].append(time.perf_counter() - start)
+    return observed
+
+
+def percentile(samples, share):
+    ordered = sorted(samples)
+    return ordered[int(len(ordered) * share)] * 1000
+
+
+def main():
+    print(f"📊 {CALLS} classification + {CALLS} action-extraction calls; fast {LATENCY[TIER_MODELS['fast']] * 1000:.0f} ms, "
+          f"large {LATENCY[TIER_MODELS['large']] * 1000:.0f} ms, {FAST_FAILURE_SHARE:.0%} fast replies unusable")
+    results = {}
+    for name, models in (('large only', {'large': TIER_MODELS['large']}), ('tiered', TIER_MODELS)):
+        router = ModelRouter(TieredModel(random.Random(24)), models=models)
+        observed = asyncio.run(run(router))
+        for call_site, samples in observed.items():
+            tiers = router.stats()[call_site]
+            escalated = tiers.get('fast', {}).get('escalation_rate', 0.0)
+            print(f"   {name:11} {call_site:15} p50 {percentile(samples, 0.5):5.1f} ms  p95 {percentile(samples, 0.95):5.1f} ms  "
+                  f"calls per tier {json.dumps({tier: row['calls'] for tier, row in tiers.items()})}  "
+                  f"escalated {escalated:.1%}")
+            results[name, call_site] = statistics.median(samples)
+    for call_site in ('classification', 'actions'):
+        assert results['tiered', call_site] < results['large only', call_site]
+    print("✅ fast-tier call sites cut p50 latency; unusable fast replies escalate to the large model")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Prompt context: raw Python reprs vs the compact, budgeted serializer"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from prompt_context import PROMPT_BUDGETS, compact_entities, estimate_tokens, rank_documents, render_context
+
+ENTITY_TYPES = ['PERSON', 'ORGANIZATION', 'DATE', 'QUANTITY', 'LOCATION', 'OTHER']
+NAMES = ['Acme Holdings', 'Jane Smith', '2024-03-01', '$12,400.00', 'Seattle', 'net 30', 'PO-88812',
+         'John Doe', 'Globex Corp', '2024-04-15', '$1,250.00', 'Portland', 'Section 4.2']
+
+
+def entities(rng, count=400):
+    """Comprehend output: every mention separately, with offsets and some low scores"""
+    result = []
+    for i in range(count):
+        text = rng.choice(NAMES)
+        result.append({'Type': ENTITY_TYPES[NAMES.index(text) % len(ENTITY_TYPES)], 'Text': text,
+                       'Score': rng.choice([0.99, 0.97, 0.93, 0.62, 0.41]),
+                       'BeginOffset': i * 40, 'EndOffset': i * 40 + len(text)})
+    return result
+
+
+def similar_documents(rng, count=5):
+    """OpenSearch hits whose source carries the embedding and Textract blocks"""
+    hits = []
+    for i in range(count):
+        blocks = [{'BlockType': 'LINE', 'Id': f'block-{i}-{j}', 'Text': f'Line {j} of invoice {i}',
+                   'Confidence': rng.choice([99.1, 97.5, 55.0]), 'Page': 1,
+                   'Geometry': {'BoundingBox': {'Width': 0.31, 'Height': 0.02, 'Left': 0.1, 'Top': 0.05 * j},
+                                'Polygon': [{'X': 0.1, 'Y': 0.05 * j}, {'X': 0.41, 'Y': 0.05 * j}] * 2}}
+                  for j in range(20)]
+        hits.append({'_id': f'doc-{i % 4}', '_score': rng.random(), '_source': {
+            'document_type': 'invoice', 'summary': f'Invoice {i} from Acme for consulting services',
+            'content_embedding': [rng.random() for _ in range(1536)], 'blocks': blocks
+        }})
+    return hits
+
+
+def analysis(rng, data, context):
+    """An analysis result that, like the parsed model output, repeats its inputs"""
+    return {
+        'analysis': {'key_information': [f'Item {i}: consulting hours at $150.0000/h' for i in range(30)],
+                     'reasoning_chain': ['Identified vendor and totals'] * 10,
+                     'entities': data['entities'],
+                     'supporting_documents': context['similar_documents'],
+                     'risks': ['Late payment penalty of 1.5%', 'Missing PO reference'],
+                     'confidence': 0.87654321},
+        'compliance_status': {'compliant': False, 'violations': ['Missing PO reference'],
+                              'checked_rules': [f'rule-{i}' for i in range(40)]},
+        'insights': [{'insight': 'Vendor invoices trend 12% higher this quarter', 'confidence': 0.8123456}] * 3
+    }
+
+
+def measure(name, raw, render):
+    start = time.perf_counter()
+    compacted = render()
+    elapsed = time.perf_counter() - start
+    before, after = estimate_tokens(raw), estimate_tokens(compacted)
+    print(f"   {name:11} raw {before:7d} tokens  compact {after:5d} tokens  "
+          f"({before / max(after, 1):5.1f}x smaller)  {elapsed * 1000:5.1f} ms")
+    return after
+
+
+def main():
+    rng = random.Random(22)
+    data = {'document_type': 'invoice', 'entities': entities(rng)}
+    context = {'similar_documents': similar_documents(rng),
+               'historical_patterns': {'approval_rate': 0.912345, 'avg_amount': 11873.456789}}
+    results = analysis(rng, data, context)
+    print(f"📊 {len(data['entities'])} entities, {len(context['similar_documents'])} retrieved documents, "
+          f"budgets {PROMPT_BUDGETS}")
+
+    # What the old f-strings interpolated, against what the serializer emits
+    tokens = measure('reasoning', f"Entities: {data['entities']}\nContext: {context}", lambda: render_context({
+        'Entities': compact_entities(data['entities']),
+        'Historical Patterns': context['historical_patterns'],
+        'Similar Documents': rank_documents(context['similar_documents'])
+    }, PROMPT_BUDGETS['reasoning']))
+    assert tokens <= PROMPT_BUDGETS['reasoning']
+    tokens = measure('compliance', f"Analysis: {results['analysis']}",
+                     lambda: render_context({'Analysis': results['analysis']}, PROMPT_BUDGETS['compliance']))
+    assert tokens <= PROMPT_BUDGETS['compliance']
+    tokens = measure('actions', f"Analysis: {results['analysis']}\nCompliance: {results['compliance_status']}\n"
+                                f"Insights: {results['insights']}", lambda: render_context({
+        'Compliance': results['compliance_status'],
+        'Insights': results['insights'],
+        'Analysis': results['analysis']
+    }, PROMPT_BUDGETS['actions']))
+    assert tokens <= PROMPT_BUDGETS['actions']
+
+    grouped = compact_entities(data['entities'])
+    print(f"   entities: {len(data['entities'])} mentions -> {sum(map(len, grouped.values()))} distinct "
+          f"confident values in {len(grouped)} types")
+    print("✅ every call site's context fits its token budget")
+
+
+if __name__ == "__main__":
+    main()
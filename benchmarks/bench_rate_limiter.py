@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Throttled service: uncoordinated per-call backoff vs a shared adaptive token bucket"""
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from botocore.exceptions import ClientError, EndpointConnectionError, ReadTimeoutError
+
+from action_agent import ActionAgent
+from rate_control import RateController, is_throttle
+
+REQUESTS = 2000
+WORKERS = 32
+CAPACITY = 200.0      # calls per second the service admits
+LATENCY = 0.01
+WINDOW = 0.25         # seconds per throughput sample
+
+
+def throttled(operation):
+    return ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}}, operation)
+
+
+class ThrottlingService:
+    """Admits CAPACITY calls per second and rejects the rest straight away"""
+
+    def __init__(self):
+        self.tokens = CAPACITY * WINDOW
+        self.updated = time.monotonic()
+        self.throttled = 0
+        self.completions = []
+
+    async def invoke(self):
+        now = time.monotonic()
+        self.tokens = min(CAPACITY * WINDOW, self.tokens + (now - self.updated) * CAPACITY)
+        self.updated = now
+        if self.tokens < 1:
+            self.throttled += 1
+            await asyncio.sleep(0.002)
+            raise throttled('InvokeModel')
+        self.tokens -= 1
+        await asyncio.sleep(LATENCY)
+        self.completions.append(time.monotonic())
+        return {'ok': True}
+
+
+async def uncoordinated(service, rng, base_delay=0.05, max_delay=2.0):
+    """Every call backs off on its own, as botocore's retries do; nothing slows the others down"""
+    attempt = 0
+    while True:
+        try:
+            return await service.invoke()
+        except ClientError as e:
+            if not is_throttle(e):
+                raise
+            await asyncio.sleep(rng.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+            attempt += 1
+
+
+async def drive(call):
+    queue = asyncio.Queue()
+    for i in range(REQUESTS):
+        queue.put_nowait(i)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            await call()
+
+    await asyncio.gather(*(worker() for _ in range(WORKERS)))
+
+
+def throughput_windows(completions, start):
+    """Completed calls per second in each WINDOW, trailing partial window dropped"""
+    counts = [0] * int((completions[-1] - start) / WINDOW)
+    for at in completions:
+        index = int((at - start) / WINDOW)
+        if index < len(counts):
+            counts[index] += 1
+    return [count / WINDOW for count in counts]
+
+
+async def run(name, make_call):
+    service = ThrottlingService()
+    call = make_call(service)
+    start = time.monotonic()
+    await drive(call)
+    elapsed = time.monotonic() - start
+    windows = throughput_windows(service.completions, start)
+    # The adaptive controller needs its first seconds to climb; compare steady state
+    steady = windows[len(windows) // 3:]
+    print(f"   {name:13} {elapsed:5.2f} s  {REQUESTS / elapsed:6.1f} calls/s  throttled {service.throttled:5d}  "
+          f"({service.throttled / REQUESTS:4.2f}/call)  steady state {statistics.mean(steady):5.1f} calls/s, "
+          f"min {min(steady):5.1f}, stdev {statistics.pstdev(steady):5.1f}")
+    return service.throttled, statistics.mean(steady)
+
+
+class FlakyStepFunctions:
+    """start_execution raising a queued error per call, recording the execution names it sees"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        self.names = []
+
+    def start_execution(self, stateMachineArn, name, input):
+        self.names.append(name)
+        if self.errors:
+            raise self.errors.pop(0)
+        return {'executionArn': f'{stateMachineArn}:{name}'}
+
+
+def trigger(action_id):
+    return {'id': action_id, 'type': 'workflow_trigger', 'workflow_arn': 'arn:aws:states:flow', 'payload': {}}
+
+
+async def retried_action():
+    """Throttles and failed connects are retried; errors the service may have acted on are not"""
+    agent = ActionAgent()
+    agent.action_control = RateController('actions', rate=100.0, base_delay=0.01)
+    failures = [throttled('StartExecution'), throttled('StartExecution')]
+
+    async def notify(action):
+        if failures:
+            raise failures.pop()
+        return {'status': 'sent', 'action_type': 'notification'}
+
+    async def reject(action):
+        raise ValueError('recipient missing')
+
+    agent._send_notification = notify
+    agent._update_data = reject
+    sent = await agent._execute_single_action({'type': 'notification'})
+    failed = await agent._execute_single_action({'type': 'data_update'})
+
+    agent.stepfunctions = FlakyStepFunctions([EndpointConnectionError(endpoint_url='https://states')])
+    reconnected = await agent._execute_single_action(trigger('a1'))
+    reconnect_names = agent.stepfunctions.names
+    agent.stepfunctions = FlakyStepFunctions([ReadTimeoutError(endpoint_url='https://states')])
+    timed_out = await agent._execute_single_action(trigger('a2'))
+    return sent, failed, reconnected, reconnect_names, timed_out, agent.action_control.stats()
+
+
+def main():
+    print(f"📊 {REQUESTS} calls from {WORKERS} workers against a service admitting {CAPACITY:.0f} calls/s "
+          f"({LATENCY * 1000:.0f} ms each)")
+    rng = random.Random(25)
+    storm, _ = asyncio.run(run('uncoordinated', lambda service: lambda: uncoordinated(service, rng)))
+
+    # Climbs CAPACITY / 5 calls/s per second, so the run covers several AIMD cycles
+    controller = RateController('bench', rate=CAPACITY / 2, max_rate=CAPACITY * 4, concurrency=WORKERS,
+                                max_retries=20, base_delay=0.05, increase=CAPACITY / 5)
+    adaptive, steady = asyncio.run(run('adaptive', lambda service: lambda: controller.call(service.invoke)))
+    print(f"   adaptive controller {controller.stats()}")
+    assert adaptive < storm / 4 and steady > CAPACITY * 0.8
+
+    sent, failed, reconnected, names, timed_out, stats = asyncio.run(retried_action())
+    print(f"   action throttled twice -> {sent['status']}; non-transient error -> {failed['status']} "
+          f"after {failed['retry_count']} retries; failed connect -> {reconnected['status']}; "
+          f"read timeout -> {timed_out['status']} after {timed_out['retry_count']} retries; {stats}")
+    assert sent['status'] == 'sent' and failed['status'] == 'failed' and failed['retry_count'] == 0
+    assert reconnected['status'] == 'triggered' and len(names) == 2 and names[0] == names[1]
+    assert timed_out['status'] == 'failed' and timed_out['retry_count'] == 0
+    print("✅ the shared bucket settles near the service's capacity with a fraction of the throttles; "
+          "actions retry only failures the service never acted on, under one execution name")
+
+
+if __name__ == "__main__":
+    main()
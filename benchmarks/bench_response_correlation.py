@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""1,000 concurrent delegations: per-task polling vs one correlated listener"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from event_publisher import EventPublisher
+from response_correlator import LocalEventBus, ResponseCorrelator, SQSResponseSource, TaskTimeoutError
+from supervisor_agent import SupervisorAgent, Task
+
+TASKS = 1000
+MAX_AGENT_LATENCY = 0.5
+POLL_INTERVAL = 0.05
+CONTAINERS = 3
+TASKS_PER_CONTAINER = 50
+
+
+class SharedQueue:
+    """SQS stand-in: a received message stays hidden until deleted or released"""
+
+    def __init__(self):
+        self.visible = deque()
+        self.hidden = {}
+        self.handles = itertools.count()
+        self.lock = threading.Lock()
+
+    def send(self, body):
+        with self.lock:
+            self.visible.append(body)
+
+    def receive_message(self, QueueUrl, MaxNumberOfMessages, WaitTimeSeconds):
+        with self.lock:
+            messages = []
+            while self.visible and len(messages) < MaxNumberOfMessages:
+                handle = str(next(self.handles))
+                self.hidden[handle] = self.visible.popleft()
+                messages.append({'Body': self.hidden[handle], 'ReceiptHandle': handle})
+        if not messages:
+            time.sleep(0.005)
+        return {'Messages': messages}
+
+    def delete_message_batch(self, QueueUrl, Entries):
+        with self.lock:
+            for entry in Entries:
+                del self.hidden[entry['ReceiptHandle']]
+
+    def change_message_visibility_batch(self, QueueUrl, Entries):
+        with self.lock:
+            for entry in Entries:
+                self.visible.append(self.hidden.pop(entry['ReceiptHandle']))
+
+
+async def polling(delays):
+    """Baseline: every task polls result storage until its answer lands"""
+    loop = asyncio.get_running_loop()
+    storage = {}
+    reads = 0
+
+    async def delegate(task_id):
+        nonlocal reads
+        ready_at = loop.time() + delays[task_id]
+        loop.call_at(ready_at, storage.__setitem__, task_id, {'status': 'ok'})
+        while True:
+            reads += 1
+            if task_id in storage:
+                return loop.time() - ready_at
+            await asyncio.sleep(POLL_INTERVAL)
+
+    lateness = await asyncio.gather(*(delegate(f'task-{i}') for i in range(TASKS)))
+    return reads, sum(lateness) / TASKS
+
+
+async def correlated(delays):
+    loop = asyncio.get_running_loop()
+    bus = LocalEventBus()
+    ready = {}
+
+    def assign(task_id):
+        # The agent answers delays[task_id] after the assignment reaches it
+        ready[task_id] = loop.time() + delays[task_id]
+        loop.call_at(ready[task_id], bus.respond, task_id, {'status': 'ok'})
+
+    # put_events runs on a worker thread, so hop back to the loop
+    bus.subscribe('Task Assignment', lambda detail: loop.call_soon_threadsafe(assign, detail['task_id']))
+    agent = SupervisorAgent()
+    agent.publisher = EventPublisher(bus)
+    agent.correlator = ResponseCorrelator(bus)
+    agent._select_agent = lambda task_type: 'analysis-agent'
+
+    async def delegate(task):
+        result = await agent._delegate_task(task)
+        assert result == {'status': 'ok'}
+        return loop.time() - ready[task.id]
+
+    tasks = [Task(f'task-{i}', 'analysis', {'n': i}) for i in range(TASKS)]
+    lateness = await asyncio.gather(*(delegate(task) for task in tasks))
+    assert agent.correlator.outstanding == 0
+    return bus.published, sum(lateness) / TASKS
+
+
+async def timeout_and_cancel():
+    bus = LocalEventBus()
+    correlator = ResponseCorrelator(bus)
+    correlator.expect('silent')
+    try:
+        await correlator.wait_for('silent', timeout=0.05)
+    except TaskTimeoutError:
+        pass
+    else:
+        raise AssertionError('expected a timeout')
+
+    correlator.expect('abandoned')
+    waiter = asyncio.ensure_future(correlator.wait_for('abandoned'))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    bus.respond('abandoned', {'status': 'ok'})
+    correlator.expect('late-listener')
+    bus.respond('late-listener', {'status': 'ok'})
+    await correlator.wait_for('late-listener', timeout=1)
+    return correlator.outstanding, correlator.unmatched, correlator.late
+
+
+async def shared_queue():
+    """Several supervisor containers on one response queue, plus malformed messages"""
+    queue = SharedQueue()
+    correlators = []
+    for _ in range(CONTAINERS):
+        source = SQSResponseSource('shared-queue', wait_seconds=0)
+        source.sqs = queue
+        correlators.append(ResponseCorrelator(source))
+    waits = []
+    for c, correlator in enumerate(correlators):
+        for i in range(TASKS_PER_CONTAINER):
+            correlator.expect(f'c{c}-task-{i}')
+            waits.append(correlator.wait_for(f'c{c}-task-{i}', timeout=2))
+    queue.send('not json')
+    queue.send(json.dumps({'detail': {'status': 'ok'}}))
+    for c in range(CONTAINERS):
+        for i in range(TASKS_PER_CONTAINER):
+            queue.send(json.dumps({'detail': {'task_id': f'c{c}-task-{i}', 'result': {'status': 'ok'}}}))
+    results = await asyncio.gather(*waits)
+    # Let each listener settle its last batch before counting what is left on the queue
+    await asyncio.gather(*(correlator._consumer for correlator in correlators))
+    return results, sum(correlator.malformed for correlator in correlators), len(queue.visible) + len(queue.hidden)
+
+
+def timed(coroutine):
+    start = time.perf_counter()
+    value = asyncio.run(coroutine)
+    return value, time.perf_counter() - start
+
+
+def main():
+    random.seed(3)
+    delays = {f'task-{i}': random.uniform(0, MAX_AGENT_LATENCY) for i in range(TASKS)}
+    print(f"📊 {TASKS} concurrent tasks, agent latency up to {MAX_AGENT_LATENCY * 1000:.0f} ms")
+
+    (reads, lateness), elapsed = timed(polling(delays))
+    print(f"   polling every {POLL_INTERVAL * 1000:.0f} ms   {elapsed:.2f}s  "
+          f"{reads} storage reads, mean delivery lag {lateness * 1000:.1f} ms")
+    (published, lateness), elapsed = timed(correlated(delays))
+    print(f"   correlated listener  {elapsed:.2f}s  "
+          f"{published} events, 1 listener, mean delivery lag {lateness * 1000:.1f} ms")
+
+    (outstanding, unmatched, late), _ = timed(timeout_and_cancel())
+    assert outstanding == 0 and unmatched == 0 and late == 1
+    print("✅ timeouts and cancellations leave no outstanding waiters")
+
+    # Malformed messages are logged and dropped; keep the table readable
+    logging.getLogger('response_correlator').setLevel(logging.ERROR)
+    (results, malformed, left), elapsed = timed(shared_queue())
+    assert all(result == {'status': 'ok'} for result in results) and malformed == 2 and left == 0
+    print(f"✅ {CONTAINERS} containers on one queue: all {len(results)} replies reach their waiter "
+          f"in {elapsed * 1000:.0f} ms, {malformed} malformed messages dropped without stopping the listener")
+
+
+if __name__ == "__main__":
+    main()
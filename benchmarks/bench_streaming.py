@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Model output: blocking invoke_model vs streaming with early stop and section hand-off"""
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from model_client import AsyncModelClient
+from model_router import ModelRouter
+from document_perception_agent import DocumentPerceptionAgent
+from analysis_agent import AnalysisAgent
+from local_classifier import DOCUMENT_TYPES
+from model_streaming import stop_on_label
+
+FIRST_TOKEN = 0.15
+PER_TOKEN = 0.01
+TOKENS_PER_CHUNK = 3
+
+CLASSIFICATION = ("This document is an invoice. It lists line items with quantities and unit prices, "
+                  "a subtotal, tax and a total amount due, together with payment terms of net 30 days "
+                  "and remittance details for the supplier's bank account.")
+STEPS = ('Key information', 'Completeness', 'Business implications', 'Risks')
+
+
+def reasoning(opening, recap=False):
+    """Four reasoning steps opened like opening.format(step), plus an unrequested fifth if recap"""
+    steps = [opening.format(step) + f"{title}: " + ' '.join(
+        f'observation {step}.{i} about the invoice terms and amounts' for i in range(12))
+        for step, title in enumerate(STEPS, 1)]
+    if recap:
+        # The prompt asks for four steps; models often add a recap
+        steps.append(opening.format(5) + 'Summary: ' + ' '.join(f'restated observation {i}' for i in range(60)))
+    return '\n'.join(steps)
+
+
+REASONING = reasoning('{}. ')
+RECAP = reasoning('{}. ', recap=True)
+BOLD_RECAP = reasoning('**{}.** ', recap=True)
+HEADING_RECAP = reasoning('## {}. ', recap=True)
+
+
+def tokens(text):
+    words = text.split(' ')
+    return [word + ' ' for word in words[:-1]] + words[-1:]
+
+
+class StreamingBedrock:
+    """Generates a fixed reply at PER_TOKEN after FIRST_TOKEN; counts tokens generated (billed)"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.generated = 0
+
+    def invoke_model(self, modelId, body):
+        time.sleep(FIRST_TOKEN + PER_TOKEN * len(tokens(self.reply)))
+        self.generated += len(tokens(self.reply))
+        payload = {'content': [{'type': 'text', 'text': self.reply}], 'stop_reason': 'end_turn'}
+        return {'body': io.BytesIO(json.dumps(payload).encode())}
+
+    def invoke_model_with_response_stream(self, modelId, body):
+        time.sleep(FIRST_TOKEN)
+        return {'body': Stream(self, tokens(self.reply))}
+
+
+class Stream:
+    """Yields Anthropic stream events; closing it stops generation"""
+
+    def __init__(self, bedrock, words):
+        self.bedrock = bedrock
+        self.words = words
+        self.closed = False
+
+    def __iter__(self):
+        for start in range(0, len(self.words), TOKENS_PER_CHUNK):
+            if self.closed:
+                return
+            chunk = self.words[start:start + TOKENS_PER_CHUNK]
+            time.sleep(PER_TOKEN * len(chunk))
+            self.bedrock.generated += len(chunk)
+            yield event({'type': 'content_block_delta', 'index': 0,
+                         'delta': {'type': 'text_delta', 'text': ''.join(chunk)}})
+        yield event({'type': 'message_delta', 'delta': {'stop_reason': 'end_turn'}})
+
+    def close(self):
+        self.closed = True
+
+
+def event(chunk):
+    return {'chunk': {'bytes': json.dumps(chunk).encode()}}
+
+
+def perception_agent(bedrock):
+    agent = DocumentPerceptionAgent()
+    agent.router = ModelRouter(AsyncModelClient(bedrock=bedrock))
+    agent._parse_classification = lambda response: response['content'][0]['text']
+    return agent
+
+
+def analysis_agent(bedrock):
+    agent = AnalysisAgent()
+    agent.router = ModelRouter(AsyncModelClient(bedrock=bedrock))
+    agent._parse_reasoning_response = lambda response: response['content'][0]['text']
+    return agent
+
+
+async def blocking(bedrock):
+    """Baseline: the old invoke_model path, nothing usable until the whole body is back"""
+    client = AsyncModelClient(bedrock=bedrock)
+    start = time.perf_counter()
+    await client.invoke('anthropic.claude-3-sonnet-20240229-v1:0', {'messages': [], 'max_tokens': 2000})
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+async def classify(bedrock):
+    agent = perception_agent(bedrock)
+    start = time.perf_counter()
+    label, _ = await agent._classify_document('INVOICE #1042 ...')
+    elapsed = time.perf_counter() - start
+    assert 'invoice' in label and 'remittance' not in label
+    return elapsed, elapsed
+
+
+async def reason(bedrock):
+    agent = analysis_agent(bedrock)
+    arrivals = []
+
+    async def on_section(section):
+        arrivals.append(time.perf_counter())
+
+    data = {'document_type': 'invoice', 'extracted_text': 'INVOICE #1042 ...', 'entities': []}
+    start = time.perf_counter()
+    analysis = await agent._reason_about_content(data, {}, on_section)
+    elapsed = time.perf_counter() - start
+    assert len(arrivals) == 4 and 'Summary' not in analysis
+    return arrivals[0] - start, elapsed
+
+
+def main():
+    print(f"📊 {FIRST_TOKEN * 1000:.0f} ms to first token, {PER_TOKEN * 1000:.0f} ms per output token")
+    for name, reply, run in (('classify, blocking', CLASSIFICATION, blocking),
+                             ('classify, stop at label', CLASSIFICATION, classify),
+                             ('reasoning, blocking', REASONING, blocking),
+                             ('reasoning, sections', REASONING, reason),
+                             ('recap, blocking', RECAP, blocking),
+                             ('recap, stop after step 4', RECAP, reason),
+                             ('**N.** steps, stop', BOLD_RECAP, reason),
+                             ('## N. steps, stop', HEADING_RECAP, reason)):
+        bedrock = StreamingBedrock(reply)
+        first_useful, elapsed = asyncio.run(run(bedrock))
+        print(f"   {name:24} first useful output {first_useful * 1000:6.0f} ms  done {elapsed * 1000:6.0f} ms  "
+              f"{bedrock.generated:4d} output tokens")
+    print("✅ classification stops at the label; reasoning sections arrive while the rest is generated; "
+          "an unrequested fifth step is never generated")
+
+    has_label = stop_on_label(DOCUMENT_TYPES)
+    assert has_label('Invoice') and has_label('Document type: legal_document')
+    assert not has_label('This is not a contract') and not has_label('Hard to say; it mentions an invoice')
+    print("✅ only a label in the answer position ends a classification stream")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Supervisor tasks: sequential delegation vs the dependency/priority scheduler"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from supervisor_agent import Task
+from task_scheduler import TaskScheduler
+
+TASK_LATENCY = 0.05
+AGENTS = {'document_perception': 'document-perception-agent', 'analysis': 'analysis-agent',
+          'action': 'action-agent'}
+
+
+def workflow():
+    """Five documents perceived, each analysed, then one action over all analyses"""
+    tasks = []
+    for i in range(5):
+        tasks.append(Task(f'perceive-{i}', 'document_perception', {'document': i}, priority=i))
+        tasks.append(Task(f'analyse-{i}', 'analysis', {'document': i}, depends_on=[f'perceive-{i}']))
+    tasks.append(Task('act', 'action', {}, depends_on=[f'analyse-{i}' for i in range(5)]))
+    return tasks
+
+
+class Delegation:
+    """Stub agents: every task takes TASK_LATENCY; in-flight count per agent is tracked"""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.started = []
+        self.in_flight = {}
+        self.peak = {}
+
+    async def __call__(self, task):
+        agent = AGENTS[task.type]
+        self.started.append(task.id)
+        self.in_flight[agent] = self.in_flight.get(agent, 0) + 1
+        self.peak[agent] = max(self.peak.get(agent, 0), self.in_flight[agent])
+        await asyncio.sleep(TASK_LATENCY)
+        self.in_flight[agent] -= 1
+        if task.id in self.fail:
+            raise RuntimeError('agent error')
+        return {'status': 'completed', 'task_id': task.id}
+
+
+async def sequential(tasks, delegate):
+    """Baseline: the supervisor's old loop, one delegation at a time"""
+    return [(task, await delegate(task)) for task in tasks]
+
+
+async def scheduled(tasks, delegate, limits=None):
+    scheduler = TaskScheduler(agent_limits=limits)
+    return [pair async for pair in scheduler.run(tasks, delegate, AGENTS.get)]
+
+
+def timed(coroutine):
+    start = time.perf_counter()
+    result = asyncio.run(coroutine)
+    return result, time.perf_counter() - start
+
+
+def main():
+    tasks = workflow()
+    print(f"📊 {len(tasks)} tasks (perceive -> analyse per document, then one action), "
+          f"{TASK_LATENCY * 1000:.0f} ms each")
+    _, baseline = timed(sequential(tasks, Delegation()))
+    print(f"   sequential      {baseline * 1000:5.0f} ms")
+
+    delegate = Delegation()
+    results, elapsed = timed(scheduled(tasks, delegate, limits={'document-perception-agent': 2}))
+    print(f"   scheduler       {elapsed * 1000:5.0f} ms  ({baseline / elapsed:.1f}x)  peak in flight {delegate.peak}")
+    assert elapsed < baseline / 2
+    assert delegate.peak['document-perception-agent'] <= 2
+    # Perception goes out highest priority first while its agent is capped
+    perceptions = [task_id for task_id in delegate.started if task_id.startswith('perceive')]
+    assert perceptions == [f'perceive-{i}' for i in range(4, -1, -1)], perceptions
+    assert results[-1][0].id == 'act'
+
+    # A failed perception skips its analysis and the action, but not the other analyses
+    results, _ = timed(scheduled(tasks, Delegation(fail={'perceive-2'})))
+    statuses = {task.id: result['status'] for task, result in results}
+    assert statuses['perceive-2'] == 'failed' and statuses['analyse-2'] == 'skipped'
+    assert statuses['act'] == 'skipped' and statuses['analyse-0'] == 'completed'
+    print(f"   failure in perceive-2 -> {sum(s == 'skipped' for s in statuses.values())} tasks skipped, "
+          f"{sum(s == 'completed' for s in statuses.values())} completed")
+    print("✅ ready tasks overlap under per-agent limits, by priority, and failures skip only dependents")
+
+
+if __name__ == "__main__":
+    main()
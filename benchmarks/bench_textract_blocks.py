@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Block-graph extraction vs list scanning on synthetic multi-page Textract output"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+
+from textract_blocks import BlockGraph
+from textract_fixtures import synthetic_blocks
+
+
+def find_block(blocks, block_id):
+    return next(block for block in blocks if block['Id'] == block_id)
+
+
+def scan_extract(blocks):
+    """Resolve every relationship by scanning the block list"""
+    text = '\n'.join(block['Text'] for block in blocks if block['BlockType'] == 'LINE')
+    tables = []
+    for table in (block for block in blocks if block['BlockType'] == 'TABLE'):
+        cells = [find_block(blocks, cell_id) for cell_id in table['Relationships'][0]['Ids']]
+        tables.append([
+            ' '.join(find_block(blocks, word_id)['Text'] for word_id in cell['Relationships'][0]['Ids'])
+            for cell in cells
+        ])
+    confidences = [block['Confidence'] for block in blocks if 'Confidence' in block]
+    return text, tables, sum(confidences) / len(confidences)
+
+
+def graph_extract(blocks):
+    graph = BlockGraph(blocks)
+    return graph.text(), graph.tables(), graph.forms(), graph.confidence()
+
+
+def timed(function, blocks):
+    start = time.perf_counter()
+    function(blocks)
+    return time.perf_counter() - start
+
+
+def main():
+    print("📊 Textract extraction, synthetic pages (lines, one table, form fields)")
+    for pages in (5, 20, 50):
+        blocks = synthetic_blocks(pages)
+        print(f"   {pages:>3} pages {len(blocks):>7} blocks  "
+              f"scan {timed(scan_extract, blocks) * 1000:9.1f} ms  "
+              f"graph {timed(graph_extract, blocks) * 1000:7.1f} ms")
+
+    blocks = synthetic_blocks(500)
+    elapsed = timed(graph_extract, blocks)
+    graph = BlockGraph(blocks)
+    print(f"   500 pages {len(blocks):>7} blocks  graph {elapsed * 1000:.1f} ms "
+          f"({len(graph.tables())} tables, {len(graph.forms())} form fields)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Stream a multi-page asynchronous Textract job from a local stub"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from document_perception_agent import DocumentPerceptionAgent
+from textract_blocks import BlockGraph
+from textract_fixtures import LocalTextract, synthetic_blocks
+from textract_jobs import TextractJobError, iter_document_pages, start_analysis
+
+PAGES = 200
+CALL_LATENCY = 0.02
+
+
+async def stream(textract):
+    start = time.perf_counter()
+    first_page_at = None
+    pages = []
+    largest_page = 0
+    job_id = await start_analysis(textract, 'doc-bucket', 'contract.pdf')
+    async for page, graph in iter_document_pages(textract, job_id, poll_interval=0):
+        if first_page_at is None:
+            first_page_at = time.perf_counter() - start
+        pages.append(page)
+        largest_page = max(largest_page, len(graph.blocks))
+    return pages, largest_page, first_page_at, time.perf_counter() - start
+
+
+async def failed_job():
+    textract = LocalTextract(pages=1, fail=True)
+    job_id = await start_analysis(textract, 'doc-bucket', 'broken.pdf')
+    try:
+        async for _ in iter_document_pages(textract, job_id, poll_interval=0):
+            pass
+    except TextractJobError as e:
+        return str(e)
+    return None
+
+
+async def agent_merge():
+    agent = DocumentPerceptionAgent()
+    agent.textract = LocalTextract(pages=5)
+    streamed = await agent._extract_document_data('contract.pdf')
+    single = BlockGraph(synthetic_blocks(5))
+    return streamed['text'] == single.text() and streamed['tables'] == single.tables() \
+        and streamed['forms'] == single.forms() and abs(streamed['confidence'] - single.confidence()) < 1e-9
+
+
+async def single_page_pdf():
+    """A one-page PDF is answered by the synchronous API, without a job to poll"""
+    agent = DocumentPerceptionAgent()
+    agent.textract = LocalTextract(pages=1, call_latency=CALL_LATENCY)
+    start = time.perf_counter()
+    await agent._extract_document_data('receipt.pdf')
+    return agent.textract.sync_calls, agent.textract.calls, time.perf_counter() - start
+
+
+def main():
+    textract = LocalTextract(pages=PAGES, call_latency=CALL_LATENCY)
+    pages, largest_page, first_page_at, total = asyncio.run(stream(textract))
+    total_blocks = len(synthetic_blocks(PAGES))
+    assert pages == list(range(1, PAGES + 1)), "pages must stream in order"
+    print(f"📊 {PAGES} pages, {total_blocks} blocks, {textract.calls} GetDocumentAnalysis calls")
+    print(f"   first page after {first_page_at * 1000:.0f} ms, last after {total * 1000:.0f} ms")
+    print(f"   largest page held in memory: {largest_page} blocks")
+
+    assert asyncio.run(agent_merge()), "streamed merge must match single-pass extraction"
+    print("✅ streamed merge matches single-pass extraction, confidence included")
+    sync_calls, job_calls, elapsed = asyncio.run(single_page_pdf())
+    assert sync_calls == 1 and job_calls == 0
+    print(f"✅ single-page PDF extracted synchronously in {elapsed * 1000:.0f} ms, no job polling")
+    error = asyncio.run(failed_job())
+    assert error and 'FAILED' in error
+    print(f"✅ failed job raises TextractJobError ({error})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Semantic-memory usage: read-modify-write put_item vs aggregated UpdateItem ADD"""
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'memory'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from usage_counters import SemanticUsageBuffer
+
+ROUND_TRIP = 0.003
+WORKERS = 8
+USES_PER_WORKER = 150
+CONCEPTS = 12
+FLUSH_INTERVAL = 0.05
+
+
+class StubTable:
+    """get/put/update_item with a round trip; update_item applies ADD/SET atomically"""
+
+    def __init__(self):
+        self.items = {}
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.bytes_written = 0
+
+    def get_item(self, Key):
+        time.sleep(ROUND_TRIP)
+        item = self.items.get(Key['concept'])
+        return {'Item': dict(item)} if item else {}
+
+    def put_item(self, Item):
+        time.sleep(ROUND_TRIP)
+        with self.lock:
+            self.writes += 1
+            self.bytes_written += len(json.dumps(Item, default=str))
+            self.items[Item['concept']] = dict(Item)
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeValues):
+        time.sleep(ROUND_TRIP)
+        with self.lock:
+            self.writes += 1
+            self.bytes_written += len(json.dumps(ExpressionAttributeValues, default=str))
+            item = self.items.setdefault(Key['concept'], {'concept': Key['concept']})
+            item['usage_count'] = item.get('usage_count', 0) + ExpressionAttributeValues[':usage']
+            for name in ('knowledge', 'confidence', 'last_updated'):
+                if f':{name}' in ExpressionAttributeValues:
+                    item[name] = ExpressionAttributeValues[f':{name}']
+
+
+def knowledge(concept):
+    return {'concept': concept, 'pattern': 'net-30 payment terms' * 40, 'confidence': 0.9}
+
+
+async def read_modify_write(table, uses):
+    """Baseline: read the item, bump usage_count from it and put the whole item back"""
+    async def use(concept):
+        item = (await asyncio.to_thread(table.get_item, Key={'concept': concept})).get('Item', {})
+        await asyncio.to_thread(table.put_item, Item={
+            'concept': concept, 'knowledge': knowledge(concept), 'confidence': 0.9,
+            'last_updated': int(time.time()), 'usage_count': item.get('usage_count', 0) + 1
+        })
+
+    async def worker(concepts):
+        for concept in concepts:
+            await use(concept)
+
+    await asyncio.gather(*(worker(concepts) for concepts in uses))
+
+
+async def aggregated(table, uses):
+    buffer = SemanticUsageBuffer(table, flush_interval=FLUSH_INTERVAL)
+
+    async def worker(concepts):
+        for concept in concepts:
+            await buffer.record(concept, confidence=0.9, knowledge=knowledge(concept))
+            await asyncio.sleep(0.001)
+
+    await asyncio.gather(*(worker(concepts) for concepts in uses))
+    await buffer.close()
+
+
+async def invocation(buffer, concept):
+    """A warm invocation that records a use and ends without flushing"""
+    await buffer.record(concept)
+
+
+async def timed_flush(buffer, concept):
+    """A later invocation on a new loop, which only the flush timer writes out"""
+    await buffer.record(concept)
+    await asyncio.sleep(FLUSH_INTERVAL * 4)
+
+
+def main():
+    random.seed(19)
+    # Skewed use: a few concepts are hot
+    weights = [1 / (rank + 1) for rank in range(CONCEPTS)]
+    uses = [random.choices([f'concept-{i}' for i in range(CONCEPTS)], weights, k=USES_PER_WORKER)
+            for _ in range(WORKERS)]
+    total = WORKERS * USES_PER_WORKER
+    print(f"📊 {WORKERS} concurrent workers, {total} concept uses over {CONCEPTS} concepts")
+
+    for name, run in (('read-modify-write put', read_modify_write), ('aggregated ADD', aggregated)):
+        table = StubTable()
+        start = time.perf_counter()
+        asyncio.run(run(table, uses))
+        elapsed = time.perf_counter() - start
+        counted = sum(item['usage_count'] for item in table.items.values())
+        print(f"   {name:22} {elapsed:5.2f}s  {table.writes:5d} writes  {table.bytes_written / 1024:7.0f} KB  "
+              f"usage_count total {counted} ({total - counted} lost)")
+        if run is aggregated:
+            assert counted == total
+    print("✅ aggregated counters lose no updates under concurrency")
+
+    # The process-wide buffer outlives each invocation's event loop
+    table = StubTable()
+    buffer = SemanticUsageBuffer(table, flush_interval=FLUSH_INTERVAL)
+    asyncio.run(invocation(buffer, 'concept-0'))
+    asyncio.run(timed_flush(buffer, 'concept-0'))
+    assert table.items['concept-0']['usage_count'] == 2
+    print("✅ a warm invocation on a new event loop still flushes on its timer, "
+          "including uses left over from the last one")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Recall@k and latency of the local IVF index against brute force, and the bounded near cache"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+
+from vector_index import IVFIndex, NearCache
+
+DIM = 256
+VECTORS = 20000
+QUERIES = 200
+TOPICS = 64
+K = 10
+CACHE_SIZE = 2000
+REPLACEMENTS = 1000
+
+
+def clustered_vectors(rng, count, topics):
+    """Embeddings cluster by topic in practice; mimic that with noisy centres"""
+    labels = rng.integers(0, len(topics), size=count)
+    return topics[labels] + 0.35 * rng.standard_normal((count, DIM)).astype(np.float32)
+
+
+def recall_at_k(index, queries):
+    found = 0
+    for query in queries:
+        approx = {item_id for item_id, _, _ in index.search(query, K)}
+        exact = {item_id for item_id, _, _ in index.exact_search(query, K)}
+        found += len(approx & exact)
+    return found / (K * len(queries))
+
+
+def time_per_query(search, queries):
+    start = time.perf_counter()
+    for query in queries:
+        search(query, K)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main():
+    rng = np.random.default_rng(7)
+    topics = rng.standard_normal((TOPICS, DIM)).astype(np.float32)
+    vectors = clustered_vectors(rng, VECTORS, topics)
+    queries = clustered_vectors(rng, QUERIES, topics)
+
+    index = IVFIndex(dim=DIM)
+    start = time.perf_counter()
+    for i, vector in enumerate(vectors):
+        index.add(f'doc-{i}', vector)
+    build = time.perf_counter() - start
+    print(f"📊 {VECTORS} x {DIM} vectors, {QUERIES} queries, k={K} "
+          f"(incremental build {build:.2f}s)")
+
+    exact_ms = time_per_query(index.exact_search, queries)
+    print(f"   brute force        {exact_ms:.3f} ms/query")
+    for nprobe in (1, 4, 8, 16):
+        index.nprobe = nprobe
+        recall = recall_at_k(index, queries)
+        approx_ms = time_per_query(index.search, queries)
+        print(f"   ivf nprobe={nprobe:<3}    {approx_ms:.3f} ms/query  recall@{K}={recall:.3f}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        index.save(directory)
+        loaded = IVFIndex.load(directory)
+        assert loaded.search(queries[0], K) == index.search(queries[0], K)
+        print(f"   memory-mapped reload returns identical results ✅")
+
+    # Replacing a vector in a trained index touches only its own bucket
+    start = time.perf_counter()
+    for i in range(REPLACEMENTS):
+        index.add(f'doc-{i}', vectors[-1 - i])
+    print(f"   replace in trained index {(time.perf_counter() - start) / REPLACEMENTS * 1000:.3f} ms/add")
+
+    cache = NearCache(IVFIndex(dim=DIM), 'embedding', max_entries=CACHE_SIZE)
+    for i, vector in enumerate(vectors[:4 * CACHE_SIZE]):
+        cache.remember([{'_id': f'doc-{i}', '_source': {'embedding': vector}}])
+    cache.index.nprobe = len(cache.index._lists)
+    # Probing every bucket must agree with a full scan once rows have been moved around
+    assert len(cache.index) == CACHE_SIZE
+    assert cache.index.search(queries[0], K) == cache.index.exact_search(queries[0], K)
+    survivors = {item_id for item_id, _, _ in cache.index.exact_search(queries[0], CACHE_SIZE)}
+    assert survivors == {f'doc-{i}' for i in range(3 * CACHE_SIZE, 4 * CACHE_SIZE)}
+    print(f"   near cache capped at {len(cache.index)} of {4 * CACHE_SIZE} remembered "
+          f"({cache.evictions} LRU evictions) ✅")
+
+
+if __name__ == "__main__":
+    main()
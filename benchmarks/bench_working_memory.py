@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Working memory per workflow step: DynamoDB on every access vs the session cache"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'agents'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'memory'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from working_memory_cache import WorkingMemoryCache, WorkingMemoryConflictError
+
+ROUND_TRIP = 0.004
+SESSIONS = 20
+STEPS = 5
+READS_PER_STEP = 10
+WRITES_PER_STEP = 3
+
+
+class ConditionalCheckFailedException(Exception):
+    pass
+
+
+class StubTable:
+    """get_item/put_item with a fixed round trip and DynamoDB's condition checks"""
+
+    def __init__(self):
+        self.items = {}
+        self.calls = 0
+        self.lock = threading.Lock()
+        self.meta = SimpleNamespace(client=SimpleNamespace(
+            exceptions=SimpleNamespace(ConditionalCheckFailedException=ConditionalCheckFailedException)
+        ))
+
+    def get_item(self, Key, ProjectionExpression=None):
+        self.calls += 1
+        time.sleep(ROUND_TRIP)
+        item = self.items.get(Key['session_id'])
+        return {'Item': dict(item)} if item else {}
+
+    def put_item(self, Item, ConditionExpression=None, ExpressionAttributeValues=None):
+        self.calls += 1
+        time.sleep(ROUND_TRIP)
+        with self.lock:
+            current = self.items.get(Item['session_id'])
+            if ConditionExpression == 'attribute_not_exists(version)' and current and 'version' in current:
+                raise ConditionalCheckFailedException()
+            if ConditionExpression == 'version = :version' and (
+                    not current or current.get('version') != ExpressionAttributeValues[':version']):
+                raise ConditionalCheckFailedException()
+            self.items[Item['session_id']] = dict(Item)
+
+
+async def direct(table):
+    """Baseline: what AgentMemory did before, a round trip per access"""
+    read_times = []
+
+    async def session(session_id):
+        for step in range(STEPS):
+            for _ in range(READS_PER_STEP):
+                start = time.perf_counter()
+                await asyncio.to_thread(table.get_item, Key={'session_id': session_id})
+                read_times.append(time.perf_counter() - start)
+            for write in range(WRITES_PER_STEP):
+                await asyncio.to_thread(table.put_item, Item={
+                    'session_id': session_id, 'context': {'step': step, 'write': write},
+                    'ttl': int(time.time()) + 3600
+                })
+
+    await asyncio.gather(*(session(f'session-{i}') for i in range(SESSIONS)))
+    return read_times
+
+
+async def cached(table):
+    cache = WorkingMemoryCache(table)
+    read_times = []
+
+    async def session_step(session_id, step):
+        for _ in range(READS_PER_STEP):
+            start = time.perf_counter()
+            await cache.get(session_id)
+            read_times.append(time.perf_counter() - start)
+        for write in range(WRITES_PER_STEP):
+            cache.put(session_id, {'step': step, 'write': write})
+
+    for step in range(STEPS):
+        await asyncio.gather(*(session_step(f'session-{i}', step) for i in range(SESSIONS)))
+        # Step boundary: one conditional put per changed session
+        await cache.flush()
+    return read_times
+
+
+async def conflict():
+    """A write from another process invalidates the cached copy"""
+    table = StubTable()
+    ours, theirs = WorkingMemoryCache(table), WorkingMemoryCache(table)
+    ours.put('shared', {'owner': 'ours'})
+    await ours.flush()
+    await theirs.get('shared')
+    theirs.put('shared', {'owner': 'theirs'})
+    await theirs.flush()
+    ours.put('shared', {'owner': 'ours again'})
+    try:
+        await ours.flush()
+    except WorkingMemoryConflictError:
+        return await ours.get('shared')
+    raise AssertionError('expected a version conflict')
+
+
+async def stale_read():
+    """Once past the revalidation window, a copy changed elsewhere is reread"""
+    table = StubTable()
+    ours, theirs = WorkingMemoryCache(table, revalidate_after=0), WorkingMemoryCache(table)
+    ours.put('shared', {'owner': 'ours'})
+    await ours.flush()
+    await ours.get('shared')
+    theirs.put('shared', {'owner': 'theirs'})
+    await theirs.flush()
+    return await ours.get('shared'), (ours.revalidations, ours.hits, ours.misses)
+
+
+async def expired_and_blind():
+    """An expired item DynamoDB has not deleted yet, and a put never preceded by a get"""
+    table = StubTable()
+    table.items['expired'] = {'session_id': 'expired', 'context': {'old': True}, 'version': 3,
+                              'ttl': int(time.time()) - 60}
+    table.items['live'] = {'session_id': 'live', 'context': {'old': True}, 'version': 2,
+                           'ttl': int(time.time()) + 3600}
+    cache = WorkingMemoryCache(table)
+    assert await cache.get('expired') is None
+    cache.put('expired', {'new': True})
+    cache.put('live', {'new': True})
+    await cache.flush()
+    return {session_id: (item['context'], item['version']) for session_id, item in table.items.items()}
+
+
+def median_us(times):
+    return sorted(times)[len(times) // 2] * 1e6
+
+
+def main():
+    print(f"📊 {SESSIONS} sessions x {STEPS} steps, {READS_PER_STEP} reads and "
+          f"{WRITES_PER_STEP} writes per step, {ROUND_TRIP * 1000:.0f} ms round trip")
+
+    table = StubTable()
+    reads = asyncio.run(direct(table))
+    print(f"   DynamoDB every access   median read {median_us(reads):8.1f} µs  {table.calls} calls")
+    table = StubTable()
+    reads = asyncio.run(cached(table))
+    print(f"   session cache           median read {median_us(reads):8.1f} µs  {table.calls} calls")
+
+    assert asyncio.run(conflict()) == {'owner': 'theirs'}
+    print("✅ a conflicting write elsewhere drops the cached copy and rereads")
+
+    context, counts = asyncio.run(stale_read())
+    # Two version checks: the first confirms the copy, the second finds their write
+    assert context == {'owner': 'theirs'} and counts == (2, 1, 1)
+    print("✅ a cached copy past its revalidation window is checked against the stored version")
+
+    assert asyncio.run(expired_and_blind()) == {'expired': ({'new': True}, 4), 'live': ({'new': True}, 3)}
+    print("✅ writes succeed over an expired item not yet deleted, and without a prior read")
+
+
+if __name__ == "__main__":
+    main()
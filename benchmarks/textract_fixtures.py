@@ -0,0 +1,128 @@
+"""Synthetic Textract block sets shaped like AnalyzeDocument output"""
+import itertools
+import time
+from typing import Dict, Any, List
+
+from botocore.exceptions import ClientError
+
+LINES_PER_PAGE = 40
+WORDS_PER_LINE = 8
+TABLE_ROWS = 10
+TABLE_COLUMNS = 4
+FORM_FIELDS = 10
+
+
+def synthetic_page(page: int, ids=None) -> List[Dict[str, Any]]:
+    """Blocks for one page: lines of words, a table and form key/value pairs"""
+    ids = ids or itertools.count()
+    new_id = lambda: f'p{page}-{next(ids)}'
+    blocks = []
+    page_block = {'Id': new_id(), 'BlockType': 'PAGE', 'Page': page, 'Relationships': []}
+    blocks.append(page_block)
+
+    def words(texts):
+        word_ids = []
+        for text in texts:
+            word = {'Id': new_id(), 'BlockType': 'WORD', 'Text': text, 'Confidence': 99.0, 'Page': page}
+            blocks.append(word)
+            word_ids.append(word['Id'])
+        return word_ids
+
+    for line_number in range(LINES_PER_PAGE):
+        texts = [f'w{page}_{line_number}_{i}' for i in range(WORDS_PER_LINE)]
+        word_ids = words(texts)
+        line = {
+            'Id': new_id(), 'BlockType': 'LINE', 'Text': ' '.join(texts), 'Confidence': 98.0,
+            'Page': page, 'Relationships': [{'Type': 'CHILD', 'Ids': word_ids}]
+        }
+        blocks.append(line)
+        page_block['Relationships'].append({'Type': 'CHILD', 'Ids': [line['Id']]})
+
+    cell_ids = []
+    for row in range(1, TABLE_ROWS + 1):
+        for column in range(1, TABLE_COLUMNS + 1):
+            cell = {
+                'Id': new_id(), 'BlockType': 'CELL', 'RowIndex': row, 'ColumnIndex': column,
+                'Confidence': 95.0, 'Page': page,
+                'Relationships': [{'Type': 'CHILD', 'Ids': words([f'c{row}x{column}'])}]
+            }
+            blocks.append(cell)
+            cell_ids.append(cell['Id'])
+    blocks.append({
+        'Id': new_id(), 'BlockType': 'TABLE', 'Confidence': 97.0, 'Page': page,
+        'Relationships': [{'Type': 'CHILD', 'Ids': cell_ids}]
+    })
+
+    for field in range(FORM_FIELDS):
+        value = {
+            'Id': new_id(), 'BlockType': 'KEY_VALUE_SET', 'EntityTypes': ['VALUE'],
+            'Confidence': 90.0, 'Page': page,
+            'Relationships': [{'Type': 'CHILD', 'Ids': words([f'value{page}_{field}'])}]
+        }
+        key = {
+            'Id': new_id(), 'BlockType': 'KEY_VALUE_SET', 'EntityTypes': ['KEY'],
+            'Confidence': 90.0, 'Page': page,
+            'Relationships': [
+                {'Type': 'VALUE', 'Ids': [value['Id']]},
+                {'Type': 'CHILD', 'Ids': words([f'key{page}_{field}'])}
+            ]
+        }
+        blocks.extend([key, value])
+    return blocks
+
+
+def synthetic_blocks(pages: int) -> List[Dict[str, Any]]:
+    blocks = []
+    for page in range(1, pages + 1):
+        blocks.extend(synthetic_page(page))
+    return blocks
+
+
+class LocalTextract:
+    """In-process stand-in for the Textract analysis APIs
+
+    The synchronous API answers single-page documents and rejects longer
+    ones as Textract does. Jobs report IN_PROGRESS for a few polls, then
+    serve synthetic blocks in pages of at most MaxResults, sleeping
+    call_latency per call.
+    """
+
+    def __init__(self, pages: int, polls_until_done: int = 2, call_latency: float = 0.0,
+                 fail: bool = False):
+        self.pages = pages
+        self.polls_until_done = polls_until_done
+        self.call_latency = call_latency
+        self.fail = fail
+        self.calls = 0
+        self.sync_calls = 0
+        self._jobs = {}
+
+    def analyze_document(self, Document, FeatureTypes):
+        self.sync_calls += 1
+        time.sleep(self.call_latency)
+        if self.pages > 1:
+            raise ClientError({'Error': {'Code': 'UnsupportedDocumentException',
+                                         'Message': 'Request has unsupported document format'}},
+                              'AnalyzeDocument')
+        return {'Blocks': synthetic_blocks(self.pages)}
+
+    def start_document_analysis(self, DocumentLocation, FeatureTypes):
+        job_id = f'job-{len(self._jobs) + 1}'
+        self._jobs[job_id] = {'polls': 0, 'blocks': synthetic_blocks(self.pages)}
+        return {'JobId': job_id}
+
+    def get_document_analysis(self, JobId, MaxResults=1000, NextToken=None):
+        self.calls += 1
+        time.sleep(self.call_latency)
+        job = self._jobs[JobId]
+        if job['polls'] < self.polls_until_done:
+            job['polls'] += 1
+            return {'JobStatus': 'IN_PROGRESS'}
+        if self.fail:
+            return {'JobStatus': 'FAILED', 'StatusMessage': 'stubbed failure'}
+        start = int(NextToken or 0)
+        end = start + MaxResults
+        response = {'JobStatus': 'SUCCEEDED', 'Blocks': job['blocks'][start:end]}
+        if end < len(job['blocks']):
+            response['NextToken'] = str(end)
+        return response
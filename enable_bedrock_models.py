@@ -10,6 +10,7 @@ def enable_bedrock_models():
     # Required models for the architecture
     required_models = [
         'anthropic.claude-3-sonnet-20240229-v1:0',
+        'anthropic.claude-3-haiku-20240307-v1:0',
         'amazon.titan-embed-text-v1'
     ]
     
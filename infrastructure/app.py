@@ -8,6 +8,8 @@ from aws_cdk import (
     aws_s3 as s3,
     aws_iam as iam,
     aws_events as events,
+    aws_events_targets as targets,
+    aws_sqs as sqs,
     aws_stepfunctions as sfn,
     aws_stepfunctions_tasks as tasks,
     Duration
@@ -44,6 +46,21 @@ class AgenticAIStack(Stack):
             billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST
         )
         
+        # High-water marks for incremental memory consolidation
+        self.memory_checkpoint_table = dynamodb.Table(
+            self, "MemoryCheckpointTable",
+            partition_key=dynamodb.Attribute(name="checkpoint_id", type=dynamodb.AttributeType.STRING),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST
+        )
+        
+        # Shared tier of the Bedrock response cache
+        self.response_cache_table = dynamodb.Table(
+            self, "ResponseCacheTable",
+            partition_key=dynamodb.Attribute(name="cache_key", type=dynamodb.AttributeType.STRING),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="ttl"
+        )
+        
         # IAM role for agents
         self.agent_role = iam.Role(
             self, "AgentExecutionRole",
@@ -64,15 +81,31 @@ class AgenticAIStack(Stack):
             )
         )
         
+        self.response_cache_table.grant_read_write_data(self.agent_role)
+        self.memory_checkpoint_table.grant_read_write_data(self.agent_role)
+        
+        # EventBridge for agent communication
+        self.agent_bus = events.EventBus(self, "AgentEventBus")
+        
+        # Agent results are routed to one queue drained by the supervisor's response listener
+        self.response_queue = sqs.Queue(
+            self, "AgentResponseQueue",
+            retention_period=Duration.hours(1)
+        )
+        events.Rule(
+            self, "AgentResponseRule",
+            event_bus=self.agent_bus,
+            event_pattern=events.EventPattern(detail_type=["Task Result"]),
+            targets=[targets.SqsQueue(self.response_queue)]
+        )
+        self.response_queue.grant_consume_messages(self.agent_role)
+        
         # Lambda functions for each agent
         self.supervisor_agent = self._create_agent_lambda("SupervisorAgent", "supervisor_agent.py")
         self.perception_agent = self._create_agent_lambda("PerceptionAgent", "document_perception_agent.py")
         self.analysis_agent = self._create_agent_lambda("AnalysisAgent", "analysis_agent.py")
         self.action_agent = self._create_agent_lambda("ActionAgent", "action_agent.py")
         
-        # EventBridge for agent communication
-        self.agent_bus = events.EventBus(self, "AgentEventBus")
-        
         # Step Functions for workflow orchestration
         self.create_workflow_state_machine()
     
@@ -90,6 +123,13 @@ class AgenticAIStack(Stack):
                 "WORKING_MEMORY_TABLE": self.working_memory_table.table_name,
                 "EPISODIC_MEMORY_TABLE": self.episodic_memory_table.table_name,
                 "SEMANTIC_MEMORY_TABLE": self.semantic_memory_table.table_name,
+                "MEMORY_CHECKPOINT_TABLE": self.memory_checkpoint_table.table_name,
+                "RESPONSE_CACHE_TABLE": self.response_cache_table.table_name,
+                "RESPONSE_QUEUE_URL": self.response_queue.queue_url,
+                # Defer boto3/NumPy and client construction to first use
+                "AGENT_LAZY_INIT": "1",
+                # Set to "1" for one structured analysis call instead of three
+                "ANALYSIS_FUSED": "0",
                 "DOCUMENT_BUCKET": self.document_bucket.bucket_name
             }
         )
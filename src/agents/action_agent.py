@@ -1,31 +1,46 @@
-import boto3
+import asyncio
 import json
+import logging
+import re
+import time
+import uuid
 from typing import Dict, Any, List
 
+from action_executor import ActionExecutor
+from aws_clients import aws_client, aws_resource, aws_table, get_aws_clients
+from audit_writer import AuditLogWriter
+from model_router import get_model_router, json_reply
+from prompt_context import PROMPT_BUDGETS, render_context
+from rate_control import get_rate_controller, is_unapplied, rate_stats
+
+logger = logging.getLogger(__name__)
+
+
 class ActionAgent:
     def __init__(self):
-        self.lambda_client = boto3.client('lambda')
-        self.stepfunctions = boto3.client('stepfunctions')
-        self.dynamodb = boto3.resource('dynamodb')
-        self.audit_table = self.dynamodb.Table('audit-log')
+        self.lambda_client = aws_client('lambda')
+        self.router = get_model_router()
+        self.stepfunctions = aws_client('stepfunctions')
+        self.dynamodb = aws_resource('dynamodb')
+        self.audit_table = aws_table('audit-log')
+        self.audit_writer = AuditLogWriter('audit-log', self.dynamodb)
+        self.executor = ActionExecutor()
+        self.action_control = get_rate_controller('actions')
     
     async def execute_actions(self, analysis_results: Dict[str, Any]) -> Dict[str, Any]:
         """Execute business processes based on analysis"""
         # 1. Determine required actions
         actions = await self._determine_actions(analysis_results)
         
-        # 2. Execute actions with error handling
-        execution_results = []
-        for action in actions:
-            result = await self._execute_single_action(action)
-            execution_results.append(result)
-            
-            # Log action for audit
-            await self._log_action(action, result)
+        # 2. Execute actions as a dependency graph, logging each for audit as it completes
+        execution_results = await self.executor.run(actions, self._execute_single_action, self._log_action)
         
         # 3. Validate execution success
         validation = await self._validate_execution(execution_results)
         
+        # Buffered audit records must be durable before the trail is read back
+        await self.audit_writer.flush()
+        
         return {
             'actions_executed': execution_results,
             'validation_status': validation,
@@ -34,12 +49,15 @@ class ActionAgent:
     
     async def _determine_actions(self, analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Determine what actions to take based on analysis"""
+        action_context = render_context({
+            'Compliance': analysis['compliance_status'],
+            'Insights': analysis['insights'],
+            'Analysis': analysis['analysis']
+        }, PROMPT_BUDGETS['actions'])
         action_prompt = f"""
         Based on this analysis, determine required actions:
         
-        Analysis: {analysis['analysis']}
-        Compliance: {analysis['compliance_status']}
-        Insights: {analysis['insights']}
+        {action_context}
         
         Return specific actions to execute:
         - approve/reject decisions
@@ -47,48 +65,75 @@ class ActionAgent:
         - data updates required
         - workflow triggers
         
-        Format as structured action list.
+        Format as structured action list. Give each action an id and, where it
+        must wait for others, a depends_on list of action ids or action types.
         """
         
-        response = boto3.client('bedrock-runtime').invoke_model(
-            modelId='anthropic.claude-3-sonnet-20240229-v1:0',
-            body=json.dumps({
+        # Action extraction runs on the fast tier; an unparseable or unsure reply escalates
+        response = await self.router.invoke(
+            'actions',
+            body={
                 'anthropic_version': 'bedrock-2023-05-31',
                 'messages': [{'role': 'user', 'content': action_prompt}],
                 'max_tokens': 1000
-            })
+            },
+            validate=json_reply(),
+            cache_kind='actions'
         )
         
         return self._parse_actions(response)
     
     async def _execute_single_action(self, action: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute individual action with retry logic"""
-        action_type = action['type']
+        """Execute individual action with retry logic
+
+        Actions are not idempotent, so only throttles and failures to connect,
+        which the service never acted on, are retried with jittered backoff;
+        other errors, read timeouts and 5xx included, fail the action on the
+        first attempt.
+        """
+        attempts = 0
+        
+        async def attempt():
+            nonlocal attempts
+            attempts += 1
+            return await self._dispatch_action(action)
         
         try:
-            if action_type == 'workflow_trigger':
-                return await self._trigger_workflow(action)
-            elif action_type == 'notification':
-                return await self._send_notification(action)
-            elif action_type == 'data_update':
-                return await self._update_data(action)
-            elif action_type == 'approval_decision':
-                return await self._process_approval(action)
-            else:
-                return {'status': 'unknown_action', 'action': action}
-                
+            return await self.action_control.call(attempt, retryable=is_unapplied)
         except Exception as e:
             return {
                 'status': 'failed',
                 'action': action,
                 'error': str(e),
-                'retry_count': action.get('retry_count', 0) + 1
+                'retry_count': action.get('retry_count', 0) + attempts - 1
             }
     
+    async def _dispatch_action(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        action_type = action['type']
+        
+        if action_type == 'workflow_trigger':
+            return await self._trigger_workflow(action)
+        elif action_type == 'notification':
+            return await self._send_notification(action)
+        elif action_type == 'data_update':
+            return await self._update_data(action)
+        elif action_type == 'approval_decision':
+            return await self._process_approval(action)
+        else:
+            return {'status': 'unknown_action', 'action': action}
+    
     async def _trigger_workflow(self, action: Dict[str, Any]) -> Dict[str, Any]:
         """Trigger Step Functions workflow"""
-        response = self.stepfunctions.start_execution(
+        # One name per action, kept across retries: Step Functions starts a
+        # named execution at most once, so a retried trigger cannot run twice
+        if 'execution_name' not in action:
+            prefix = re.sub(r'[^A-Za-z0-9_-]', '-', str(action.get('id', 'action')))[:47]
+            action['execution_name'] = f'{prefix}-{uuid.uuid4().hex}'
+        # Off the loop, so independent actions in the DAG really overlap
+        response = await asyncio.to_thread(
+            self.stepfunctions.start_execution,
             stateMachineArn=action['workflow_arn'],
+            name=action['execution_name'],
             input=json.dumps(action['payload'])
         )
         
@@ -100,12 +145,32 @@ class ActionAgent:
     
     async def _log_action(self, action: Dict[str, Any], result: Dict[str, Any]) -> None:
         """Log action execution for audit trail"""
-        self.audit_table.put_item(
-            Item={
-                'timestamp': boto3.dynamodb.conditions.Key('timestamp').eq(int(time.time())),
-                'action_type': action['type'],
-                'action_details': action,
-                'execution_result': result,
-                'agent_id': 'action-agent'
-            }
-        )
+        await self.audit_writer.write({
+            'audit_id': str(uuid.uuid4()),
+            'timestamp': int(time.time()),
+            'action_type': action['type'],
+            'action_details': action,
+            'execution_result': result,
+            'agent_id': 'action-agent'
+        })
+
+
+def handler(event, context):
+    """Lambda entry point; the audit buffer is always flushed before returning"""
+    return asyncio.run(_handle(event))
+
+
+async def _handle(event: Dict[str, Any]) -> Dict[str, Any]:
+    clients = get_aws_clients()
+    clients.start_request()
+    agent = ActionAgent()
+    try:
+        return await agent.execute_actions(event)
+    finally:
+        await agent.audit_writer.close()
+        # Warm invocations reuse the registry's clients; log how many, and at most what that saved
+        logger.info('%s', json.dumps({'aws_clients': clients.request_stats()}))
+        # Per-tier model latency and escalation rates since the container started
+        logger.info('%s', json.dumps({'model_router': agent.router.stats()}))
+        # Adapted rates and throttles per service and model
+        logger.info('%s', json.dumps({'rate_control': rate_stats()}))
@@ -0,0 +1,101 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from dependency_graph import BLOCKING_STATUSES, find_cycle_members
+
+DEFAULT_ACTION_CONCURRENCY = int(os.environ.get('ACTION_CONCURRENCY', '4'))
+
+
+def action_id(action: Dict[str, Any], index: int) -> str:
+    return action.get('id') or f"{action['type']}-{index}"
+
+
+def resolve_dependencies(actions: List[Dict[str, Any]]) -> Dict[int, Set[int]]:
+    """Map each action index to the indices it waits on
+
+    A depends_on entry names either an action id or an action type; a type
+    means every action of that type ("notify after approval_decision").
+    Unknown names raise KeyError.
+    """
+    by_id = {action_id(action, i): i for i, action in enumerate(actions)}
+    by_type: Dict[str, List[int]] = {}
+    for i, action in enumerate(actions):
+        by_type.setdefault(action['type'], []).append(i)
+
+    dependencies = {}
+    for i, action in enumerate(actions):
+        waits_on = set()
+        for name in action.get('depends_on', ()):
+            if name in by_id:
+                waits_on.add(by_id[name])
+            elif name in by_type:
+                waits_on.update(by_type[name])
+            else:
+                raise KeyError(name)
+        waits_on.discard(i)
+        dependencies[i] = waits_on
+    return dependencies
+
+
+class ActionExecutor:
+    """Run actions as a dependency DAG with a concurrency cap per action type
+
+    Independent actions run concurrently. An action whose dependency failed
+    or was skipped is skipped without running, while unrelated branches
+    carry on.
+    """
+
+    def __init__(self, concurrency: Optional[Dict[str, int]] = None,
+                 default_concurrency: int = DEFAULT_ACTION_CONCURRENCY):
+        self.concurrency = concurrency or {}
+        self.default_concurrency = default_concurrency
+
+    async def run(self, actions: List[Dict[str, Any]],
+                  execute: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                  on_complete: Optional[Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[None]]] = None
+                  ) -> List[Dict[str, Any]]:
+        """Execute every action and return results in the original order"""
+        try:
+            dependencies = resolve_dependencies(actions)
+        except KeyError as e:
+            return [self._skipped(action, f'unknown dependency {e.args[0]}') for action in actions]
+        blocked = find_cycle_members(dependencies)
+
+        loop = asyncio.get_running_loop()
+        outcomes = {i: loop.create_future() for i in range(len(actions))}
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        async def run_one(i: int) -> Dict[str, Any]:
+            action = actions[i]
+            result = self._skipped(action, 'dependency cycle') if i in blocked else None
+            for dependency in sorted(dependencies[i]):
+                if result is not None:
+                    break
+                status = (await outcomes[dependency]).get('status')
+                if status in BLOCKING_STATUSES:
+                    name = action_id(actions[dependency], dependency)
+                    result = self._skipped(action, f'dependency {name} {status}')
+
+            if result is None:
+                action_type = action['type']
+                if action_type not in semaphores:
+                    semaphores[action_type] = asyncio.Semaphore(
+                        self.concurrency.get(action_type, self.default_concurrency)
+                    )
+                async with semaphores[action_type]:
+                    try:
+                        result = await execute(action)
+                    except Exception as e:
+                        result = {'status': 'failed', 'action': action, 'error': str(e)}
+
+            outcomes[i].set_result(result)
+            if on_complete is not None:
+                await on_complete(action, result)
+            return result
+
+        return list(await asyncio.gather(*(run_one(i) for i in range(len(actions)))))
+
+    @staticmethod
+    def _skipped(action: Dict[str, Any], reason: str) -> Dict[str, Any]:
+        return {'status': 'skipped', 'action': action, 'reason': reason}
@@ -1,47 +1,128 @@
-import boto3
 import json
-from typing import Dict, Any, List
+import os
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple
+
+from aws_clients import aws_client, aws_resource, aws_table
+from chunking import Chunk, map_bounded, split_document
+from embedding_service import get_embedding_service
+from model_router import get_model_router
+from model_streaming import SectionSplitter, cut_after_step, message, message_text, stop_after_step
+from prompt_context import PROMPT_BUDGETS, compact_entities, rank_documents, render_context
+from structured_output import extract_json, validate_sections
+from vector_index import get_near_cache
+
+CHUNK_CHARS = int(os.environ.get('ANALYSIS_CHUNK_CHARS', '8000'))
+CHUNK_CONCURRENCY = int(os.environ.get('ANALYSIS_CHUNK_CONCURRENCY', '4'))
+# Opt-in: reasoning, compliance and insights from one structured-output call
+FUSED_ANALYSIS = os.environ.get('ANALYSIS_FUSED', '0') == '1'
+
+# Sections of the fused reply; one that fails its schema is redone by its own call
+FUSED_SECTIONS = {
+    'reasoning': {
+        'type': 'object',
+        'required': ['key_information', 'reasoning_chain', 'completeness', 'business_implications', 'risks'],
+        'properties': {
+            'key_information': {'type': 'array', 'items': {'type': 'string'}},
+            'reasoning_chain': {'type': 'array', 'items': {'type': 'string'}},
+            'completeness': {'type': 'string'},
+            'business_implications': {'type': 'array', 'items': {'type': 'string'}},
+            'risks': {'type': 'array', 'items': {'type': 'string'}}
+        }
+    },
+    'compliance': {
+        'type': 'object',
+        'required': ['compliant', 'violations'],
+        'properties': {
+            'compliant': {'type': 'boolean'},
+            'violations': {'type': 'array', 'items': {'type': 'string'}}
+        }
+    },
+    'insights': {
+        'type': 'array',
+        'items': {
+            'type': 'object',
+            'required': ['insight', 'recommendation'],
+            'properties': {'insight': {'type': 'string'}, 'recommendation': {'type': 'string'}}
+        }
+    }
+}
+
+# Both reasoning prompts ask for four numbered steps; a fifth is a recap not worth generating
+REASONING_STEPS = 4
+
+# Receives each reasoning section as soon as the model finishes writing it
+SectionHandler = Callable[[str], Awaitable[None]]
 
 class AnalysisAgent:
-    def __init__(self):
-        self.bedrock = boto3.client('bedrock-runtime')
-        self.opensearch = boto3.client('opensearch')
-        self.dynamodb = boto3.resource('dynamodb')
-        self.memory_table = self.dynamodb.Table('agent-memory')
+    def __init__(self, fused: bool = FUSED_ANALYSIS):
+        self.fused = fused
+        self.fused_fallbacks = Counter()
+        self.router = get_model_router()
+        self.embeddings = get_embedding_service()
+        self.document_cache = get_near_cache('documents', 'content_embedding')
+        self.opensearch = aws_client('opensearch')
+        self.dynamodb = aws_resource('dynamodb')
+        self.memory_table = aws_table('agent-memory')
     
-    async def analyze_document(self, perception_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def analyze_document(self, perception_data: Dict[str, Any],
+                               on_section: Optional[SectionHandler] = None) -> Dict[str, Any]:
         """Perform deep analysis with reasoning and memory"""
         # 1. Retrieve relevant context from memory
         context = await self._retrieve_context(perception_data)
         
-        # 2. Perform multi-step reasoning
-        analysis = await self._reason_about_content(perception_data, context)
-        
-        # 3. Check compliance and business rules
-        compliance = await self._check_compliance(perception_data, analysis)
-        
-        # 4. Generate insights and recommendations
-        insights = await self._generate_insights(analysis, compliance)
+        fallbacks = None
+        if self.fused:
+            # 2-4. Reasoning, compliance and insights in one call, with per-section fallback
+            analysis, compliance, insights, fallbacks = await self._fused_analysis(
+                perception_data, context, on_section
+            )
+        else:
+            # 2. Perform multi-step reasoning, handing sections on as they stream in
+            analysis = await self._reason_about_content(perception_data, context, on_section)
+            
+            # 3. Check compliance and business rules
+            compliance = await self._check_compliance(perception_data, analysis)
+            
+            # 4. Generate insights and recommendations
+            insights = await self._generate_insights(analysis, compliance)
         
         # 5. Store results in memory
         await self._store_analysis_memory(perception_data, analysis, insights)
         
-        return {
+        result = {
             'analysis': analysis,
             'compliance_status': compliance,
             'insights': insights,
             'confidence_score': self._calculate_confidence(analysis)
         }
+        if fallbacks is not None:
+            # Fused sections that failed their schema and were redone separately, with why
+            result['fused_fallbacks'] = fallbacks
+        return result
     
-    async def _reason_about_content(self, data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _reason_about_content(self, data: Dict[str, Any], context: Dict[str, Any],
+                                    on_section: Optional[SectionHandler] = None) -> Dict[str, Any]:
         """Multi-step reasoning using chain-of-thought"""
+        chunks = split_document(data['extracted_text'], CHUNK_CHARS)
+        if len(chunks) > 1:
+            # Map: reason about each chunk concurrently; reduce: merge the partials
+            partials = await map_bounded(
+                chunks, lambda chunk: self._reason_about_chunk(data, chunk), CHUNK_CONCURRENCY
+            )
+            return await self._merge_reasoning(data, context, partials, on_section)
+        
+        reasoning_context = render_context({
+            'Entities': compact_entities(data['entities']),
+            'Historical Patterns': context.get('historical_patterns'),
+            'Similar Documents': rank_documents(context.get('similar_documents', []))
+        }, PROMPT_BUDGETS['reasoning'])
         reasoning_prompt = f"""
         Analyze this document using step-by-step reasoning:
         
         Document Type: {data['document_type']}
-        Content: {data['extracted_text'][:2000]}
-        Entities: {data['entities']}
-        Context: {context}
+        Content: {data['extracted_text']}
+        {reasoning_context}
         
         Reasoning Steps:
         1. Identify key information and relationships
@@ -52,17 +133,180 @@ class AnalysisAgent:
         Provide structured analysis with reasoning chain.
         """
         
-        response = self.bedrock.invoke_model(
-            modelId='anthropic.claude-3-sonnet-20240229-v1:0',
-            body=json.dumps({
+        return await self._stream_reasoning('reasoning', reasoning_prompt, on_section, REASONING_STEPS)
+    
+    async def _reason_about_chunk(self, data: Dict[str, Any], chunk: Chunk) -> Dict[str, Any]:
+        """Reason about one section; the prompt depends only on that section so it caches"""
+        entities = sorted({
+            (entity['Type'], entity['Text']) for entity in data['entities']
+            if chunk.start <= entity.get('BeginOffset', -1) < chunk.end
+        })
+        chunk_prompt = f"""
+        Analyze section {chunk.index + 1} of a {data['document_type']} using step-by-step reasoning:
+        
+        Content: {chunk.text}
+        Entities: {entities}
+        
+        Reasoning Steps:
+        1. Identify key information and relationships in this section
+        2. Note anything incomplete or inconsistent
+        3. Determine business implications
+        4. Identify potential risks or issues
+        
+        Provide structured analysis of this section with reasoning chain.
+        """
+        
+        response = await self.router.invoke(
+            'chunk_reasoning',
+            body={
                 'anthropic_version': 'bedrock-2023-05-31',
-                'messages': [{'role': 'user', 'content': reasoning_prompt}],
+                'messages': [{'role': 'user', 'content': chunk_prompt}],
+                'max_tokens': 1000
+            },
+            cache_kind='chunk_reasoning'
+        )
+        
+        return self._parse_reasoning_response(response)
+    
+    async def _merge_reasoning(self, data: Dict[str, Any], context: Dict[str, Any],
+                               partials: List[Dict[str, Any]],
+                               on_section: Optional[SectionHandler] = None) -> Dict[str, Any]:
+        """Reduce per-section analyses into one document-level analysis"""
+        merge_context = render_context({
+            'Section Analyses': partials,
+            'Historical Patterns': context.get('historical_patterns'),
+            'Similar Documents': rank_documents(context.get('similar_documents', []))
+        }, PROMPT_BUDGETS['merge'])
+        merge_prompt = f"""
+        Combine these section-by-section analyses of one {data['document_type']} into a single analysis:
+        
+        {merge_context}
+        
+        Reasoning Steps:
+        1. Reconcile key information and relationships across sections
+        2. Assess overall document completeness and accuracy
+        3. Determine business implications
+        4. Consolidate potential risks or issues
+        
+        Provide structured analysis with reasoning chain.
+        """
+        
+        return await self._stream_reasoning('merge', merge_prompt, on_section, REASONING_STEPS)
+    
+    async def _stream_reasoning(self, call_site: str, prompt: str, on_section: Optional[SectionHandler],
+                                steps: int) -> Dict[str, Any]:
+        """Stream a reasoning response, passing each completed section to on_section
+
+        The stream ends as soon as the model opens a step past the prompt's
+        last one; that opening is dropped from the reply.
+        """
+        splitter = SectionSplitter()
+        
+        async def on_text(delta: str) -> None:
+            for section in splitter.feed(delta):
+                await on_section(section)
+        
+        response = await self.router.invoke_stream(
+            call_site,
+            body={
+                'anthropic_version': 'bedrock-2023-05-31',
+                'messages': [{'role': 'user', 'content': prompt}],
                 'max_tokens': 2000
-            })
+            },
+            stop=stop_after_step(steps),
+            on_text=on_text if on_section is not None else None
         )
+        kept = None
+        if response['stop_reason'] == 'stop_condition':
+            # Only the text before the extra step counts, for the reply and the last section
+            kept = cut_after_step(message_text(response), steps)
+            response = message(kept, 'stop_condition')
+        if on_section is not None:
+            for section in splitter.finish(kept):
+                await on_section(section)
         
         return self._parse_reasoning_response(response)
     
+    async def _fused_analysis(self, data: Dict[str, Any], context: Dict[str, Any],
+                              on_section: Optional[SectionHandler] = None
+                              ) -> Tuple[Dict[str, Any], Dict[str, Any], Any, Dict[str, List[str]]]:
+        """Reasoning, compliance and insights from one structured-output call
+        
+        Long documents are still reasoned about chunk by chunk; the fused call
+        then takes the place of the merge. Sections that are missing or fail
+        their schema fall back to the separate calls; they are returned last
+        with their validation errors and counted in fused_fallbacks.
+        """
+        chunks = split_document(data['extracted_text'], CHUNK_CHARS)
+        partials = None
+        if len(chunks) > 1:
+            partials = await map_bounded(
+                chunks, lambda chunk: self._reason_about_chunk(data, chunk), CHUNK_CONCURRENCY
+            )
+        
+        fused_context = render_context({
+            'Section Analyses': partials,
+            'Entities': compact_entities(data['entities']),
+            'Historical Patterns': context.get('historical_patterns'),
+            'Similar Documents': rank_documents(context.get('similar_documents', []))
+        }, PROMPT_BUDGETS['fused'])
+        content = f"Content: {data['extracted_text']}" if partials is None else ''
+        fused_prompt = f"""
+        Analyze this {data['document_type']}, check its compliance and derive insights in one response:
+        
+        {content}
+        {fused_context}
+        
+        Reasoning Steps:
+        1. Identify key information and relationships
+        2. Assess document completeness and accuracy
+        3. Determine business implications
+        4. Identify potential risks or issues
+        
+        Verify:
+        - Required fields present
+        - Data format compliance
+        - Business rule adherence
+        - Regulatory requirements
+        
+        Respond with only a JSON object with the keys reasoning, compliance and insights,
+        matching this JSON Schema for each key: {json.dumps(FUSED_SECTIONS, separators=(',', ':'))}
+        """
+        
+        response = await self.router.invoke(
+            'fused',
+            body={
+                'anthropic_version': 'bedrock-2023-05-31',
+                'messages': [{'role': 'user', 'content': fused_prompt}],
+                'max_tokens': 3000
+            }
+        )
+        sections, errors = validate_sections(extract_json(message_text(response)), FUSED_SECTIONS)
+        if errors:
+            self.fused_fallbacks.update(errors.keys())
+        
+        # Valid sections go through the same parsers as the separate calls' replies
+        if 'reasoning' in sections:
+            reasoning = json.dumps(sections['reasoning'])
+            analysis = self._parse_reasoning_response(message(reasoning, 'end_turn'))
+            if on_section is not None:
+                await on_section(reasoning)
+        elif partials is not None:
+            analysis = await self._merge_reasoning(data, context, partials, on_section)
+        else:
+            analysis = await self._reason_about_content(data, context, on_section)
+        
+        if 'compliance' in sections:
+            compliance = self._parse_compliance_response(message(json.dumps(sections['compliance']), 'end_turn'))
+        else:
+            compliance = await self._check_compliance(data, analysis)
+        
+        if 'insights' in sections:
+            insights = sections['insights']
+        else:
+            insights = await self._generate_insights(analysis, compliance)
+        return analysis, compliance, insights, errors
+    
     async def _retrieve_context(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """RAG implementation with OpenSearch"""
         # Create embedding for semantic search
@@ -80,20 +324,28 @@ class AnalysisAgent:
             }
         }
         
-        # Execute search (simplified)
-        relevant_docs = await self._search_opensearch(search_query)
+        # Serve from the local index when it holds close matches,
+        # otherwise execute search (simplified) and keep the hits locally
+        relevant_docs = self.document_cache.lookup(embedding, k=5)
+        if relevant_docs is None:
+            relevant_docs = await self._search_opensearch(search_query)
+            self.document_cache.remember(relevant_docs)
         
         return {
             'similar_documents': relevant_docs,
             'historical_patterns': await self._get_historical_patterns(data['document_type'])
         }
     
+    async def _create_embedding(self, text: str) -> List[float]:
+        """Embed text through the shared, deduplicating embedding service"""
+        return await self.embeddings.embed(text)
+    
     async def _check_compliance(self, data: Dict[str, Any], analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Business rules and compliance checking"""
         compliance_prompt = f"""
         Check compliance for this {data['document_type']}:
         
-        Analysis: {analysis}
+        {render_context({'Analysis': analysis}, PROMPT_BUDGETS['compliance'])}
         
         Verify:
         - Required fields present
@@ -104,13 +356,14 @@ class AnalysisAgent:
         Return compliance status and any violations.
         """
         
-        response = self.bedrock.invoke_model(
-            modelId='anthropic.claude-3-sonnet-20240229-v1:0',
-            body=json.dumps({
+        response = await self.router.invoke(
+            'compliance',
+            body={
                 'anthropic_version': 'bedrock-2023-05-31',
                 'messages': [{'role': 'user', 'content': compliance_prompt}],
                 'max_tokens': 1000
-            })
+            },
+            cache_kind='compliance'
         )
         
         return self._parse_compliance_response(response)
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import random
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set
+
+from aws_clients import aws_resource
+
+BATCH_WRITE_LIMIT = 25
+
+
+class AuditWriteError(Exception):
+    """Raised when audit records are still unprocessed after every retry"""
+
+
+class AuditLogWriter:
+    """Buffers audit records and writes them with BatchWriteItem
+
+    A flush happens when max_batch records are waiting, flush_interval
+    seconds after the first buffered record, or when close() is called at
+    the end of an invocation. Unprocessed items are retried with jittered
+    exponential backoff; records are never dropped silently.
+    """
+
+    def __init__(self, table_name: str, dynamodb=None, max_batch: int = BATCH_WRITE_LIMIT,
+                 flush_interval: float = 1.0, max_retries: int = 6, base_delay: float = 0.05):
+        self.table_name = table_name
+        self.dynamodb = dynamodb or aws_resource('dynamodb')
+        self.max_batch = min(max_batch, BATCH_WRITE_LIMIT)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.batches_written = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+        self._failures: List[BaseException] = []
+
+    async def write(self, item: Dict[str, Any]) -> None:
+        """Buffer one record; never waits on DynamoDB"""
+        # The resource layer rejects floats, so numbers become Decimals
+        self._buffer.append(json.loads(json.dumps(item, default=str), parse_float=Decimal))
+        if len(self._buffer) >= self.max_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self._start_flush)
+
+    async def flush(self) -> None:
+        """Write everything buffered so far and wait for in-flight flushes"""
+        self._start_flush()
+        while self._flushes:
+            await asyncio.gather(*list(self._flushes), return_exceptions=True)
+        if self._failures:
+            failures, self._failures = self._failures, []
+            raise failures[0]
+
+    async def close(self) -> None:
+        """Flush before the handler returns"""
+        await self.flush()
+
+    def _start_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, self._buffer = self._buffer, []
+        for start in range(0, len(items), self.max_batch):
+            task = asyncio.get_running_loop().create_task(self._write_batch(items[start:start + self.max_batch]))
+            self._flushes.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._flushes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self._failures.append(task.exception())
+
+    async def _write_batch(self, items: List[Dict[str, Any]]) -> None:
+        requests = {self.table_name: [{'PutRequest': {'Item': item}} for item in items]}
+        for attempt in range(self.max_retries + 1):
+            response = await asyncio.to_thread(self.dynamodb.batch_write_item, RequestItems=requests)
+            requests = response.get('UnprocessedItems') or {}
+            if not requests:
+                self.batches_written += 1
+                return
+            if attempt < self.max_retries:
+                await asyncio.sleep(random.uniform(0, self.base_delay * 2 ** attempt))
+        raise AuditWriteError(
+            f"{len(requests.get(self.table_name, []))} audit records unprocessed after {self.max_retries} retries"
+        )
@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from cold_start import LAZY_INIT, lazy_import
+
+boto3 = lazy_import('boto3')
+botocore_config = lazy_import('botocore.config')
+
+AWS_MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '50'))
+AWS_CONNECT_TIMEOUT = float(os.environ.get('AWS_CONNECT_TIMEOUT', '5'))
+AWS_READ_TIMEOUT = float(os.environ.get('AWS_READ_TIMEOUT', '60'))
+# Their throttles must reach the adaptive rate controllers rather than being
+# absorbed by botocore's own retries
+RATE_CONTROLLED_SERVICES = ('bedrock-runtime', 'textract', 'comprehend')
+
+
+def default_config():
+    """Keep-alive connections and a pool large enough for the agents' worker threads"""
+    return botocore_config.Config(
+        max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        connect_timeout=AWS_CONNECT_TIMEOUT,
+        read_timeout=AWS_READ_TIMEOUT,
+        retries={'mode': 'standard'}
+    )
+
+
+class AWSClientRegistry:
+    """One boto3 session and one client per service for the whole process
+
+    Clients are built on first use and then reused for every later request,
+    so a warm Lambda keeps its credentials and TLS connections. Construction
+    time is recorded per service. Pricing each reuse at it gives only an
+    upper bound on the time saved: the recorded cold construction also
+    loads the service model, which a rebuilt client would find cached.
+    """
+
+    def __init__(self, session=None, config=None):
+        # Built on first use, so importing boto3 waits until a client is needed
+        self._session = session
+        self._config = config
+        self.construction_seconds: Dict[Tuple[str, str], float] = {}
+        self.reuses = Counter()
+        self._instances: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+        self._request_start = (0, 0.0)
+
+    def client(self, service: str):
+        return self._get('client', service)
+
+    def resource(self, service: str):
+        return self._get('resource', service)
+
+    def _get(self, kind: str, service: str):
+        key = (kind, service)
+        instance = self._instances.get(key)
+        if instance is not None:
+            self.reuses[key] += 1
+            return instance
+        # Sessions are not thread-safe, and agents call clients from worker threads
+        with self._lock:
+            if key not in self._instances:
+                if self._session is None:
+                    self._session = boto3.session.Session()
+                if self._config is None:
+                    self._config = default_config()
+                start = time.perf_counter()
+                factory = self._session.client if kind == 'client' else self._session.resource
+                config = self._config
+                if kind == 'client' and service in RATE_CONTROLLED_SERVICES:
+                    config = config.merge(botocore_config.Config(retries={'mode': 'standard', 'total_max_attempts': 1}))
+                self._instances[key] = factory(service, config=config)
+                self.construction_seconds[key] = time.perf_counter() - start
+                return self._instances[key]
+        self.reuses[key] += 1
+        return self._instances[key]
+
+    def seconds_saved_upper_bound(self) -> float:
+        """Reuses priced at their service's cold construction time"""
+        return sum(self.construction_seconds[key] * count for key, count in self.reuses.items())
+
+    def start_request(self) -> None:
+        """Mark the start of an invocation for request_stats()"""
+        self._request_start = (sum(self.reuses.values()), self.seconds_saved_upper_bound())
+
+    def request_stats(self) -> Dict[str, Any]:
+        """Client reuse since start_request(), with an upper bound on the construction time it saved"""
+        reuses, saved = self._request_start
+        return {
+            'clients': len(self._instances),
+            'reused': sum(self.reuses.values()) - reuses,
+            'construction_ms_saved_upper_bound': round((self.seconds_saved_upper_bound() - saved) * 1000, 2),
+            'construction_ms_total': round(sum(self.construction_seconds.values()) * 1000, 2)
+        }
+
+
+class LazyClient:
+    """Stands in for a client, resource or table and fetches it on first attribute access"""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._instance = None
+
+    def __getattr__(self, name: str):
+        return getattr(self._resolve(), name)
+
+    def _resolve(self):
+        if self._instance is None:
+            self._instance = self._factory()
+        return self._instance
+
+
+_shared_registry: Optional[AWSClientRegistry] = None
+
+
+def get_aws_clients() -> AWSClientRegistry:
+    """Return the process-wide registry; it outlives warm Lambda invocations"""
+    global _shared_registry
+    if _shared_registry is None:
+        _shared_registry = AWSClientRegistry()
+    return _shared_registry
+
+
+def aws_client(service: str) -> LazyClient:
+    registry = get_aws_clients()
+    return _proxy(lambda: registry._get('client', service))
+
+
+def aws_resource(service: str) -> LazyClient:
+    registry = get_aws_clients()
+    return _proxy(lambda: registry._get('resource', service))
+
+
+def aws_table(table_name: str) -> LazyClient:
+    """DynamoDB Table on the shared resource; Table() itself is cheap once that exists"""
+    registry = get_aws_clients()
+    return _proxy(lambda: registry._get('resource', 'dynamodb').Table(table_name))
+
+
+def _proxy(factory: Callable[[], Any]) -> LazyClient:
+    proxy = LazyClient(factory)
+    if not LAZY_INIT:
+        # Eager mode builds the client while the agent is constructed
+        proxy._resolve()
+    return proxy
@@ -0,0 +1,121 @@
+import asyncio
+import bisect
+import hashlib
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+# Page breaks and section headings ("ARTICLE 4", "Section 2.1", "3. Payment")
+STRONG_BOUNDARY = re.compile(r'\f|\n(?=(?:ARTICLE|Article|SECTION|Section|\d+(?:\.\d+)*[.)]?)\s+[A-Z])')
+PARAGRAPH_BOUNDARY = re.compile(r'\n\s*\n')
+
+
+@dataclass
+class Chunk:
+    index: int
+    start: int
+    text: str
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.text)
+
+    @property
+    def key(self) -> str:
+        return hashlib.sha256(self.text.encode('utf-8')).hexdigest()
+
+
+def split_on_whitespace(text: str, max_chars: int) -> List[str]:
+    """Split text into pieces under max_chars, preferring whitespace boundaries"""
+    pieces = []
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            split = text.rfind(' ', start, end)
+            if split > start:
+                end = split
+        pieces.append(text[start:end])
+        start = end
+    return pieces
+
+
+def split_document(text: str, max_chars: int = 8000) -> List[Chunk]:
+    """Split text into chunks under max_chars on page or section boundaries
+
+    Falls back to paragraph breaks, then whitespace. Chunks are contiguous
+    slices, so chunk.start maps chunk offsets back to the full text.
+    """
+    strong = [m.start() + 1 for m in STRONG_BOUNDARY.finditer(text)]
+    paragraphs = [m.end() for m in PARAGRAPH_BOUNDARY.finditer(text)]
+    chunks = []
+    start = 0
+    while start < len(text):
+        limit = start + max_chars
+        if limit >= len(text):
+            end = len(text)
+        else:
+            end = _last_boundary(strong, start + max_chars // 2, limit) \
+                or _last_boundary(paragraphs, start, limit) \
+                or start + len(split_on_whitespace(text[start:limit + 1], max_chars)[0])
+        chunks.append(Chunk(len(chunks), start, text[start:end]))
+        start = end
+    return chunks
+
+
+def _last_boundary(boundaries: List[int], low: int, high: int) -> Optional[int]:
+    i = bisect.bisect_right(boundaries, high) - 1
+    if i >= 0 and boundaries[i] > low:
+        return boundaries[i]
+    return None
+
+
+async def map_bounded(items: List[Any], function: Callable[[Any], Awaitable[T]],
+                      concurrency: int) -> List[T]:
+    """Apply an async function to every item with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(item):
+        async with semaphore:
+            return await function(item)
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
+
+
+class ChunkCache:
+    """LRU of per-chunk results keyed by stage and chunk content"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._results: OrderedDict = OrderedDict()
+
+    def get(self, stage: str, chunk: Chunk) -> Optional[Any]:
+        key = (stage, chunk.key)
+        if key not in self._results:
+            self.misses += 1
+            return None
+        self._results.move_to_end(key)
+        self.hits += 1
+        return self._results[key]
+
+    def put(self, stage: str, chunk: Chunk, result: Any) -> None:
+        self._results[(stage, chunk.key)] = result
+        self._results.move_to_end((stage, chunk.key))
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+
+_shared_cache: Optional[ChunkCache] = None
+
+
+def get_chunk_cache() -> ChunkCache:
+    """Return the process-wide chunk cache, creating it on first use"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ChunkCache()
+    return _shared_cache
@@ -0,0 +1,52 @@
+import importlib
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+# Lazy mode defers heavy modules and AWS clients to first use; eager mode pays
+# for them during Lambda init, which suits provisioned concurrency
+LAZY_INIT = os.environ.get('AGENT_LAZY_INIT', '1') == '1'
+
+
+class LazyModule:
+    """Module stand-in that imports the real module on first attribute access"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute: str) -> Any:
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
+
+
+def lazy_import(name: str):
+    """Import a heavy module now in eager mode, or on first use in lazy mode"""
+    return LazyModule(name) if LAZY_INIT else importlib.import_module(name)
+
+
+class StartupProfiler:
+    """Splits an agent's cold start into named phases
+
+    The benchmark uses import, client_init and first_call, each measured
+    in a fresh interpreter so nothing is already loaded.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def as_dict(self) -> Dict[str, float]:
+        """Phase durations in milliseconds, plus their total"""
+        report = {name: round(seconds * 1000, 2) for name, seconds in self.phases.items()}
+        report['total'] = round(sum(self.phases.values()) * 1000, 2)
+        return report
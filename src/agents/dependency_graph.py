@@ -0,0 +1,19 @@
+from typing import Dict, Set
+
+# A dependency that ended with one of these skips everything waiting on it
+BLOCKING_STATUSES = {'failed', 'skipped'}
+
+
+def find_cycle_members(dependencies: Dict[int, Set[int]]) -> Set[int]:
+    """Indices that can never run because they sit on or behind a cycle"""
+    remaining = {i: set(waits_on) for i, waits_on in dependencies.items()}
+    ready = [i for i, waits_on in remaining.items() if not waits_on]
+    while ready:
+        done = ready.pop()
+        del remaining[done]
+        for i, waits_on in remaining.items():
+            if done in waits_on:
+                waits_on.discard(done)
+                if not waits_on:
+                    ready.append(i)
+    return set(remaining)
@@ -1,13 +1,29 @@
-import boto3
-import json
-from typing import Dict, Any, List
+import os
+from typing import Dict, Any, List, AsyncIterator, Tuple
+
+from aws_clients import aws_client
+from chunking import get_chunk_cache
+from entity_extraction import detect_entities_batched
+from local_classifier import DOCUMENT_TYPES, get_local_classifier
+from model_router import get_model_router
+from model_streaming import message_text, stop_on_label
+from rate_control import error_code, get_rate_controller
+from textract_blocks import BlockGraph
+from textract_jobs import iter_document_pages, may_be_multi_page, start_analysis
+
+ENTITY_CONCURRENCY = int(os.environ.get('ENTITY_CONCURRENCY', '4'))
 
 class DocumentPerceptionAgent:
     def __init__(self):
-        self.textract = boto3.client('textract')
-        self.bedrock = boto3.client('bedrock-runtime')
-        self.comprehend = boto3.client('comprehend')
-        self.s3 = boto3.client('s3')
+        self.textract = aws_client('textract')
+        self.router = get_model_router()
+        self.comprehend = aws_client('comprehend')
+        # Shared with every agent in the process, so throttling slows them all down
+        self.textract_control = get_rate_controller('textract')
+        self.comprehend_control = get_rate_controller('comprehend')
+        self.s3 = aws_client('s3')
+        self.chunk_cache = get_chunk_cache()
+        self.classifier = get_local_classifier()
     
     async def process_document(self, document_path: str) -> Dict[str, Any]:
         """Extract and understand document content"""
@@ -15,7 +31,7 @@ class DocumentPerceptionAgent:
         extracted_data = await self._extract_document_data(document_path)
         
         # 2. Classify document type
-        doc_type = await self._classify_document(extracted_data['text'])
+        doc_type, classified_by = await self._classify_document(extracted_data['text'])
         
         # 3. Extract entities and relationships
         entities = await self._extract_entities(extracted_data['text'])
@@ -23,54 +39,117 @@ class DocumentPerceptionAgent:
         # 4. Structure the perception results
         return {
             'document_type': doc_type,
+            'classified_by': classified_by,
             'extracted_text': extracted_data['text'],
             'tables': extracted_data['tables'],
+            'forms': extracted_data['forms'],
             'entities': entities,
             'confidence_scores': extracted_data['confidence']
         }
     
     async def _extract_document_data(self, document_path: str) -> Dict[str, Any]:
-        """Use Textract for document extraction"""
-        response = self.textract.analyze_document(
-            Document={'S3Object': {'Bucket': 'doc-bucket', 'Name': document_path}},
-            FeatureTypes=['TABLES', 'FORMS']
-        )
+        """Use Textract for document extraction
+
+        Every document tries the synchronous API first: it takes single-page
+        PDFs and TIFFs too, and only a multi-page file is rejected and sent
+        through an asynchronous job.
+        """
+        try:
+            response = await self.textract_control.run(
+                self.textract.analyze_document,
+                Document={'S3Object': {'Bucket': 'doc-bucket', 'Name': document_path}},
+                FeatureTypes=['TABLES', 'FORMS']
+            )
+        except Exception as e:
+            if may_be_multi_page(document_path) and error_code(e) == 'UnsupportedDocumentException':
+                return await self._extract_multi_page_data(document_path)
+            raise
+        
+        # Process Textract response: index the blocks once, read everything from the graph
+        graph = BlockGraph(response['Blocks'])
+        
+        return {
+            'text': graph.text(),
+            'tables': graph.tables(),
+            'forms': graph.forms(),
+            'confidence': graph.confidence()
+        }
+    
+    async def stream_document_pages(self, document_path: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield extraction results page by page from an asynchronous Textract job"""
+        job_id = await start_analysis(self.textract, 'doc-bucket', document_path,
+                                      rate_control=self.textract_control)
+        
+        async for page, graph in iter_document_pages(self.textract, job_id, rate_control=self.textract_control):
+            yield {
+                'page': page,
+                'text': graph.text(),
+                'tables': graph.tables(),
+                'forms': graph.forms(),
+                'confidence': graph.confidence(),
+                'confidence_count': graph.confidence_count(),
+                'block_count': len(graph.blocks)
+            }
+    
+    async def _extract_multi_page_data(self, document_path: str) -> Dict[str, Any]:
+        """Merge streamed pages, keeping only the extracted results in memory"""
+        texts, tables, forms = [], [], {}
+        confidence_total, confidence_count = 0.0, 0
         
-        # Process Textract response
-        text = self._extract_text_from_blocks(response['Blocks'])
-        tables = self._extract_tables_from_blocks(response['Blocks'])
+        async for page in self.stream_document_pages(document_path):
+            texts.append(page['text'])
+            tables.extend(page['tables'])
+            forms.update(page['forms'])
+            # Weighted by the blocks that carry a confidence, as in a single pass
+            confidence_total += page['confidence'] * page['confidence_count']
+            confidence_count += page['confidence_count']
         
         return {
-            'text': text,
+            'text': '\n'.join(texts),
             'tables': tables,
-            'confidence': self._calculate_confidence(response['Blocks'])
+            'forms': forms,
+            'confidence': confidence_total / confidence_count if confidence_count else 0.0
         }
     
-    async def _classify_document(self, text: str) -> str:
+    async def _classify_document(self, text: str) -> Tuple[str, str]:
+        """Classify document type locally, asking Bedrock only when unsure
+
+        Returns the label and what produced it, 'local' or 'model'.
+        """
+        label = self.classifier.classify(text)
+        if label is not None:
+            return label, 'local'
+        return await self._classify_with_model(text), 'model'
+    
+    async def _classify_with_model(self, text: str) -> str:
         """Use Bedrock to classify document type"""
         prompt = f"""
         Classify this document type based on content:
         {text[:1000]}...
         
-        Return one of: contract, invoice, report, correspondence, legal_document
+        Return one of: {', '.join(DOCUMENT_TYPES)}
         """
         
-        response = self.bedrock.invoke_model(
-            modelId='anthropic.claude-3-sonnet-20240229-v1:0',
-            body=json.dumps({
+        # The label is all we need, so stop the stream as soon as one appears;
+        # a fast-tier reply without one escalates to the larger model
+        has_label = stop_on_label(DOCUMENT_TYPES)
+        response = await self.router.invoke_stream(
+            'classification',
+            body={
                 'anthropic_version': 'bedrock-2023-05-31',
                 'messages': [{'role': 'user', 'content': prompt}],
                 'max_tokens': 100
-            })
+            },
+            validate=lambda reply: has_label(message_text(reply)),
+            stop=has_label,
+            cache_kind='classification'
         )
         
         return self._parse_classification(response)
     
     async def _extract_entities(self, text: str) -> List[Dict[str, Any]]:
-        """Extract named entities using Comprehend"""
-        response = self.comprehend.detect_entities(
-            Text=text[:5000],  # Comprehend limit
-            LanguageCode='en'
+        """Extract named entities using Comprehend over the whole text"""
+        return await detect_entities_batched(
+            self.comprehend, text, cache=self.chunk_cache, concurrency=ENTITY_CONCURRENCY,
+            rate_control=self.comprehend_control
         )
-        
-        return response['Entities']
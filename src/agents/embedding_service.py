@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from chunking import split_on_whitespace
+from model_client import AsyncModelClient, get_model_client
+
+EMBEDDING_MODEL_ID = 'amazon.titan-embed-text-v1'
+# Titan v1 accepts 8k tokens; stay well under it at ~4 characters per token
+MAX_INPUT_CHARS = 25000
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def pool_vectors(vectors: List[array], weights: List[int]) -> array:
+    """Length-weighted mean of chunk embeddings"""
+    total = float(sum(weights))
+    pooled = array('f', bytes(4 * len(vectors[0])))
+    for vector, weight in zip(vectors, weights):
+        scale = weight / total
+        for i, value in enumerate(vector):
+            pooled[i] += value * scale
+    return pooled
+
+
+class EmbeddingService:
+    """Deduplicating, cached Titan embedding client shared by agents and memory
+
+    Titan v1 takes one inputText per request, so there is nothing to batch:
+    each uncached text is sent at once, and concurrent requests for the
+    same text share that one call.
+    """
+
+    def __init__(self, model_client: Optional[AsyncModelClient] = None, max_entries: int = 4096):
+        self.model_client = model_client or get_model_client()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # Vectors are kept as float32 arrays: 6 KB per Titan embedding
+        self._vectors: OrderedDict = OrderedDict()
+        # In-flight fetches by text key; holding the task here also keeps it
+        # from being garbage collected while it runs
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed text, returning a plain list for JSON queries"""
+        return (await self.embed_array(text)).tolist()
+
+    async def embed_array(self, text: str) -> array:
+        """Embed text as a float32 array, chunking and pooling long inputs"""
+        if len(text) <= MAX_INPUT_CHARS:
+            return await self._embed_one(text)
+
+        key = text_key(text)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        chunks = split_on_whitespace(text, MAX_INPUT_CHARS)
+        vectors = await asyncio.gather(*(self._embed_one(chunk) for chunk in chunks))
+        pooled = pool_vectors(vectors, [len(chunk) for chunk in chunks])
+        self._store(key, pooled)
+        return pooled
+
+    async def embed_many(self, texts: List[str]) -> List[array]:
+        return list(await asyncio.gather(*(self.embed_array(text) for text in texts)))
+
+    async def _embed_one(self, text: str) -> array:
+        key = text_key(text)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        # Concurrent requests for the same text share one model call; a task
+        # left over from an earlier invocation's loop is not reused
+        loop = asyncio.get_running_loop()
+        task = self._pending.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(self._fetch(key, text))
+            self._pending[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: str, text: str) -> array:
+        self.misses += 1
+        response = await self.model_client.invoke(EMBEDDING_MODEL_ID, {'inputText': text})
+        # A reply without an embedding raises KeyError here, which reaches every waiter
+        vector = array('f', response['embedding'])
+        self._store(key, vector)
+        return vector
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._pending.get(key) is task:
+            del self._pending[key]
+        # Waiters that were cancelled leave the exception unread; mark it retrieved
+        if not task.cancelled():
+            task.exception()
+
+    def _lookup(self, key: str) -> Optional[array]:
+        vector = self._vectors.get(key)
+        if vector is not None:
+            self._vectors.move_to_end(key)
+            self.hits += 1
+        return vector
+
+    def _store(self, key: str, vector: array) -> None:
+        self._vectors[key] = vector
+        self._vectors.move_to_end(key)
+        while len(self._vectors) > self.max_entries:
+            self._vectors.popitem(last=False)
+
+
+_shared_service: Optional[EmbeddingService] = None
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Return the process-wide embedding service, creating it on first use"""
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = EmbeddingService()
+    return _shared_service
@@ -0,0 +1,137 @@
+import bisect
+import re
+from typing import Dict, Any, List, Optional
+
+from chunking import Chunk, ChunkCache, map_bounded
+from rate_control import RateController, run_blocking
+
+BATCH_SIZE = 25         # BatchDetectEntities TextList limit
+MAX_CHUNK_BYTES = 5000  # per-document UTF-8 limit in a batch
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+def sentence_chunks(text: str, max_bytes: int = MAX_CHUNK_BYTES) -> List[Chunk]:
+    """Pack whole sentences into contiguous chunks under max_bytes of UTF-8"""
+    boundaries = [m.end() for m in SENTENCE_END.finditer(text)] + [len(text)]
+    chunks = []
+    start = end = 0
+    for boundary in boundaries:
+        if boundary <= end:
+            continue
+        if end > start and _utf8_len(text, start, boundary) > max_bytes:
+            chunks.append(Chunk(len(chunks), start, text[start:end]))
+            start = end
+        end = boundary
+        # A single sentence over the limit is cut on whitespace
+        while _utf8_len(text, start, end) > max_bytes:
+            cut = _fit(text, start, end, max_bytes)
+            chunks.append(Chunk(len(chunks), start, text[start:cut]))
+            start = cut
+    if end > start:
+        chunks.append(Chunk(len(chunks), start, text[start:end]))
+    return chunks
+
+
+def merge_entities(entities: List[Dict[str, Any]], text: str, borders: List[int]) -> List[Dict[str, Any]]:
+    """Merge overlapping same-type entities and ones split at a chunk border"""
+    borders = sorted(borders)
+    merged: List[Dict[str, Any]] = []
+    for entity in sorted(entities, key=lambda e: (e['BeginOffset'], e['EndOffset'])):
+        previous = merged[-1] if merged else None
+        if previous is not None and previous['Type'] == entity['Type'] and (
+            entity['BeginOffset'] < previous['EndOffset']
+            or _split_at_border(previous, entity, text, borders)
+        ):
+            previous['EndOffset'] = max(previous['EndOffset'], entity['EndOffset'])
+            previous['Text'] = text[previous['BeginOffset']:previous['EndOffset']]
+            previous['Score'] = max(previous['Score'], entity['Score'])
+            continue
+        merged.append(dict(entity))
+    return merged
+
+
+async def detect_entities_batched(comprehend, text: str, cache: Optional[ChunkCache] = None,
+                                  concurrency: int = 4, language_code: str = 'en',
+                                  rate_control: Optional[RateController] = None) -> List[Dict[str, Any]]:
+    """Full-text entities via BatchDetectEntities, 25 sentence-aligned chunks per call
+
+    Per-chunk results are cached chunk-relative, so only unseen chunks are
+    sent. Offsets in the result refer to the full text. Calls go through
+    rate_control, when given, so throttled batches are retried.
+    """
+    chunks = sentence_chunks(text)
+    results: Dict[int, List[Dict[str, Any]]] = {}
+    misses = []
+    for chunk in chunks:
+        if not chunk.text.strip():
+            results[chunk.index] = []
+            continue
+        cached = cache.get('entities', chunk) if cache else None
+        if cached is None:
+            misses.append(chunk)
+        else:
+            results[chunk.index] = cached
+
+    batches = [misses[i:i + BATCH_SIZE] for i in range(0, len(misses), BATCH_SIZE)]
+    for batch_results in await map_bounded(
+        batches, lambda batch: _detect_batch(comprehend, batch, language_code, rate_control), concurrency
+    ):
+        for chunk, chunk_entities in batch_results:
+            results[chunk.index] = chunk_entities
+            if cache:
+                cache.put('entities', chunk, chunk_entities)
+
+    entities = []
+    for chunk in chunks:
+        for entity in results[chunk.index]:
+            entities.append({
+                **entity,
+                'BeginOffset': entity['BeginOffset'] + chunk.start,
+                'EndOffset': entity['EndOffset'] + chunk.start
+            })
+    return merge_entities(entities, text, [chunk.start for chunk in chunks[1:]])
+
+
+async def _detect_batch(comprehend, batch: List[Chunk], language_code: str,
+                        rate_control: Optional[RateController] = None):
+    response = await run_blocking(
+        rate_control,
+        comprehend.batch_detect_entities,
+        TextList=[chunk.text for chunk in batch],
+        LanguageCode=language_code
+    )
+    results = [(batch[item['Index']], item['Entities']) for item in response['ResultList']]
+
+    # Items the batch rejected get one individual retry
+    for error in response.get('ErrorList', []):
+        chunk = batch[error['Index']]
+        retry = await run_blocking(
+            rate_control, comprehend.detect_entities, Text=chunk.text, LanguageCode=language_code
+        )
+        results.append((chunk, retry['Entities']))
+    return results
+
+
+def _split_at_border(previous: Dict[str, Any], entity: Dict[str, Any], text: str, borders: List[int]) -> bool:
+    gap = text[previous['EndOffset']:entity['BeginOffset']]
+    if gap.strip():
+        return False
+    i = bisect.bisect_left(borders, previous['EndOffset'])
+    return i < len(borders) and borders[i] <= entity['BeginOffset']
+
+
+def _utf8_len(text: str, start: int, end: int) -> int:
+    return len(text[start:end].encode('utf-8'))
+
+
+def _fit(text: str, start: int, end: int, max_bytes: int) -> int:
+    """Furthest whitespace cut after start that keeps text[start:cut] under max_bytes"""
+    low, high = start + 1, end
+    while low < high:
+        middle = (low + high + 1) // 2
+        if _utf8_len(text, start, middle) <= max_bytes:
+            low = middle
+        else:
+            high = middle - 1
+    space = text.rfind(' ', start, low)
+    return space if space > start else low
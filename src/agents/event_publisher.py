@@ -0,0 +1,140 @@
+import asyncio
+import os
+import random
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from aws_clients import aws_client
+
+PUT_EVENTS_LIMIT = 10
+PUT_EVENTS_MAX_BYTES = 256 * 1024
+DEFAULT_LINGER = float(os.environ.get('EVENT_PUBLISH_LINGER_MS', '5')) / 1000
+
+
+class EventPublishError(Exception):
+    """Raised when an event is rejected or still failing after every retry"""
+
+
+def entry_size(entry: Dict[str, Any]) -> int:
+    """PutEvents entry size as EventBridge counts it towards the 256 KB limit"""
+    size = 14 if entry.get('Time') is not None else 0
+    for name in ('Source', 'DetailType', 'Detail'):
+        size += len(entry.get(name, '').encode('utf-8'))
+    size += sum(len(resource.encode('utf-8')) for resource in entry.get('Resources', ()))
+    return size
+
+
+@dataclass
+class _Buffer:
+    entries: List[Tuple[Dict[str, Any], asyncio.Future]] = field(default_factory=list)
+    size: int = 0
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+class EventPublisher:
+    """Groups events into PutEvents calls of up to 10 entries and 256 KB
+
+    Events published within the linger window share a call, so a fan-out
+    burst costs one round trip instead of one per task. Entries EventBridge
+    reports as failed are retried on their own with jittered backoff; the
+    rest of the batch is not resent. The publisher is shared by the process,
+    so each event loop (one per warm invocation) gets its own buffer and
+    linger timer.
+    """
+
+    def __init__(self, events=None, linger: float = DEFAULT_LINGER,
+                 max_retries: int = 4, base_delay: float = 0.05):
+        self.events = events or aws_client('events')
+        self.linger = linger
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.calls = 0
+        # Futures and timers belong to one loop, so buffers are kept per loop
+        self._buffers = weakref.WeakKeyDictionary()
+
+    async def publish(self, entry: Dict[str, Any]) -> str:
+        """Queue one entry and return its EventId once EventBridge accepts it"""
+        size = entry_size(entry)
+        if size > PUT_EVENTS_MAX_BYTES:
+            raise EventPublishError(f"Event of {size} bytes exceeds the {PUT_EVENTS_MAX_BYTES} byte limit")
+
+        loop = asyncio.get_running_loop()
+        buffer = self._buffers.get(loop)
+        if buffer is None:
+            buffer = self._buffers[loop] = _Buffer()
+        if buffer.size + size > PUT_EVENTS_MAX_BYTES:
+            self._start_flush()
+        future = loop.create_future()
+        buffer.entries.append((entry, future))
+        buffer.size += size
+        if len(buffer.entries) >= PUT_EVENTS_LIMIT:
+            self._start_flush()
+        elif buffer.timer is None:
+            buffer.timer = loop.call_later(self.linger, self._start_flush)
+        return await future
+
+    async def publish_many(self, entries: List[Dict[str, Any]]) -> List[str]:
+        return list(await asyncio.gather(*(self.publish(entry) for entry in entries)))
+
+    def _start_flush(self) -> None:
+        loop = asyncio.get_running_loop()
+        buffer = self._buffers.get(loop)
+        if buffer is None:
+            return
+        if buffer.timer is not None:
+            buffer.timer.cancel()
+            buffer.timer = None
+        if buffer.entries:
+            batch, buffer.entries, buffer.size = buffer.entries, [], 0
+            loop.create_task(self._send(batch))
+
+    async def _send(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        for attempt in range(self.max_retries + 1):
+            # Waiters that gave up need no delivery
+            batch = [(entry, future) for entry, future in batch if not future.done()]
+            if not batch:
+                return
+            try:
+                self.calls += 1
+                response = await asyncio.to_thread(
+                    self.events.put_events, Entries=[entry for entry, _ in batch]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            # Result entries line up with request entries by position
+            failed = []
+            for (entry, future), result in zip(batch, response.get('Entries', [])):
+                if future.done():
+                    continue
+                if 'EventId' in result and not result.get('ErrorCode'):
+                    future.set_result(result['EventId'])
+                else:
+                    failed.append(((entry, future), result))
+            if not failed:
+                return
+            batch = [pair for pair, _ in failed]
+            if attempt < self.max_retries:
+                await asyncio.sleep(random.uniform(0, self.base_delay * 2 ** attempt))
+
+        for (_, future), result in failed:
+            if not future.done():
+                future.set_exception(EventPublishError(
+                    f"{result.get('ErrorCode', 'Unknown')}: {result.get('ErrorMessage', '')} "
+                    f"after {self.max_retries} retries"
+                ))
+
+
+_shared_publisher: Optional[EventPublisher] = None
+
+
+def get_event_publisher() -> EventPublisher:
+    """Return the process-wide EventBridge publisher"""
+    global _shared_publisher
+    if _shared_publisher is None:
+        _shared_publisher = EventPublisher()
+    return _shared_publisher
@@ -0,0 +1,164 @@
+import json
+import math
+import os
+import random
+import re
+import zlib
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from cold_start import lazy_import
+
+np = lazy_import('numpy')
+
+DOCUMENT_TYPES = ('contract', 'invoice', 'report', 'correspondence', 'legal_document')
+# 2^18 hashed features x 5 labels of float32 weights is 5 MB
+N_FEATURES = 2 ** 18
+# Below this confidence the caller should ask the model instead
+LOCAL_CLASSIFIER_THRESHOLD = float(os.environ.get('LOCAL_CLASSIFIER_THRESHOLD', '0.95'))
+# The label is decided by the opening of a document, as in the model prompt
+MAX_CHARS = 2000
+
+TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def hashed_counts(text: str, n_features: int = N_FEATURES) -> Dict[int, int]:
+    """Counts of hashed word unigrams and bigrams; crc32 keeps them stable across processes"""
+    tokens = TOKEN.findall(text[:MAX_CHARS].lower())
+    counts: Dict[int, int] = {}
+    for gram in tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]:
+        feature = zlib.crc32(gram.encode('utf-8')) % n_features
+        counts[feature] = counts.get(feature, 0) + 1
+    return counts
+
+
+class LocalClassifier:
+    """Hashed n-gram TF-IDF with a softmax linear model, for labels that are easy to tell apart
+
+    predict() returns the label and its probability; callers treat anything
+    under threshold as unknown and fall back to the model. An untrained
+    classifier always returns (None, 0.0).
+    """
+
+    def __init__(self, labels: Sequence[str] = DOCUMENT_TYPES, n_features: int = N_FEATURES,
+                 threshold: float = LOCAL_CLASSIFIER_THRESHOLD):
+        self.labels = list(labels)
+        self.n_features = n_features
+        self.threshold = threshold
+        # Allocated by fit() or load(), so importing this module stays cheap
+        self._idf: Optional[np.ndarray] = None
+        self._weights: Optional[np.ndarray] = None
+        self._bias: Optional[np.ndarray] = None
+
+    @property
+    def trained(self) -> bool:
+        return self._weights is not None
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """Most likely label and its probability"""
+        if not self.trained:
+            return None, 0.0
+        rows, values = self._vectorize(hashed_counts(text, self.n_features))
+        if len(rows) == 0:
+            return None, 0.0
+        probabilities = self._softmax(values @ self._weights[rows] + self._bias)
+        best = int(np.argmax(probabilities))
+        return self.labels[best], float(probabilities[best])
+
+    def classify(self, text: str) -> Optional[str]:
+        """The label when it clears the threshold, else None"""
+        label, confidence = self.predict(text)
+        return label if confidence >= self.threshold else None
+
+    def fit(self, examples: Iterable[Tuple[str, str]], epochs: int = 8,
+            learning_rate: float = 0.5, seed: int = 0) -> int:
+        """Train from (text, label) pairs with SGD on cross-entropy; returns the number used"""
+        documents = [(hashed_counts(text, self.n_features), self.labels.index(label))
+                     for text, label in examples if label in self.labels]
+        if not documents:
+            return 0
+        document_frequency = np.zeros(self.n_features, dtype=np.float32)
+        for counts, _ in documents:
+            document_frequency[list(counts)] += 1
+        self._idf = (np.log((1 + len(documents)) / (1 + document_frequency)) + 1).astype(np.float32)
+        self._weights = np.zeros((self.n_features, len(self.labels)), dtype=np.float32)
+        self._bias = np.zeros(len(self.labels), dtype=np.float32)
+
+        vectors = [(self._vectorize(counts), target) for counts, target in documents]
+        order = list(range(len(vectors)))
+        shuffle = random.Random(seed).shuffle
+        for epoch in range(epochs):
+            shuffle(order)
+            rate = learning_rate / math.sqrt(1 + epoch)
+            for i in order:
+                (rows, values), target = vectors[i]
+                gradient = self._softmax(values @ self._weights[rows] + self._bias)
+                gradient[target] -= 1
+                self._weights[rows] -= rate * np.outer(values, gradient)
+                self._bias -= rate * gradient
+        return len(documents)
+
+    def save(self, directory: str) -> None:
+        """Write the weights as .npy arrays plus a JSON sidecar"""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, 'weights.npy'), self._weights)
+        np.save(os.path.join(directory, 'idf.npy'), self._idf)
+        with open(os.path.join(directory, 'classifier.json'), 'w') as f:
+            json.dump({'labels': self.labels, 'n_features': self.n_features,
+                       'bias': self._bias.tolist()}, f)
+
+    @classmethod
+    def load(cls, directory: str, threshold: float = LOCAL_CLASSIFIER_THRESHOLD) -> 'LocalClassifier':
+        """Load a saved classifier; weights stay memory-mapped"""
+        with open(os.path.join(directory, 'classifier.json')) as f:
+            header = json.load(f)
+        classifier = cls(header['labels'], header['n_features'], threshold)
+        classifier._weights = np.load(os.path.join(directory, 'weights.npy'), mmap_mode='r')
+        classifier._idf = np.load(os.path.join(directory, 'idf.npy'))
+        classifier._bias = np.asarray(header['bias'], dtype=np.float32)
+        return classifier
+
+    def _vectorize(self, counts: Dict[int, int]) -> Tuple['np.ndarray', 'np.ndarray']:
+        rows = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        # Sublinear term frequency, scaled by IDF and L2-normalised
+        values = (1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))) * self._idf[rows]
+        norm = np.linalg.norm(values)
+        return rows, values / norm if norm else values
+
+    @staticmethod
+    def _softmax(scores: 'np.ndarray') -> 'np.ndarray':
+        exp = np.exp(scores - scores.max())
+        return exp / exp.sum()
+
+
+def examples_from_episodes(episodes: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, str]]:
+    """(text, label) pairs from episodes recording a model-labelled perception result
+
+    Labels the local classifier produced itself are skipped, so it never
+    trains on its own mistakes.
+    """
+    for episode in episodes:
+        response = episode.get('agent_response')
+        if not isinstance(response, dict) or response.get('classified_by') != 'model':
+            continue
+        text = response.get('extracted_text') or episode.get('user_request')
+        if text and response.get('document_type') in DOCUMENT_TYPES:
+            yield text, response['document_type']
+
+
+_shared_classifier: Optional[LocalClassifier] = None
+
+
+def get_local_classifier() -> LocalClassifier:
+    """Return the process-wide classifier
+
+    When LOCAL_CLASSIFIER_DIR holds a saved classifier it is loaded from
+    there; otherwise the classifier is untrained and every call falls back.
+    """
+    global _shared_classifier
+    if _shared_classifier is None:
+        directory = os.environ.get('LOCAL_CLASSIFIER_DIR', '')
+        if directory and os.path.exists(os.path.join(directory, 'classifier.json')):
+            _shared_classifier = LocalClassifier.load(directory)
+        else:
+            _shared_classifier = LocalClassifier()
+    return _shared_classifier
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Any, Optional
+
+from aws_clients import aws_client
+from model_streaming import StopCondition, decode_event, message, message_text
+from rate_control import RateController, get_rate_controller
+from response_cache import ResponseCache, cache_from_env, cache_key
+
+DEFAULT_MODEL_CONCURRENCY = int(os.environ.get('MODEL_CONCURRENCY', '4'))
+MODEL_MAX_WORKERS = int(os.environ.get('MODEL_MAX_WORKERS', '32'))
+
+
+class AsyncModelClient:
+    """Shared Bedrock client that keeps invoke_model off the event loop"""
+
+    def __init__(self, bedrock=None, concurrency: Optional[Dict[str, int]] = None,
+                 default_concurrency: int = DEFAULT_MODEL_CONCURRENCY,
+                 cache: Optional[ResponseCache] = None,
+                 rate_control: Optional[Callable[[str], RateController]] = None):
+        self.bedrock = bedrock or aws_client('bedrock-runtime')
+        self.cache = cache
+        # Maps a model id to its rate controller; None sends calls unthrottled
+        self.rate_control = rate_control
+        self.concurrency = concurrency or {}
+        self.default_concurrency = default_concurrency
+        self.streams_stopped = 0
+        self._executor = ThreadPoolExecutor(max_workers=MODEL_MAX_WORKERS, thread_name_prefix='bedrock')
+        # asyncio primitives are bound to one loop, and each Lambda invocation
+        # may run its own, so semaphores are kept per loop
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    async def invoke(self, model_id: str, body: Dict[str, Any],
+                     cache_kind: Optional[str] = None) -> Dict[str, Any]:
+        """Invoke a model without blocking the loop and return the decoded body
+
+        Passing cache_kind serves repeated prompts from the response cache,
+        using that kind's TTL.
+        """
+        loop = asyncio.get_running_loop()
+        if cache_kind is None or self.cache is None:
+            return await self._invoke(loop, model_id, body)
+
+        key = cache_key(model_id, body)
+        cached = self.cache.get_local(key, cache_kind)
+        if cached is None:
+            cached = await loop.run_in_executor(self._executor, self.cache.get_shared, key, cache_kind)
+        if cached is not None:
+            return cached
+
+        response = await self._invoke(loop, model_id, body)
+        self.cache.put(key, cache_kind, response)
+        await loop.run_in_executor(self._executor, self.cache.put_shared, key, cache_kind, response)
+        return response
+
+    async def invoke_stream(self, model_id: str, body: Dict[str, Any], stop: Optional[StopCondition] = None,
+                            on_text: Optional[Callable[[str], Awaitable[None]]] = None,
+                            cache_kind: Optional[str] = None) -> Dict[str, Any]:
+        """Stream a model's output, ending it as soon as stop(text so far) holds
+
+        on_text is awaited with each text delta as it arrives, while the
+        stream is held open, so it should hand off rather than do slow work.
+        Closing the stream early stops generation: the tokens after the stop
+        point are neither waited for nor billed. Returns an invoke_model
+        shaped body whose stop_reason is 'stop_condition' when stop ended
+        it. A cached response reaches on_text in one piece, so a cache_kind
+        should only be shared by call sites with the same stop condition.
+        """
+        loop = asyncio.get_running_loop()
+        key = None
+        if cache_kind is not None and self.cache is not None:
+            key = cache_key(model_id, body)
+            cached = self.cache.get_local(key, cache_kind)
+            if cached is None:
+                cached = await loop.run_in_executor(self._executor, self.cache.get_shared, key, cache_kind)
+            if cached is not None:
+                if on_text is not None:
+                    await on_text(message_text(cached))
+                return cached
+
+        text, stop_reason = '', None
+        async with self._semaphore(loop, model_id):
+            # Throttling surfaces when the stream opens, so only that is rate controlled
+            stream = await self._rate_limited(model_id, lambda: loop.run_in_executor(
+                self._executor, self._invoke_stream_sync, model_id, body
+            ))
+            events = iter(stream)
+            try:
+                while True:
+                    event = await loop.run_in_executor(self._executor, next, events, None)
+                    if event is None:
+                        break
+                    delta, reason = decode_event(event)
+                    stop_reason = reason or stop_reason
+                    if not delta:
+                        continue
+                    text += delta
+                    if on_text is not None:
+                        await on_text(delta)
+                    if stop is not None and stop(text):
+                        stop_reason = 'stop_condition'
+                        self.streams_stopped += 1
+                        break
+            finally:
+                stream.close()
+
+        response = message(text, stop_reason)
+        if key is not None:
+            self.cache.put(key, cache_kind, response)
+            await loop.run_in_executor(self._executor, self.cache.put_shared, key, cache_kind, response)
+        return response
+
+    async def _invoke(self, loop: asyncio.AbstractEventLoop, model_id: str,
+                      body: Dict[str, Any]) -> Dict[str, Any]:
+        async with self._semaphore(loop, model_id):
+            return await self._rate_limited(model_id, lambda: loop.run_in_executor(
+                self._executor, self._invoke_sync, model_id, body
+            ))
+
+    async def _rate_limited(self, model_id: str, request: Callable[[], Awaitable[Any]]) -> Any:
+        if self.rate_control is None:
+            return await request()
+        return await self.rate_control(model_id).call(request)
+
+    def _invoke_sync(self, model_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        response = self.bedrock.invoke_model(
+            modelId=model_id,
+            body=json.dumps(body)
+        )
+        return json.loads(response['body'].read())
+
+    def _invoke_stream_sync(self, model_id: str, body: Dict[str, Any]):
+        response = self.bedrock.invoke_model_with_response_stream(
+            modelId=model_id,
+            body=json.dumps(body)
+        )
+        return response['body']
+
+    def _semaphore(self, loop: asyncio.AbstractEventLoop, model_id: str) -> asyncio.Semaphore:
+        semaphores = self._semaphores.setdefault(loop, {})
+        if model_id not in semaphores:
+            limit = self.concurrency.get(model_id, self.default_concurrency)
+            semaphores[model_id] = asyncio.Semaphore(limit)
+        return semaphores[model_id]
+
+
+_shared_client: Optional[AsyncModelClient] = None
+
+
+def get_model_client() -> AsyncModelClient:
+    """Return the process-wide model client, creating it on first use"""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = AsyncModelClient(
+            cache=cache_from_env(),
+            rate_control=lambda model_id: get_rate_controller(f'bedrock:{model_id}')
+        )
+    return _shared_client
@@ -0,0 +1,138 @@
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from model_client import AsyncModelClient, get_model_client
+from model_streaming import message_text
+from structured_output import extract_json
+
+# Cheapest first; a call escalates along this order
+TIER_ORDER = ('fast', 'large')
+TIER_MODELS = {
+    'fast': os.environ.get('MODEL_FAST_ID', 'anthropic.claude-3-haiku-20240307-v1:0'),
+    'large': os.environ.get('MODEL_LARGE_ID', 'anthropic.claude-3-sonnet-20240229-v1:0'),
+}
+# Short, constrained outputs go to the fast tier; open-ended reasoning to the large one
+CALL_SITE_TIERS = {
+    'classification': 'fast',
+    'actions': 'fast',
+    'decomposition': 'large',
+    'reasoning': 'large',
+    'chunk_reasoning': 'large',
+    'merge': 'large',
+    'compliance': 'large',
+    'fused': 'large',
+}
+MIN_CONFIDENCE = float(os.environ.get('MODEL_MIN_CONFIDENCE', '0.7'))
+LATENCY_SAMPLES = 1000
+
+# Called with the reply; False sends the call to the next tier
+Validator = Callable[[Dict[str, Any]], bool]
+
+
+def site_tier(call_site: str) -> str:
+    """Tier for a call site; MODEL_TIER_<SITE> overrides the default"""
+    return os.environ.get(f'MODEL_TIER_{call_site.upper()}', CALL_SITE_TIERS.get(call_site, 'large'))
+
+
+def json_reply(min_confidence: float = MIN_CONFIDENCE) -> Validator:
+    """Valid when the reply parses as JSON and any top-level confidence clears min_confidence"""
+    def validate(response: Dict[str, Any]) -> bool:
+        payload = extract_json(message_text(response))
+        if payload is None:
+            return False
+        confidence = payload.get('confidence') if isinstance(payload, dict) else None
+        return not isinstance(confidence, (int, float)) or confidence >= min_confidence
+    return validate
+
+
+@dataclass
+class _TierStats:
+    calls: int = 0
+    escalated: int = 0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+
+class ModelRouter:
+    """Routes each call site to a model tier and escalates replies that fail validation
+
+    A call starts on its site's tier. When a validator rejects the reply, or
+    the call raises, the same request goes to the next tier up; only the
+    largest tier's failures reach the caller. Latency and escalations are
+    recorded per call site and tier.
+    """
+
+    def __init__(self, client: Optional[AsyncModelClient] = None, models: Optional[Dict[str, str]] = None):
+        self.client = client or get_model_client()
+        self.models = models or TIER_MODELS
+        self._stats: Dict[str, Dict[str, _TierStats]] = {}
+
+    def model_for(self, call_site: str) -> str:
+        """Model a call site starts on"""
+        return self.models[self._escalation_path(call_site)[0]]
+
+    async def invoke(self, call_site: str, body: Dict[str, Any], validate: Optional[Validator] = None,
+                     cache_kind: Optional[str] = None) -> Dict[str, Any]:
+        """invoke_model on the site's tier, escalating when validate rejects the reply"""
+        return await self._route(call_site, validate, lambda model_id: self.client.invoke(
+            model_id=model_id, body=body, cache_kind=cache_kind
+        ))
+
+    async def invoke_stream(self, call_site: str, body: Dict[str, Any], validate: Optional[Validator] = None,
+                            **stream_kwargs) -> Dict[str, Any]:
+        """Streaming counterpart of invoke; on_text sees the deltas of every attempt"""
+        return await self._route(call_site, validate, lambda model_id: self.client.invoke_stream(
+            model_id=model_id, body=body, **stream_kwargs
+        ))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per call site and tier: calls, p50/p95 latency and escalation rate"""
+        report = {}
+        for call_site, tiers in self._stats.items():
+            report[call_site] = {}
+            for tier, stats in tiers.items():
+                latencies = sorted(stats.latencies)
+                report[call_site][tier] = {
+                    'calls': stats.calls,
+                    'p50_ms': round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+                    'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None,
+                    'escalation_rate': round(stats.escalated / stats.calls, 3) if stats.calls else 0.0
+                }
+        return report
+
+    async def _route(self, call_site: str, validate: Optional[Validator], call) -> Dict[str, Any]:
+        tiers = self._escalation_path(call_site)
+        for position, tier in enumerate(tiers):
+            last = position == len(tiers) - 1
+            stats = self._stats.setdefault(call_site, {}).setdefault(tier, _TierStats())
+            stats.calls += 1
+            start = time.perf_counter()
+            try:
+                response = await call(self.models[tier])
+            except Exception:
+                if last:
+                    raise
+                stats.escalated += 1
+                continue
+            finally:
+                stats.latencies.append(time.perf_counter() - start)
+            if last or validate is None or validate(response):
+                return response
+            stats.escalated += 1
+
+    def _escalation_path(self, call_site: str) -> List[str]:
+        tier = site_tier(call_site)
+        return [candidate for candidate in TIER_ORDER[TIER_ORDER.index(tier):] if candidate in self.models]
+
+
+_shared_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """Return the process-wide router over the shared model client"""
+    global _shared_router
+    if _shared_router is None:
+        _shared_router = ModelRouter()
+    return _shared_router
@@ -0,0 +1,99 @@
+import json
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Called with the text streamed so far; returning True ends the stream
+StopCondition = Callable[[str], bool]
+
+# A numbered step's opening: "2. ", "2) ", "Step 2: ", "**2.** " or "## 2. "
+STEP = r'(?:#{1,6}\s+|\*\*)?(?:step\s+)?(\d{1,2})[.):]\*{0,2}\s'
+# A line opening a reasoning section: a numbered step, indented or not, or any markdown heading
+SECTION_START = re.compile(r'^\s*(?:' + STEP + r'|#{1,6}\s)', re.IGNORECASE | re.MULTILINE)
+# A top-level numbered step; indented lists don't count
+STEP_START = re.compile(r'^' + STEP, re.IGNORECASE | re.MULTILINE)
+# What may precede the label in an answer: "Invoice", "Type: invoice", "This document is an invoice"
+ANSWER_LEAD = (r'^[\s"\'*`]*(?:(?:this|the)\s+document\s+is\s+(?:an?\s+)?'
+               r'|(?:document\s+)?(?:type|classification|label|category)\s*[:-]\s*)?[\s"\'*`]*')
+
+
+def stop_on_label(labels: Iterable[str]) -> StopCondition:
+    """Stop once the reply opens with one of the labels as a whole word
+
+    Only the answer position counts, so "not a contract" or a label named
+    later in an explanation never ends the stream.
+    """
+    pattern = re.compile(
+        ANSWER_LEAD + r'(?:' + '|'.join(re.escape(label) for label in labels) + r')(?![\w-])', re.IGNORECASE
+    )
+    return lambda text: pattern.match(text) is not None
+
+
+def stop_after_step(last: int) -> StopCondition:
+    """Stop once the reply starts a numbered step past the last one the prompt asked for"""
+    return lambda text: cut_after_step(text, last) != text
+
+
+def cut_after_step(text: str, last: int) -> str:
+    """The text before the first numbered step past last"""
+    for match in STEP_START.finditer(text):
+        if int(match.group(1)) > last:
+            return text[:match.start()].rstrip()
+    return text
+
+
+def decode_event(event: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """Text delta and stop reason carried by one InvokeModelWithResponseStream event"""
+    if 'chunk' not in event:
+        return None, None
+    chunk = json.loads(event['chunk']['bytes'])
+    if chunk.get('type') == 'content_block_delta' and chunk['delta'].get('type') == 'text_delta':
+        return chunk['delta']['text'], None
+    if chunk.get('type') == 'message_delta':
+        return None, chunk['delta'].get('stop_reason')
+    return None, None
+
+
+def message(text: str, stop_reason: Optional[str]) -> Dict[str, Any]:
+    """Shape streamed text like an invoke_model body, so existing parsers accept it"""
+    return {'content': [{'type': 'text', 'text': text}], 'stop_reason': stop_reason}
+
+
+def message_text(response: Dict[str, Any]) -> str:
+    return ''.join(block.get('text', '') for block in response.get('content', []))
+
+
+class SectionSplitter:
+    """Cuts streamed text into reasoning sections as each one completes
+
+    A section is complete when the next one starts, so feed() hands back
+    every section but the one still being written; finish() returns that
+    last one once the stream ends.
+    """
+
+    def __init__(self):
+        self._text = ''
+        self._emitted = 0
+
+    def feed(self, delta: str) -> List[str]:
+        self._text += delta
+        # A section start matches on its first few characters and stays matched,
+        # so a partial last line is safe to test
+        starts = [match.start() for match in SECTION_START.finditer(self._text)]
+        return self._take(starts[1:])
+
+    def finish(self, text: Optional[str] = None) -> List[str]:
+        """The sections not yet handed back; text, if given, is the prefix of the stream to keep"""
+        if text is not None:
+            self._text = text
+        starts = [match.start() for match in SECTION_START.finditer(self._text)]
+        return self._take(starts[1:] + [len(self._text)])
+
+    def _take(self, ends: List[int]) -> List[str]:
+        sections = []
+        for end in ends:
+            if end > self._emitted:
+                section = self._text[self._emitted:end].strip()
+                self._emitted = end
+                if section:
+                    sections.append(section)
+        return sections
@@ -0,0 +1,163 @@
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+# Context tokens each call site may spend on top of its instructions and the document itself
+PROMPT_BUDGETS = {
+    'reasoning': int(os.environ.get('PROMPT_BUDGET_REASONING', '1500')),
+    'merge': int(os.environ.get('PROMPT_BUDGET_MERGE', '2500')),
+    'compliance': int(os.environ.get('PROMPT_BUDGET_COMPLIANCE', '1500')),
+    'actions': int(os.environ.get('PROMPT_BUDGET_ACTIONS', '1500')),
+    'fused': int(os.environ.get('PROMPT_BUDGET_FUSED', '2500')),
+}
+MIN_ENTITY_SCORE = float(os.environ.get('PROMPT_MIN_ENTITY_SCORE', '0.8'))
+
+# Layout and retrieval payloads that cost tokens and tell the model nothing
+NOISE_KEYS = {'Geometry', 'BoundingBox', 'Polygon', 'Relationships', 'Page', 'Id',
+              'ResponseMetadata', 'BeginOffset', 'EndOffset'}
+# Roughly one token per word piece of up to six letters, per 1-3 digits and per symbol
+TOKEN_PIECE = re.compile(r'[A-Za-z]{1,6}|\d{1,3}|[^\sA-Za-z\d]')
+
+
+def estimate_tokens(text: str) -> int:
+    """Local token estimate; errs slightly high on English, close on JSON"""
+    return len(TOKEN_PIECE.findall(text))
+
+
+def dumps(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value, default=str, separators=(',', ':'))
+
+
+def compact(value: Any, min_score: float = MIN_ENTITY_SCORE) -> Any:
+    """Drop layout, embeddings, empty values, repeats and low-confidence items; round floats"""
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if key in NOISE_KEYS or key.lower().endswith('embedding'):
+                continue
+            item = compact(item, min_score)
+            if item not in (None, '', [], {}):
+                result[key] = item
+        return result
+    if isinstance(value, (list, tuple)):
+        items, seen = [], set()
+        for item in value:
+            if _low_confidence(item, min_score):
+                continue
+            item = compact(item, min_score)
+            # Repeated items say nothing new
+            key = dumps(item)
+            if item not in (None, '', [], {}) and key not in seen:
+                seen.add(key)
+                items.append(item)
+        return items
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+def compact_entities(entities: List[Dict[str, Any]], min_score: float = MIN_ENTITY_SCORE) -> Dict[str, List[str]]:
+    """Comprehend entities as {type: [distinct texts]}, most confident first"""
+    best: Dict[tuple, Dict[str, Any]] = {}
+    for entity in entities:
+        if entity.get('Score', 1.0) < min_score:
+            continue
+        text = ' '.join(str(entity.get('Text', '')).split())
+        key = (entity.get('Type', 'OTHER'), text.lower())
+        if text and (key not in best or entity.get('Score', 1.0) > best[key].get('Score', 1.0)):
+            best[key] = {**entity, 'Text': text}
+    grouped: Dict[str, List[str]] = {}
+    for entity in sorted(best.values(), key=lambda e: -e.get('Score', 1.0)):
+        grouped.setdefault(entity.get('Type', 'OTHER'), []).append(entity['Text'])
+    # Types with the most distinct mentions first, so a tight budget keeps them
+    return dict(sorted(grouped.items(), key=lambda item: -len(item[1])))
+
+
+def rank_documents(hits: List[Dict[str, Any]], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Retrieved documents, best score first and deduplicated, reduced to their compacted source"""
+    seen = set()
+    ranked = []
+    for hit in sorted(hits, key=lambda hit: -(hit.get('_score') or 0)):
+        document_id = hit.get('_id')
+        if document_id is not None and document_id in seen:
+            continue
+        seen.add(document_id)
+        document = compact(hit.get('_source', hit))
+        if '_score' in hit:
+            document = {'score': round(hit['_score'], 2), **document}
+        ranked.append(document)
+    return ranked[:limit] if limit is not None else ranked
+
+
+def fit(value: Any, budget: int) -> Any:
+    """Shrink a value until its serialised form fits the token budget
+
+    Lists keep their longest fitting prefix plus a count of what was cut,
+    dicts fill their keys in order, and strings are truncated.
+    """
+    fitted, target = _fit(value, budget), budget
+    # Nested punctuation isn't budgeted exactly; tighten until the whole fits
+    while target > 0 and estimate_tokens(dumps(fitted)) > budget:
+        target -= estimate_tokens(dumps(fitted)) - budget + 4
+        fitted = _fit(value, target)
+    return fitted
+
+
+def _fit(value: Any, budget: int) -> Any:
+    if estimate_tokens(dumps(value)) <= budget:
+        return value
+    if isinstance(value, list):
+        low, high = 0, len(value)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if estimate_tokens(dumps(value[:middle])) <= budget - 8:
+                low = middle
+            else:
+                high = middle - 1
+        if low == 0 and value and budget > 16:
+            return [_fit(value[0], budget - 8), f'+{len(value) - 1} more']
+        return value[:low] + [f'+{len(value) - low} more']
+    if isinstance(value, dict):
+        result, remaining = {}, budget
+        for position, (key, item) in enumerate(value.items()):
+            overhead = estimate_tokens(dumps(key)) + 2
+            if remaining <= overhead + 8:
+                result['+'] = f'{len(value) - position} more fields'
+                break
+            result[key] = _fit(item, remaining - overhead)
+            remaining -= overhead + estimate_tokens(dumps(result[key]))
+        return result
+    text = dumps(value)
+    chars = max(0, len(text) * budget // max(estimate_tokens(text), 1) - 1)
+    return text[:chars] + '…'
+
+
+def render_context(sections: Dict[str, Any], budget: int) -> str:
+    """Compact each section and fit them into budget tokens in priority (insertion) order
+
+    Returns one 'Name: compact JSON' line per section that got any budget.
+    """
+    lines, remaining = [], budget
+    for name, value in sections.items():
+        value = compact(value)
+        if value in (None, '', [], {}):
+            continue
+        overhead = estimate_tokens(name) + 2
+        if remaining <= overhead:
+            break
+        line = f'{name}: {dumps(fit(value, remaining - overhead))}'
+        lines.append(line)
+        remaining -= estimate_tokens(line)
+    return '\n'.join(lines)
+
+
+def _low_confidence(item: Any, min_score: float) -> bool:
+    if not isinstance(item, dict):
+        return False
+    if 'Score' in item:
+        return item['Score'] < min_score
+    if 'Confidence' in item:
+        # Textract reports confidence as a percentage
+        return item['Confidence'] / 100 < min_score
+    return False
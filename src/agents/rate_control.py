@@ -0,0 +1,242 @@
+import asyncio
+import contextlib
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar('T')
+
+THROTTLE_CODES = frozenset({
+    'ThrottlingException',
+    'Throttling',
+    'TooManyRequestsException',
+    'ProvisionedThroughputExceededException',
+    'RequestLimitExceeded',
+    'LimitExceededException',
+    'ServiceQuotaExceededException',
+    'SlowDown',
+})
+TRANSIENT_CODES = frozenset({
+    'ServiceUnavailableException',
+    'ServiceUnavailable',
+    'InternalServerException',
+    'InternalServerError',
+    'InternalFailure',
+    'ModelNotReadyException',
+    'RequestTimeout',
+    'RequestTimeoutException',
+})
+# Matched by class name along the MRO, so botocore stays a lazy import
+TRANSIENT_ERRORS = frozenset({'ConnectionError', 'ReadTimeoutError'})
+# Raised before the request reached the service
+UNSENT_ERRORS = frozenset({'ConnectTimeoutError', 'EndpointConnectionError'})
+
+# Starting rate and ceiling in calls per second, and in-flight cap (None:
+# the caller already caps it, as the model client does per model)
+SERVICE_LIMITS = {
+    'bedrock': {'rate': 5.0, 'max_rate': 20.0, 'concurrency': None},
+    'textract': {'rate': 5.0, 'max_rate': 10.0, 'concurrency': 8},
+    'comprehend': {'rate': 5.0, 'max_rate': 10.0, 'concurrency': 8},
+    'actions': {'rate': 20.0, 'max_rate': 100.0, 'concurrency': None},
+}
+DEFAULT_LIMITS = {'rate': 5.0, 'max_rate': 20.0, 'concurrency': 8}
+RATE_MAX_RETRIES = int(os.environ.get('RATE_MAX_RETRIES', '5'))
+
+
+def error_code(exc: BaseException) -> Optional[str]:
+    """Error code of a botocore ClientError, None for anything else"""
+    response = getattr(exc, 'response', None)
+    if isinstance(response, dict):
+        return response.get('Error', {}).get('Code')
+    return None
+
+
+def is_throttle(exc: BaseException) -> bool:
+    return error_code(exc) in THROTTLE_CODES
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Throttles, 5xx-style service errors and dropped connections; worth retrying"""
+    return (is_throttle(exc) or error_code(exc) in TRANSIENT_CODES
+            or any(cls.__name__ in TRANSIENT_ERRORS for cls in type(exc).__mro__))
+
+
+def is_unapplied(exc: BaseException) -> bool:
+    """Throttles and failures to connect: the service cannot have acted on the request
+
+    The only failures safe to retry for requests that are not idempotent;
+    a read timeout or 5xx may come after the request took effect.
+    """
+    return is_throttle(exc) or any(cls.__name__ in UNSENT_ERRORS for cls in type(exc).__mro__)
+
+
+class AdaptiveTokenBucket:
+    """Token bucket whose refill rate follows AIMD on throttling
+
+    Tokens refill at `rate` per second up to `burst`. A throttle multiplies
+    the rate by `decrease` and empties the bucket, at most once per
+    `cooldown` seconds because one overload throttles every call already in
+    flight. While the bucket is the bottleneck each success adds
+    increase / rate, so the rate climbs by about `increase` per second.
+    Waiting is a plain sleep on a reservation, so one bucket serves every
+    thread and event loop in the process.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, min_rate: float = 0.5,
+                 max_rate: Optional[float] = None, increase: float = 1.0, decrease: float = 0.7,
+                 cooldown: float = 0.5):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._last_decrease = float('-inf')
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return how long to wait before using it"""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._refill()
+            # Only grow while callers are waiting on tokens, not while idle
+            if self._tokens < 1:
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self._refill()
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._tokens = min(self._tokens, 0.0)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class RateController:
+    """Adaptive rate, in-flight cap and jittered retries for one service or model
+
+    call() waits for a concurrency slot and a token, then runs the request.
+    Throttles slow the bucket down; throttles and other transient errors are
+    retried with full-jitter exponential backoff, anything else is raised
+    at once. Callers whose requests are not idempotent narrow the retries
+    with retryable=is_unapplied.
+    """
+
+    def __init__(self, name: str, rate: float, max_rate: Optional[float] = None,
+                 concurrency: Optional[int] = None, max_retries: int = RATE_MAX_RETRIES,
+                 base_delay: float = 0.1, max_delay: float = 5.0, **bucket_options):
+        self.name = name
+        self.bucket = AdaptiveTokenBucket(rate, max_rate=max_rate, **bucket_options)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.calls = 0
+        self.throttles = 0
+        self.retries = 0
+        # asyncio primitives are bound to one loop, so semaphores are kept per loop
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    async def call(self, request: Callable[[], Awaitable[T]],
+                   retryable: Callable[[BaseException], bool] = is_transient) -> T:
+        """Await request() under the rate limit, retrying the failures retryable accepts"""
+        for attempt in range(self.max_retries + 1):
+            async with self._slot():
+                await self.bucket.acquire()
+                self.calls += 1
+                try:
+                    result = await request()
+                except Exception as e:
+                    if is_throttle(e):
+                        self.throttles += 1
+                        self.bucket.on_throttle()
+                    if attempt == self.max_retries or not retryable(e):
+                        raise
+                else:
+                    self.bucket.on_success()
+                    return result
+            self.retries += 1
+            await asyncio.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+
+    async def run(self, function: Callable[..., T], *args, **kwargs) -> T:
+        """call() for a blocking function, run in a worker thread"""
+        return await self.call(lambda: asyncio.to_thread(function, *args, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'rate': round(self.bucket.rate, 2),
+            'calls': self.calls,
+            'throttles': self.throttles,
+            'retries': self.retries
+        }
+
+    def _slot(self):
+        if self.concurrency is None:
+            return contextlib.nullcontext()
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return self._semaphores[loop]
+
+
+async def run_blocking(controller: Optional[RateController], function: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking call in a worker thread, under the controller when there is one"""
+    if controller is None:
+        return await asyncio.to_thread(function, *args, **kwargs)
+    return await controller.run(function, *args, **kwargs)
+
+
+def service_limits(service: str) -> Dict[str, Any]:
+    """Limits for a service; RATE_LIMIT_<SERVICE> and RATE_LIMIT_MAX_<SERVICE> override the rates"""
+    limits = dict(SERVICE_LIMITS.get(service, DEFAULT_LIMITS))
+    limits['rate'] = float(os.environ.get(f'RATE_LIMIT_{service.upper()}', limits['rate']))
+    limits['max_rate'] = max(limits['rate'], float(os.environ.get(f'RATE_LIMIT_MAX_{service.upper()}',
+                                                                  limits['max_rate'])))
+    return limits
+
+
+_controllers: Dict[str, RateController] = {}
+_controllers_lock = threading.Lock()
+
+
+def get_rate_controller(key: str) -> RateController:
+    """Process-wide controller for a key such as 'textract' or 'bedrock:<model id>'
+
+    Keys share their service's limits (the part before ':') but adapt
+    separately, since Bedrock quotas are per model.
+    """
+    controller = _controllers.get(key)
+    if controller is None:
+        with _controllers_lock:
+            if key not in _controllers:
+                _controllers[key] = RateController(key, **service_limits(key.split(':', 1)[0]))
+            controller = _controllers[key]
+    return controller
+
+
+def rate_stats() -> Dict[str, Dict[str, Any]]:
+    """Current rate, calls, throttles and retries of every controller in the process"""
+    return {key: controller.stats() for key, controller in list(_controllers.items())}
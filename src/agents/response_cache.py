@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Any, Optional
+
+from aws_clients import aws_table
+
+# Seconds a cached response stays valid, per prompt kind
+DEFAULT_TTLS = {
+    'classification': 7 * 24 * 3600,
+    'compliance': 24 * 3600,
+    'actions': 3600,
+    'chunk_reasoning': 7 * 24 * 3600,
+}
+DEFAULT_TTL = 3600
+
+
+def cache_key(model_id: str, body: Dict[str, Any]) -> str:
+    """Content address for a model request: model ID, prompt and parameters"""
+    canonical = json.dumps({'model_id': model_id, 'body': body}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class DynamoDBCacheTier:
+    """Shared cache tier backed by a DynamoDB table keyed on cache_key"""
+
+    def __init__(self, table_name: str):
+        self.table = aws_table(table_name)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        item = self.table.get_item(Key={'cache_key': key}).get('Item')
+        # DynamoDB deletes expired items lazily, so check the TTL ourselves
+        if not item or int(item['ttl']) <= time.time():
+            return None
+        return json.loads(item['response'])
+
+    def put(self, key: str, response: Dict[str, Any], ttl: int) -> None:
+        self.table.put_item(
+            Item={
+                'cache_key': key,
+                'response': json.dumps(response),
+                'ttl': int(time.time()) + ttl
+            }
+        )
+
+
+class FileCacheTier:
+    """Local stand-in for the shared tier, one JSON file per entry"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry['expires_at'] <= time.time():
+            return None
+        return entry['response']
+
+    def put(self, key: str, response: Dict[str, Any], ttl: int) -> None:
+        tmp_path = self._path(key) + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'expires_at': time.time() + ttl, 'response': response}, f)
+        os.replace(tmp_path, self._path(key))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json')
+
+
+class ResponseCache:
+    """Two-tier cache for model responses: in-process LRU plus optional shared tier
+
+    get_shared and put_shared block and run on executor threads while the
+    loop thread uses the LRU, so the LRU and counters are guarded by a lock.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttls: Optional[Dict[str, int]] = None, shared=None):
+        self.max_entries = max_entries
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.shared = shared
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = Counter()
+        self.shared_hits = Counter()
+        self.misses = Counter()
+        self._lock = threading.Lock()
+
+    def ttl_for(self, kind: str) -> int:
+        return self.ttls.get(kind, DEFAULT_TTL)
+
+    def get_local(self, key: str, kind: str) -> Optional[Dict[str, Any]]:
+        """Look up the in-process tier; counts a hit but never a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.hits[kind] += 1
+            return response
+
+    def get_shared(self, key: str, kind: str) -> Optional[Dict[str, Any]]:
+        """Look up the shared tier (blocking) and promote hits into the LRU"""
+        response = self.shared.get(key) if self.shared else None
+        with self._lock:
+            if response is None:
+                self.misses[kind] += 1
+                return None
+            self.shared_hits[kind] += 1
+        self._store_local(key, response, self.ttl_for(kind))
+        return response
+
+    def put(self, key: str, kind: str, response: Dict[str, Any]) -> None:
+        """Store in the LRU; callers write the shared tier via put_shared"""
+        self._store_local(key, response, self.ttl_for(kind))
+
+    def put_shared(self, key: str, kind: str, response: Dict[str, Any]) -> None:
+        if self.shared:
+            self.shared.put(key, response, self.ttl_for(kind))
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return self._stats()
+
+    def _stats(self) -> Dict[str, Dict[str, int]]:
+        kinds = set(self.hits) | set(self.shared_hits) | set(self.misses)
+        return {
+            kind: {
+                'hits': self.hits[kind],
+                'shared_hits': self.shared_hits[kind],
+                'misses': self.misses[kind]
+            }
+            for kind in kinds
+        }
+
+    def _store_local(self, key: str, response: Dict[str, Any], ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def cache_from_env() -> ResponseCache:
+    """Build the cache configured by RESPONSE_CACHE_* environment variables"""
+    shared = None
+    if os.environ.get('RESPONSE_CACHE_TABLE'):
+        shared = DynamoDBCacheTier(os.environ['RESPONSE_CACHE_TABLE'])
+    elif os.environ.get('RESPONSE_CACHE_DIR'):
+        shared = FileCacheTier(os.environ['RESPONSE_CACHE_DIR'])
+    return ResponseCache(
+        max_entries=int(os.environ.get('RESPONSE_CACHE_SIZE', '1024')),
+        shared=shared
+    )
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from aws_clients import aws_client
+
+DEFAULT_TASK_TIMEOUT = float(os.environ.get('TASK_TIMEOUT_SECONDS', '240'))
+# Task ids this process stopped waiting for; their late replies are safe to delete
+FINISHED_TASKS_KEPT = 4096
+
+logger = logging.getLogger(__name__)
+
+
+class TaskTimeoutError(asyncio.TimeoutError):
+    """Raised when no agent response arrives for a task in time"""
+
+
+class SQSResponseSource:
+    """Agent responses routed by an EventBridge rule into an SQS queue
+
+    Every supervisor container reads the same queue, so receiving a reply
+    does not consume it: the correlator settles each batch, deleting what
+    it matched and making the rest visible again for the container that
+    is waiting on it.
+    """
+
+    def __init__(self, queue_url: str, wait_seconds: int = 2):
+        self.sqs = aws_client('sqs')
+        self.queue_url = queue_url
+        self.wait_seconds = wait_seconds
+
+    async def receive(self) -> List[Dict[str, Any]]:
+        response = await asyncio.to_thread(
+            self.sqs.receive_message,
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=10,
+            WaitTimeSeconds=self.wait_seconds
+        )
+        responses = []
+        for message in response.get('Messages', []):
+            # Each message body is the EventBridge event; the agent result is its detail
+            try:
+                detail = json.loads(message['Body'])['detail']
+            except (ValueError, KeyError, TypeError):
+                detail = None
+            if not isinstance(detail, dict):
+                detail = {'body': message.get('Body')}
+            responses.append({**detail, 'receipt_handle': message['ReceiptHandle']})
+        return responses
+
+    async def settle(self, consumed: List[Dict[str, Any]], released: List[Dict[str, Any]]) -> None:
+        """Delete consumed responses; make released ones visible to other containers now"""
+        if consumed:
+            await asyncio.to_thread(
+                self.sqs.delete_message_batch,
+                QueueUrl=self.queue_url,
+                Entries=[{'Id': str(i), 'ReceiptHandle': r['receipt_handle']} for i, r in enumerate(consumed)]
+            )
+        if released:
+            await asyncio.to_thread(
+                self.sqs.change_message_visibility_batch,
+                QueueUrl=self.queue_url,
+                Entries=[{'Id': str(i), 'ReceiptHandle': r['receipt_handle'], 'VisibilityTimeout': 0}
+                         for i, r in enumerate(released)]
+            )
+
+
+class LocalEventBus:
+    """In-memory stand-in for EventBridge plus the response queue
+
+    put_events matches the boto3 signature and hands each entry to the
+    subscriber for its DetailType; subscribers answer with respond().
+    """
+
+    def __init__(self):
+        self.subscribers: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self.published = 0
+        self._responses: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, detail_type: str, handler: Callable[[Dict[str, Any]], None]) -> None:
+        self.subscribers[detail_type] = handler
+
+    def put_events(self, Entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        for entry in Entries:
+            self.published += 1
+            handler = self.subscribers.get(entry['DetailType'])
+            if handler is not None:
+                handler(json.loads(entry['Detail']))
+        return {'FailedEntryCount': 0, 'Entries': [{'EventId': str(self.published)} for _ in Entries]}
+
+    def respond(self, task_id: str, result: Dict[str, Any]) -> None:
+        """Publish an agent's result; safe to call from any thread"""
+        queue = self._queue()
+        self._loop.call_soon_threadsafe(queue.put_nowait, {'task_id': task_id, 'result': result})
+
+    async def receive(self) -> List[Dict[str, Any]]:
+        queue = self._queue()
+        responses = [await queue.get()]
+        while not queue.empty():
+            responses.append(queue.get_nowait())
+        return responses
+
+    async def settle(self, consumed: List[Dict[str, Any]], released: List[Dict[str, Any]]) -> None:
+        """Nothing to acknowledge: the in-memory queue has a single reader"""
+
+    def _queue(self) -> asyncio.Queue:
+        if self._responses is None:
+            self._loop = asyncio.get_running_loop()
+            self._responses = asyncio.Queue()
+        return self._responses
+
+
+class ResponseCorrelator:
+    """Matches agent responses to waiting tasks through one shared listener
+
+    Each outstanding task is a future keyed by task_id. A single consumer
+    drains the response source and resolves futures; it runs only while
+    tasks are outstanding. Matched responses, late replies to tasks this
+    process gave up on, and malformed messages are consumed. Replies to
+    unknown tasks belong to another container and are released back to
+    the source.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.unmatched = 0
+        self.late = 0
+        self.malformed = 0
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._finished: OrderedDict = OrderedDict()
+        self._consumer: Optional[asyncio.Task] = None
+
+    def expect(self, task_id: str) -> None:
+        """Register a task before its request is published, so no reply is missed"""
+        if task_id not in self._pending:
+            self._pending[task_id] = asyncio.get_running_loop().create_future()
+        if self._consumer is None or self._consumer.done():
+            self._consumer = asyncio.get_running_loop().create_task(self._consume())
+
+    async def wait_for(self, task_id: str, timeout: float = DEFAULT_TASK_TIMEOUT) -> Dict[str, Any]:
+        """Wait for a registered task's result; cancelling the caller cancels the wait"""
+        future = self._pending[task_id]
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise TaskTimeoutError(f'No response for task {task_id} after {timeout}s') from None
+        finally:
+            self._finish(task_id)
+
+    def cancel(self, task_id: str) -> None:
+        future = self._finish(task_id)
+        if future is not None:
+            future.cancel()
+
+    @property
+    def outstanding(self) -> int:
+        return len(self._pending)
+
+    async def _consume(self) -> None:
+        while self._pending:
+            try:
+                responses = await self.source.receive()
+            except Exception as e:
+                # The listener is shared, so a broken source fails every waiter
+                for future in self._pending.values():
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            consumed, released = [], []
+            for response in responses:
+                task_id = response.get('task_id')
+                if task_id is None or 'result' not in response:
+                    # No container can ever match it, so drop it rather than redeliver it forever
+                    self.malformed += 1
+                    logger.warning('Dropping malformed agent response: %.500s', json.dumps(response, default=str))
+                    consumed.append(response)
+                    continue
+                future = self._pending.get(task_id)
+                if future is not None and not future.done():
+                    future.set_result(response['result'])
+                    consumed.append(response)
+                elif task_id in self._finished:
+                    self.late += 1
+                    consumed.append(response)
+                else:
+                    self.unmatched += 1
+                    released.append(response)
+            try:
+                await self.source.settle(consumed, released)
+            except Exception:
+                # Unsettled messages reappear after their visibility timeout and are settled then
+                logger.exception('Failed to settle agent responses')
+
+    def _finish(self, task_id: str) -> Optional[asyncio.Future]:
+        self._finished[task_id] = None
+        self._finished.move_to_end(task_id)
+        while len(self._finished) > FINISHED_TASKS_KEPT:
+            self._finished.popitem(last=False)
+        return self._pending.pop(task_id, None)
+
+
+_shared_correlator: Optional[ResponseCorrelator] = None
+
+
+def get_response_correlator() -> ResponseCorrelator:
+    """Return the process-wide correlator listening on RESPONSE_QUEUE_URL"""
+    global _shared_correlator
+    if _shared_correlator is None:
+        _shared_correlator = ResponseCorrelator(SQSResponseSource(os.environ.get('RESPONSE_QUEUE_URL', '')))
+    return _shared_correlator
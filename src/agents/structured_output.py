@@ -0,0 +1,77 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+FENCE = re.compile(r'^```(?:json)?\s*|\s*```$')
+
+JSON_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'boolean': bool,
+    'integer': int,
+    'number': (int, float),
+}
+
+
+def extract_json(text: str) -> Optional[Any]:
+    """Parse the JSON object in a model reply, tolerating code fences and surrounding prose"""
+    text = FENCE.sub('', text.strip())
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    start, end = text.find('{'), text.rfind('}')
+    if start == -1 or end <= start:
+        return None
+    try:
+        return json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+
+
+def schema_errors(value: Any, schema: Dict[str, Any], path: str = '$') -> List[str]:
+    """Check a value against the JSON Schema subset the agents use
+
+    Supports type, enum, required, properties and items; returns one
+    message per violation, empty when the value is valid.
+    """
+    expected = schema.get('type')
+    if expected is not None:
+        # bool is an int in Python but not a number in JSON
+        if isinstance(value, bool) and expected in ('integer', 'number'):
+            return [f'{path}: expected {expected}']
+        if not isinstance(value, JSON_TYPES[expected]):
+            return [f'{path}: expected {expected}']
+    if 'enum' in schema and value not in schema['enum']:
+        return [f'{path}: expected one of {schema["enum"]}']
+
+    errors = []
+    if isinstance(value, dict):
+        for key in schema.get('required', []):
+            if key not in value:
+                errors.append(f'{path}.{key}: missing')
+        for key, subschema in schema.get('properties', {}).items():
+            if key in value:
+                errors.extend(schema_errors(value[key], subschema, f'{path}.{key}'))
+    if isinstance(value, list) and 'items' in schema:
+        for i, item in enumerate(value):
+            errors.extend(schema_errors(item, schema['items'], f'{path}[{i}]'))
+    return errors
+
+
+def validate_sections(payload: Any, schemas: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+    """Split a multi-section reply into the sections that validate and the errors of the rest"""
+    if not isinstance(payload, dict):
+        return {}, {name: ['$: not a JSON object'] for name in schemas}
+    valid, errors = {}, {}
+    for name, schema in schemas.items():
+        if name not in payload:
+            errors[name] = [f'$.{name}: missing']
+            continue
+        section_errors = schema_errors(payload[name], schema, f'$.{name}')
+        if section_errors:
+            errors[name] = section_errors
+        else:
+            valid[name] = payload[name]
+    return valid, errors
@@ -1,7 +1,11 @@
-import boto3
 import json
 from typing import Dict, List, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from event_publisher import get_event_publisher
+from model_router import get_model_router
+from response_correlator import get_response_correlator
+from task_scheduler import TaskScheduler
 
 @dataclass
 class Task:
@@ -9,29 +13,30 @@ class Task:
     type: str
     payload: Dict[str, Any]
     priority: int = 1
+    depends_on: List[str] = field(default_factory=list)
 
 class SupervisorAgent:
     def __init__(self):
-        self.bedrock = boto3.client('bedrock-runtime')
-        self.eventbridge = boto3.client('events')
+        self.router = get_model_router()
+        self.publisher = get_event_publisher()
+        self.correlator = get_response_correlator()
         self.agents = {
             'document_perception': 'document-perception-agent',
             'analysis': 'analysis-agent', 
             'action': 'action-agent'
         }
+        self.scheduler = TaskScheduler()
     
     async def orchestrate_workflow(self, user_request: str) -> Dict[str, Any]:
         """Main orchestration logic implementing supervisor pattern"""
         # 1. Decompose request into tasks
         tasks = await self._decompose_request(user_request)
         
-        # 2. Execute tasks with appropriate agents
-        results = []
-        for task in tasks:
-            agent_result = await self._delegate_task(task)
-            results.append(agent_result)
+        # 2. Execute tasks with appropriate agents: independent tasks run
+        #    concurrently and (task, result) pairs stream out as they finish
+        results = self.scheduler.run(tasks, self._delegate_task, self._select_agent)
         
-        # 3. Synthesize final response
+        # 3. Synthesize final response from the stream
         return await self._synthesize_response(results)
     
     async def _decompose_request(self, request: str) -> List[Task]:
@@ -40,16 +45,17 @@ class SupervisorAgent:
         Analyze this request and break it into specific tasks:
         Request: {request}
         
-        Return tasks as JSON array with: id, type, payload, priority
+        Return tasks as JSON array with: id, type, payload, priority, depends_on
+        (priority: higher runs first; depends_on: ids of tasks that must finish first)
         """
         
-        response = self.bedrock.invoke_model(
-            modelId='anthropic.claude-3-sonnet-20240229-v1:0',
-            body=json.dumps({
+        response = await self.router.invoke(
+            'decomposition',
+            body={
                 'anthropic_version': 'bedrock-2023-05-31',
                 'messages': [{'role': 'user', 'content': prompt}],
                 'max_tokens': 1000
-            })
+            }
         )
         
         # Parse and return tasks
@@ -59,9 +65,12 @@ class SupervisorAgent:
         """Delegate task to appropriate specialized agent"""
         agent_name = self._select_agent(task.type)
         
-        # Send task via EventBridge
-        self.eventbridge.put_events(
-            Entries=[{
+        # Register for the response before publishing so a fast reply isn't missed
+        self.correlator.expect(task.id)
+        
+        # Send task via EventBridge; delegations in the same burst share a PutEvents call
+        try:
+            await self.publisher.publish({
                 'Source': 'supervisor-agent',
                 'DetailType': 'Task Assignment',
                 'Detail': json.dumps({
@@ -69,8 +78,10 @@ class SupervisorAgent:
                     'agent': agent_name,
                     'payload': task.payload
                 })
-            }]
-        )
+            })
+        except Exception:
+            self.correlator.cancel(task.id)
+            raise
         
-        # Wait for response (simplified)
-        return await self._wait_for_response(task.id)
+        # Wait for the shared response listener to deliver this task's result
+        return await self.correlator.wait_for(task.id)
@@ -0,0 +1,117 @@
+import asyncio
+import heapq
+import itertools
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from dependency_graph import BLOCKING_STATUSES, find_cycle_members
+
+DEFAULT_AGENT_CONCURRENCY = int(os.environ.get('AGENT_CONCURRENCY', '4'))
+
+
+class TaskScheduler:
+    """Dispatch supervisor tasks by dependency, priority and per-agent limits
+
+    A task is ready once every task in its depends_on has finished. Ready
+    tasks go out highest priority first (larger Task.priority wins, ties in
+    decomposition order) while their agent has a free slot. Results are
+    yielded as tasks finish, so synthesis can start before the slowest
+    branch returns. Tasks behind a failed dependency are skipped.
+    """
+
+    def __init__(self, agent_limits: Optional[Dict[str, int]] = None,
+                 default_limit: int = DEFAULT_AGENT_CONCURRENCY):
+        self.agent_limits = agent_limits or {}
+        self.default_limit = default_limit
+
+    async def run(self, tasks: List[Any], dispatch: Callable[[Any], Awaitable[Dict[str, Any]]],
+                  select_agent: Callable[[str], str]) -> AsyncIterator[Tuple[Any, Dict[str, Any]]]:
+        """Yield (task, result) pairs in completion order"""
+        index = {task.id: i for i, task in enumerate(tasks)}
+        dependencies: Dict[int, Set[int]] = {}
+        rejected: Dict[int, str] = {}
+        for i, task in enumerate(tasks):
+            unknown = [name for name in task.depends_on if name not in index]
+            if unknown:
+                rejected[i] = f'unknown dependency {unknown[0]}'
+            dependencies[i] = {index[name] for name in task.depends_on if name in index} - {i}
+        for i in find_cycle_members(dependencies):
+            rejected.setdefault(i, 'dependency cycle')
+
+        waiting = {i: set(deps) for i, deps in dependencies.items()}
+        dependents: Dict[int, List[int]] = {i: [] for i in range(len(tasks))}
+        for i, deps in dependencies.items():
+            for dependency in deps:
+                dependents[dependency].append(i)
+
+        order = itertools.count()
+        ready: List[Tuple[int, int, int]] = []
+        finished: Set[int] = set()
+
+        def settle(i: int, result: Dict[str, Any]) -> List[Tuple[Any, Dict[str, Any]]]:
+            """Record a result; release dependents, or skip them if it failed"""
+            finished.add(i)
+            skipped = []
+            stack = [(i, result)]
+            while stack:
+                j, outcome = stack.pop()
+                for dependent in dependents[j]:
+                    if dependent in finished:
+                        continue
+                    if outcome.get('status') in BLOCKING_STATUSES:
+                        skip = self._skipped(tasks[dependent], f"dependency {tasks[j].id} {outcome['status']}")
+                        finished.add(dependent)
+                        skipped.append((tasks[dependent], skip))
+                        stack.append((dependent, skip))
+                        continue
+                    waiting[dependent].discard(j)
+                    if not waiting[dependent]:
+                        heapq.heappush(ready, (-tasks[dependent].priority, next(order), dependent))
+            return skipped
+
+        for i, reason in rejected.items():
+            if i not in finished:
+                skip = self._skipped(tasks[i], reason)
+                yield tasks[i], skip
+                for pair in settle(i, skip):
+                    yield pair
+        for i in range(len(tasks)):
+            if i not in finished and not waiting[i]:
+                heapq.heappush(ready, (-tasks[i].priority, next(order), i))
+
+        busy: Dict[str, int] = {}
+        running: Dict[asyncio.Future, Tuple[int, str]] = {}
+        try:
+            while ready or running:
+                # Start every ready task whose agent has capacity, best priority first
+                deferred = []
+                while ready:
+                    entry = heapq.heappop(ready)
+                    agent = select_agent(tasks[entry[2]].type)
+                    if busy.get(agent, 0) >= self.agent_limits.get(agent, self.default_limit):
+                        deferred.append(entry)
+                        continue
+                    busy[agent] = busy.get(agent, 0) + 1
+                    running[asyncio.ensure_future(dispatch(tasks[entry[2]]))] = (entry[2], agent)
+                for entry in deferred:
+                    heapq.heappush(ready, entry)
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    i, agent = running.pop(future)
+                    busy[agent] -= 1
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {'status': 'failed', 'task_id': tasks[i].id, 'error': str(e)}
+                    yield tasks[i], result
+                    for pair in settle(i, result):
+                        yield pair
+        finally:
+            # The consumer stopped early; don't leave delegations running
+            for future in running:
+                future.cancel()
+
+    @staticmethod
+    def _skipped(task: Any, reason: str) -> Dict[str, Any]:
+        return {'status': 'skipped', 'task_id': task.id, 'reason': reason}
@@ -0,0 +1,106 @@
+from typing import Dict, Any, List, Iterable
+
+
+class BlockGraph:
+    """Textract blocks indexed once by ID with child and value adjacency
+
+    Text, tables, form fields and confidence are all read from the same
+    index, so resolving a Relationship is a dict lookup instead of a scan
+    over the block list. Blocks may be added in several calls (one per
+    result page) and children may arrive before or after their parents.
+    """
+
+    def __init__(self, blocks: Iterable[Dict[str, Any]] = ()):
+        self.blocks: Dict[str, Dict[str, Any]] = {}
+        self.children: Dict[str, List[str]] = {}
+        self.values: Dict[str, List[str]] = {}
+        self.lines: List[str] = []
+        self.table_ids: List[str] = []
+        self.key_ids: List[str] = []
+        self.pages = 0
+        self._confidence_total = 0.0
+        self._confidence_count = 0
+        self.add_blocks(blocks)
+
+    def add_blocks(self, blocks: Iterable[Dict[str, Any]]) -> None:
+        for block in blocks:
+            block_id = block['Id']
+            block_type = block['BlockType']
+            self.blocks[block_id] = block
+
+            for relationship in block.get('Relationships', ()):
+                if relationship['Type'] == 'CHILD':
+                    self.children.setdefault(block_id, []).extend(relationship['Ids'])
+                elif relationship['Type'] == 'VALUE':
+                    self.values.setdefault(block_id, []).extend(relationship['Ids'])
+
+            if block_type == 'LINE':
+                self.lines.append(block_id)
+            elif block_type == 'TABLE':
+                self.table_ids.append(block_id)
+            elif block_type == 'KEY_VALUE_SET' and 'KEY' in block.get('EntityTypes', ()):
+                self.key_ids.append(block_id)
+            elif block_type == 'PAGE':
+                self.pages += 1
+
+            if 'Confidence' in block:
+                self._confidence_total += block['Confidence']
+                self._confidence_count += 1
+
+    def text(self) -> str:
+        """Document text, one LINE per line in reading order"""
+        return '\n'.join(self.blocks[line_id].get('Text', '') for line_id in self.lines)
+
+    def tables(self) -> List[List[List[str]]]:
+        """Each table as rows of cell text"""
+        tables = []
+        for table_id in self.table_ids:
+            rows: Dict[int, Dict[int, str]] = {}
+            width = 0
+            for cell_id in self.children.get(table_id, ()):
+                cell = self.blocks.get(cell_id)
+                if cell is None or cell['BlockType'] != 'CELL':
+                    continue
+                column = cell['ColumnIndex']
+                rows.setdefault(cell['RowIndex'], {})[column] = self.child_text(cell_id)
+                width = max(width, column)
+            tables.append([
+                [row.get(column, '') for column in range(1, width + 1)]
+                for _, row in sorted(rows.items())
+            ])
+        return tables
+
+    def forms(self) -> Dict[str, str]:
+        """Form fields as key text mapped to value text"""
+        fields = {}
+        for key_id in self.key_ids:
+            key = self.child_text(key_id)
+            if not key:
+                continue
+            fields[key] = ' '.join(
+                self.child_text(value_id) for value_id in self.values.get(key_id, ())
+            ).strip()
+        return fields
+
+    def confidence(self) -> float:
+        """Mean confidence over every block that reports one, as 0-1"""
+        if not self._confidence_count:
+            return 0.0
+        return self._confidence_total / self._confidence_count / 100
+
+    def confidence_count(self) -> int:
+        """Number of blocks that report a confidence; PAGE blocks do not"""
+        return self._confidence_count
+
+    def child_text(self, block_id: str) -> str:
+        """Text of a block's WORD and selected SELECTION_ELEMENT children"""
+        words = []
+        for child_id in self.children.get(block_id, ()):
+            child = self.blocks.get(child_id)
+            if child is None:
+                continue
+            if child['BlockType'] == 'WORD':
+                words.append(child['Text'])
+            elif child['BlockType'] == 'SELECTION_ELEMENT' and child.get('SelectionStatus') == 'SELECTED':
+                words.append('X')
+        return ' '.join(words)
@@ -0,0 +1,95 @@
+import asyncio
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+
+from rate_control import RateController, run_blocking
+from textract_blocks import BlockGraph
+
+MULTI_PAGE_SUFFIXES = ('.pdf', '.tif', '.tiff')
+RESULTS_PER_CALL = 1000
+
+
+class TextractJobError(Exception):
+    """Raised when an asynchronous Textract analysis does not succeed"""
+
+
+def may_be_multi_page(document_path: str) -> bool:
+    """Formats that can hold several pages; single-page ones still suit the sync API"""
+    return document_path.lower().endswith(MULTI_PAGE_SUFFIXES)
+
+
+async def start_analysis(textract, bucket: str, key: str,
+                         feature_types: Tuple[str, ...] = ('TABLES', 'FORMS'),
+                         rate_control: Optional[RateController] = None) -> str:
+    """Start an asynchronous AnalyzeDocument job and return its JobId"""
+    response = await run_blocking(
+        rate_control,
+        textract.start_document_analysis,
+        DocumentLocation={'S3Object': {'Bucket': bucket, 'Name': key}},
+        FeatureTypes=list(feature_types)
+    )
+    return response['JobId']
+
+
+async def iter_result_blocks(textract, job_id: str, poll_interval: float = 1.0,
+                             timeout: float = 600.0,
+                             rate_control: Optional[RateController] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield the Blocks of each GetDocumentAnalysis result page
+
+    The request for the next page is already in flight while the caller
+    works on the current one. Polls and page fetches go through
+    rate_control when given.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        response = await run_blocking(
+            rate_control, textract.get_document_analysis, JobId=job_id, MaxResults=RESULTS_PER_CALL
+        )
+        status = response['JobStatus']
+        if status != 'IN_PROGRESS':
+            break
+        if loop.time() > deadline:
+            raise TextractJobError(f'Textract job {job_id} still running after {timeout}s')
+        await asyncio.sleep(poll_interval)
+    if status not in ('SUCCEEDED', 'PARTIAL_SUCCESS'):
+        raise TextractJobError(f"Textract job {job_id} {status}: {response.get('StatusMessage', '')}")
+
+    while True:
+        next_page: Optional[asyncio.Task] = None
+        if response.get('NextToken'):
+            next_page = asyncio.ensure_future(run_blocking(
+                rate_control, textract.get_document_analysis,
+                JobId=job_id, MaxResults=RESULTS_PER_CALL, NextToken=response['NextToken']
+            ))
+        try:
+            yield response['Blocks']
+        except BaseException:
+            # Consumer stopped early; drop the prefetched page
+            if next_page is not None:
+                next_page.cancel()
+            raise
+        if next_page is None:
+            return
+        response = await next_page
+
+
+async def iter_document_pages(textract, job_id: str, poll_interval: float = 1.0,
+                              rate_control: Optional[RateController] = None) -> AsyncIterator[Tuple[int, BlockGraph]]:
+    """Yield (page number, BlockGraph) for each document page as it completes
+
+    Result pages arrive in document page order, so a page is complete as
+    soon as a block from a later page shows up. Only one page's blocks are
+    held at a time.
+    """
+    graph = BlockGraph()
+    current_page = None
+    async for blocks in iter_result_blocks(textract, job_id, poll_interval, rate_control=rate_control):
+        for block in blocks:
+            page = block.get('Page', 1)
+            if current_page is not None and page != current_page:
+                yield current_page, graph
+                graph = BlockGraph()
+            current_page = page
+            graph.add_blocks((block,))
+    if current_page is not None:
+        yield current_page, graph
@@ -0,0 +1,294 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from cold_start import lazy_import
+
+np = lazy_import('numpy')
+
+EMBEDDING_DIM = 1536
+NEAR_CACHE_SIZE = int(os.environ.get('NEAR_CACHE_SIZE', '10000'))
+NEAR_CACHE_TTL = int(os.environ.get('NEAR_CACHE_TTL', '3600'))
+
+
+class IVFIndex:
+    """Inverted-file ANN index over cosine similarity, built on NumPy
+
+    Vectors are normalised on insert and bucketed under their nearest k-means
+    centroid; a search scores only the nprobe closest buckets. Below
+    train_threshold vectors the index stays exact and scans everything.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, nprobe: int = 8, train_threshold: int = 1024):
+        self.dim = dim
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        # Allocated on first add, so a cold start doesn't pay for importing NumPy
+        self._vectors: Optional[np.ndarray] = None
+        self._size = 0
+        self._ids: List[str] = []
+        self._metadata: List[Any] = []
+        self._positions: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        # Row -> bucket, so a replace or remove touches only its own bucket
+        self._buckets: List[int] = []
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, item_id: str, vector, metadata: Any = None) -> None:
+        """Insert or replace one vector"""
+        vector = self._normalise(np.asarray(vector, dtype=np.float32))
+        if item_id in self._positions:
+            row = self._positions[item_id]
+            self._writable()[row] = vector
+            self._metadata[row] = metadata
+            if self._centroids is not None:
+                self._lists[self._buckets[row]].remove(row)
+                self._assign(row, self._nearest_centroid(vector))
+            return
+
+        row = self._size
+        self._reserve(row + 1)
+        self._vectors[row] = vector
+        self._size += 1
+        self._ids.append(item_id)
+        self._metadata.append(metadata)
+        self._positions[item_id] = row
+
+        if self._centroids is not None:
+            self._buckets.append(0)
+            self._assign(row, self._nearest_centroid(vector))
+        # Retrain as the index grows so buckets stay balanced
+        if self._size >= self.train_threshold and self._size >= 4 * self._trained_size:
+            self.train()
+
+    def remove(self, item_id: str) -> bool:
+        """Drop one vector; the last row moves into its place"""
+        row = self._positions.pop(item_id, None)
+        if row is None:
+            return False
+        last = self._size - 1
+        if self._centroids is not None:
+            self._lists[self._buckets[row]].remove(row)
+        if row != last:
+            vectors = self._writable()
+            vectors[row] = vectors[last]
+            self._ids[row] = self._ids[last]
+            self._metadata[row] = self._metadata[last]
+            self._positions[self._ids[row]] = row
+            if self._centroids is not None:
+                bucket = self._lists[self._buckets[last]]
+                bucket[bucket.index(last)] = row
+                self._buckets[row] = self._buckets[last]
+        self._ids.pop()
+        self._metadata.pop()
+        if self._centroids is not None:
+            self._buckets.pop()
+        self._size = last
+        return True
+
+    def search(self, vector, k: int = 5) -> List[Tuple[str, float, Any]]:
+        """Approximate top-k by cosine similarity as (id, score, metadata)"""
+        if self._size == 0:
+            return []
+        query = self._normalise(np.asarray(vector, dtype=np.float32))
+        if self._centroids is None:
+            rows = np.arange(self._size)
+        else:
+            probes = np.argsort(-(self._centroids @ query))[:self.nprobe]
+            rows = np.fromiter(
+                (row for probe in probes for row in self._lists[probe]), dtype=np.int64
+            )
+        return self._top_k(rows, query, k)
+
+    def exact_search(self, vector, k: int = 5) -> List[Tuple[str, float, Any]]:
+        """Brute-force top-k over every vector"""
+        if self._size == 0:
+            return []
+        query = self._normalise(np.asarray(vector, dtype=np.float32))
+        return self._top_k(np.arange(self._size), query, k)
+
+    def train(self, iterations: int = 10, seed: int = 0) -> None:
+        """Fit coarse centroids with spherical k-means and rebuild the buckets"""
+        vectors = self._vectors[:self._size]
+        nlist = max(1, int(np.sqrt(self._size)))
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(self._size, size=min(self._size, nlist * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assignment == c]
+                if len(members):
+                    centroids[c] = self._normalise(members.sum(axis=0))
+
+        self._centroids = centroids
+        self._lists = [[] for _ in range(nlist)]
+        self._buckets = np.argmax(vectors @ centroids.T, axis=1).tolist()
+        for row, bucket in enumerate(self._buckets):
+            self._lists[bucket].append(row)
+        self._trained_size = self._size
+
+    def save(self, directory: str) -> None:
+        """Write the index as .npy arrays plus a JSON sidecar"""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, 'vectors.npy'), self._writable()[:self._size])
+        if self._centroids is not None:
+            np.save(os.path.join(directory, 'centroids.npy'), self._centroids)
+            np.save(os.path.join(directory, 'assignment.npy'), np.asarray(self._buckets, dtype=np.int32))
+        with open(os.path.join(directory, 'index.json'), 'w') as f:
+            json.dump({
+                'dim': self.dim,
+                'nprobe': self.nprobe,
+                'train_threshold': self.train_threshold,
+                'trained_size': self._trained_size,
+                'ids': self._ids,
+                'metadata': self._metadata
+            }, f)
+
+    @classmethod
+    def load(cls, directory: str) -> 'IVFIndex':
+        """Load a saved index; vectors stay memory-mapped until the next insert"""
+        with open(os.path.join(directory, 'index.json')) as f:
+            header = json.load(f)
+        index = cls(header['dim'], header['nprobe'], header['train_threshold'])
+        index._vectors = np.load(os.path.join(directory, 'vectors.npy'), mmap_mode='r')
+        index._size = len(header['ids'])
+        index._ids = header['ids']
+        index._metadata = header['metadata']
+        index._positions = {item_id: row for row, item_id in enumerate(index._ids)}
+        index._trained_size = header['trained_size']
+        centroids_path = os.path.join(directory, 'centroids.npy')
+        if os.path.exists(centroids_path):
+            index._centroids = np.load(centroids_path)
+            assignment = np.load(os.path.join(directory, 'assignment.npy'))
+            index._lists = [[] for _ in range(len(index._centroids))]
+            index._buckets = assignment.tolist()
+            for row, bucket in enumerate(index._buckets):
+                index._lists[bucket].append(row)
+        return index
+
+    def _top_k(self, rows: 'np.ndarray', query: 'np.ndarray', k: int) -> List[Tuple[str, float, Any]]:
+        if len(rows) == 0:
+            return []
+        scores = self._vectors[rows] @ query
+        k = min(k, len(rows))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [
+            (self._ids[rows[i]], float(scores[i]), self._metadata[rows[i]])
+            for i in best
+        ]
+
+    def _assign(self, row: int, bucket: int) -> None:
+        self._buckets[row] = bucket
+        self._lists[bucket].append(row)
+
+    def _nearest_centroid(self, vector: 'np.ndarray') -> int:
+        return int(np.argmax(self._centroids @ vector))
+
+    def _reserve(self, size: int) -> None:
+        if self._vectors is None:
+            self._vectors = np.zeros((max(size, 64), self.dim), dtype=np.float32)
+        elif size > self._vectors.shape[0] or not self._vectors.flags.writeable:
+            capacity = max(size, 2 * self._vectors.shape[0], 64)
+            grown = np.zeros((capacity, self.dim), dtype=np.float32)
+            grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+
+    def _writable(self) -> 'np.ndarray':
+        self._reserve(self._size)
+        return self._vectors
+
+    @staticmethod
+    def _normalise(vector: 'np.ndarray') -> 'np.ndarray':
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class NearCache:
+    """Local index in front of OpenSearch k-NN for the hot working set
+
+    Holds at most max_entries documents, evicting the least recently used,
+    and serves an entry for ttl seconds after it was last fetched from
+    OpenSearch.
+    """
+
+    def __init__(self, index: IVFIndex, embedding_field: str, min_score: float = 0.8,
+                 max_entries: int = NEAR_CACHE_SIZE, ttl: int = NEAR_CACHE_TTL):
+        self.index = index
+        self.embedding_field = embedding_field
+        self.min_score = min_score
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # id -> expiry, least recently used first; a loaded index starts fresh
+        now = time.time()
+        self._entries: OrderedDict = OrderedDict((item_id, now + ttl) for item_id in index._ids)
+        self._evict()
+
+    def lookup(self, vector, k: int) -> Optional[List[Any]]:
+        """Return k cached documents if all clear min_score and are fresh, else None"""
+        results = self.index.search(vector, k)
+        now = time.time()
+        expired = [item_id for item_id, _, _ in results if self._entries.get(item_id, 0) <= now]
+        for item_id in expired:
+            self.invalidate(item_id)
+        if expired or len(results) < k or results[-1][1] < self.min_score:
+            self.misses += 1
+            return None
+        for item_id, _, _ in results:
+            self._entries.move_to_end(item_id)
+        self.hits += 1
+        return [metadata for _, _, metadata in results]
+
+    def invalidate(self, item_id: str) -> None:
+        """Forget a document, e.g. after it changed in OpenSearch"""
+        self._entries.pop(item_id, None)
+        self.index.remove(item_id)
+
+    def remember(self, hits: List[Dict[str, Any]]) -> None:
+        """Insert OpenSearch hits that carry their embedding"""
+        for hit in hits:
+            source = hit.get('_source', {})
+            vector = source.get(self.embedding_field)
+            if vector is not None:
+                # The vector already lives in the index; keep only the document
+                document = {**hit, '_source': {key: value for key, value in source.items()
+                                               if key != self.embedding_field}}
+                self.index.add(hit['_id'], vector, document)
+                self._entries[hit['_id']] = time.time() + self.ttl
+                self._entries.move_to_end(hit['_id'])
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            item_id, _ = self._entries.popitem(last=False)
+            self.index.remove(item_id)
+            self.evictions += 1
+
+
+_near_caches: Dict[str, NearCache] = {}
+
+
+def get_near_cache(name: str, embedding_field: str) -> NearCache:
+    """Return the process-wide near cache for an OpenSearch index
+
+    When VECTOR_INDEX_DIR is set, a previously saved index is loaded from
+    VECTOR_INDEX_DIR/<name>.
+    """
+    if name not in _near_caches:
+        directory = os.path.join(os.environ.get('VECTOR_INDEX_DIR', ''), name)
+        if os.environ.get('VECTOR_INDEX_DIR') and os.path.exists(os.path.join(directory, 'index.json')):
+            index = IVFIndex.load(directory)
+        else:
+            index = IVFIndex()
+        _near_caches[name] = NearCache(index, embedding_field)
+    return _near_caches[name]
@@ -1,53 +1,88 @@
-import boto3
-import json
+import asyncio
+import os
 import time
-from typing import Dict, Any, List, Optional
+from collections import Counter
+from typing import Dict, Any, AsyncIterator, List, Optional
+
+from aws_clients import aws_client, aws_resource, aws_table
+from embedding_service import get_embedding_service
+from episode_archive import EpisodeArchiveReader, EpisodeArchiveWriter
+from local_classifier import LocalClassifier, examples_from_episodes
+from memory_consolidation import CheckpointStore, ConsolidationEngine, delete_items, parallel_scan, write_items
+from usage_counters import get_semantic_usage_buffer
+from vector_index import get_near_cache
+from working_memory_cache import get_working_memory_cache
+
+# Sessions idle this long are folded into episodic memory
+WORKING_MEMORY_IDLE_SECONDS = 900
+# Episodes older than this leave DynamoDB; the S3 archive keeps them
+EPISODE_RETENTION_SECONDS = 30 * 24 * 3600
+# Episodes archived per segment upload, before their items are written or deleted
+ARCHIVE_BATCH = 500
 
 class AgentMemory:
     def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb')
-        self.s3 = boto3.client('s3')
-        self.opensearch = boto3.client('opensearch')
+        self.dynamodb = aws_resource('dynamodb')
+        self.s3 = aws_client('s3')
+        self.opensearch = aws_client('opensearch')
+        self.embeddings = get_embedding_service()
+        self.episode_cache = get_near_cache('episodes', 'context_embedding')
         
         # Memory tables
-        self.working_memory = self.dynamodb.Table('working-memory')
-        self.episodic_memory = self.dynamodb.Table('episodic-memory')
-        self.semantic_memory = self.dynamodb.Table('semantic-memory')
+        self.working_memory = aws_table('working-memory')
+        self.episodic_memory = aws_table('episodic-memory')
+        self.semantic_memory = aws_table('semantic-memory')
+        self.working_memory_cache = get_working_memory_cache(self.working_memory)
+        self.semantic_usage = get_semantic_usage_buffer(self.semantic_memory)
+        self.consolidation = ConsolidationEngine(CheckpointStore(
+            aws_table(os.environ.get('MEMORY_CHECKPOINT_TABLE', 'memory-checkpoints'))
+        ))
+        
+        # Long-term episode archive: gzip JSONL segments with offset indexes
+        archive_bucket = os.environ.get('DOCUMENT_BUCKET', '')
+        self.archive = EpisodeArchiveWriter(self.s3, archive_bucket)
+        self.archive_reader = EpisodeArchiveReader(self.s3, archive_bucket)
+        # Episode items per segment key, held back until that segment is in S3
+        self._pending_episodes: Dict[str, List[Dict[str, Any]]] = {}
     
     async def store_working_memory(self, session_id: str, context: Dict[str, Any]) -> None:
-        """Store current session context"""
-        self.working_memory.put_item(
-            Item={
-                'session_id': session_id,
-                'timestamp': int(time.time()),
-                'context': context,
-                'ttl': int(time.time()) + 3600  # 1 hour TTL
-            }
-        )
+        """Store current session context (written to DynamoDB at the next step boundary)"""
+        self.working_memory_cache.put(session_id, context)
     
     async def get_working_memory(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve current session context"""
-        response = self.working_memory.get_item(
-            Key={'session_id': session_id}
-        )
-        return response.get('Item', {}).get('context')
+        return await self.working_memory_cache.get(session_id)
+    
+    async def flush_working_memory(self) -> None:
+        """Persist session contexts changed during this workflow step"""
+        await self.working_memory_cache.flush()
     
     async def store_episodic_memory(self, interaction: Dict[str, Any]) -> None:
-        """Store historical interaction"""
-        # Store in DynamoDB for structured access
-        self.episodic_memory.put_item(
-            Item={
-                'interaction_id': interaction['id'],
-                'timestamp': int(time.time()),
-                'user_request': interaction['request'],
-                'agent_response': interaction['response'],
-                'outcome': interaction['outcome'],
-                'performance_metrics': interaction.get('metrics', {})
-            }
-        )
+        """Store historical interaction (written to DynamoDB once its archive segment is uploaded)"""
+        # Store in S3 for long-term retention (uploaded with its segment)
+        archive_segment = await self._archive_to_s3(interaction)
         
-        # Store in S3 for long-term retention
-        await self._archive_to_s3(interaction)
+        # Store in DynamoDB for structured access
+        self._pending_episodes.setdefault(archive_segment, []).append({
+            'interaction_id': interaction['id'],
+            'timestamp': int(time.time()),
+            'user_request': interaction['request'],
+            'agent_response': interaction['response'],
+            'outcome': interaction['outcome'],
+            'performance_metrics': interaction.get('metrics', {}),
+            'archive_segment': archive_segment
+        })
+        # A full segment is uploaded by the append itself
+        await self._write_archived_episodes()
+    
+    async def get_archived_episode(self, archive_segment: str, interaction_id: str) -> Optional[Dict[str, Any]]:
+        """Read one archived interaction back with a ranged GET"""
+        return await self.archive_reader.get(archive_segment, interaction_id)
+    
+    async def flush_archive(self) -> None:
+        """Upload the open archive segment and write its episodes; call before the invocation ends"""
+        await self.archive.flush()
+        await self._write_archived_episodes()
     
     async def retrieve_similar_episodes(self, current_context: Dict[str, Any], limit: int = 5) -> List[Dict[str, Any]]:
         """Retrieve similar past interactions using semantic search"""
@@ -66,45 +101,159 @@ class AgentMemory:
             }
         }
         
-        return await self._search_episodes(search_query)
+        # Try the local index before the OpenSearch round trip
+        episodes = self.episode_cache.lookup(embedding, k=limit)
+        if episodes is None:
+            episodes = await self._search_episodes(search_query)
+            self.episode_cache.remember(episodes)
+        return episodes
     
     async def update_semantic_memory(self, concept: str, knowledge: Dict[str, Any]) -> None:
-        """Update domain knowledge and learned patterns"""
-        self.semantic_memory.put_item(
-            Item={
-                'concept': concept,
-                'knowledge': knowledge,
-                'confidence': knowledge.get('confidence', 0.8),
-                'last_updated': int(time.time()),
-                'usage_count': knowledge.get('usage_count', 0) + 1
-            }
+        """Update domain knowledge and learned patterns (aggregated, flushed on a timer)"""
+        await self.semantic_usage.record(
+            concept, confidence=knowledge.get('confidence', 0.8), knowledge=knowledge
         )
     
     async def get_semantic_knowledge(self, concept: str) -> Optional[Dict[str, Any]]:
         """Retrieve domain knowledge"""
+        pending = self.semantic_usage.pending_knowledge(concept)
+        if pending is not None:
+            return pending
         response = self.semantic_memory.get_item(
             Key={'concept': concept}
         )
         return response.get('Item', {}).get('knowledge')
     
-    async def consolidate_memory(self) -> None:
-        """Periodic memory consolidation and optimization"""
+    async def flush_semantic_memory(self) -> None:
+        """Send buffered usage counts; call before the invocation ends"""
+        await self.semantic_usage.flush()
+    
+    async def consolidate_memory(self) -> List[Dict[str, Any]]:
+        """Periodic memory consolidation over records changed since the last run"""
         # Move old working memory to episodic
-        await self._consolidate_working_memory()
+        working = await self.consolidation.run(
+            'working-to-episodic', self.working_memory, 'timestamp',
+            self._consolidate_working_memory, min_age=WORKING_MEMORY_IDLE_SECONDS
+        )
         
         # Update semantic patterns from episodic memory
-        await self._extract_semantic_patterns()
+        patterns = await self.consolidation.run(
+            'semantic-patterns', self.episodic_memory, 'timestamp', self._extract_semantic_patterns
+        )
         
         # Archive old episodic memory to S3
-        await self._archive_old_episodes()
+        archive = await self.consolidation.run(
+            'archive-episodes', self.episodic_memory, 'timestamp',
+            self._archive_old_episodes, min_age=EPISODE_RETENTION_SECONDS
+        )
+        return [working, patterns, archive]
     
-    async def _create_embedding(self, text: str) -> List[float]:
-        """Create vector embedding using Bedrock Titan"""
-        bedrock = boto3.client('bedrock-runtime')
+    async def train_document_classifier(self, directory: str) -> int:
+        """Refit the local document classifier on model-labelled episodes and save it
+
+        Agents load it from LOCAL_CLASSIFIER_DIR; returns the number of
+        examples it was trained on.
+        """
+        examples = []
+        async for episode in parallel_scan(
+            self.episodic_memory,
+            FilterExpression='agent_response.classified_by = :model',
+            ExpressionAttributeValues={':model': 'model'}
+        ):
+            examples.extend(examples_from_episodes([episode]))
         
-        response = bedrock.invoke_model(
-            modelId='amazon.titan-embed-text-v1',
-            body=json.dumps({'inputText': text})
-        )
+        classifier = LocalClassifier()
+        trained = await asyncio.to_thread(classifier.fit, examples)
+        if trained:
+            await asyncio.to_thread(classifier.save, directory)
+        return trained
+    
+    async def _consolidate_working_memory(self, sessions: AsyncIterator[Dict[str, Any]]) -> int:
+        """Fold idle session contexts into episodes, archived before they are written"""
+        async def episodes():
+            async for session in sessions:
+                context = session.get('context') or {}
+                yield {
+                    'interaction_id': f"session-{session['session_id']}-{session['timestamp']}",
+                    'timestamp': int(time.time()),
+                    'user_request': context.get('request', ''),
+                    'agent_response': context.get('response', {}),
+                    'outcome': context.get('outcome', 'incomplete'),
+                    'performance_metrics': context.get('metrics', {})
+                }
         
-        return json.loads(response['body'].read())['embedding']
+        written = 0
+        async for batch in _chunks(episodes(), ARCHIVE_BATCH):
+            for episode in batch:
+                episode['archive_segment'] = await self._archive_to_s3(_archive_record(episode))
+            # Items only ever point at segments already in S3
+            await self.flush_archive()
+            written += await write_items(self.episodic_memory, _stream(batch))
+        return written
+    
+    async def _extract_semantic_patterns(self, episodes: AsyncIterator[Dict[str, Any]]) -> Dict[str, int]:
+        """Count new episodes per outcome into the outcome's semantic concept"""
+        outcomes = Counter()
+        async for episode in episodes:
+            outcomes[episode.get('outcome', 'unknown')] += 1
+        
+        for outcome, count in outcomes.items():
+            await self.semantic_usage.record(f'outcome:{outcome}', increment=count)
+        await self.semantic_usage.flush()
+        return dict(outcomes)
+    
+    async def _archive_old_episodes(self, episodes: AsyncIterator[Dict[str, Any]]) -> int:
+        """Remove aged episodes from DynamoDB once an uploaded archive segment holds them"""
+        deleted = 0
+        async for batch in _chunks(episodes, ARCHIVE_BATCH):
+            for episode in batch:
+                if not episode.get('archive_segment'):
+                    # Consolidated before episodes were archived on write; archive it now
+                    await self._archive_to_s3(_archive_record(episode))
+            await self.flush_archive()
+            deleted += await delete_items(
+                self.episodic_memory, _stream([{'interaction_id': e['interaction_id']} for e in batch])
+            )
+        return deleted
+    
+    async def _write_archived_episodes(self) -> None:
+        """Write the stored episodes whose segments have been uploaded since the last call"""
+        uploaded, self.archive.uploaded = self.archive.uploaded, []
+        items = [item for segment_key in uploaded for item in self._pending_episodes.pop(segment_key, [])]
+        if items:
+            await write_items(self.episodic_memory, _stream(items))
+    
+    async def _archive_to_s3(self, interaction: Dict[str, Any]) -> str:
+        """Append to the open archive segment and return its key"""
+        return await self.archive.append(interaction)
+    
+    async def _create_embedding(self, text: str) -> List[float]:
+        """Create vector embedding using Bedrock Titan"""
+        return await self.embeddings.embed(text)
+
+
+def _archive_record(episode: Dict[str, Any]) -> Dict[str, Any]:
+    """An episodic memory item in the shape store_episodic_memory archives"""
+    return {
+        'id': episode['interaction_id'],
+        'request': episode.get('user_request', ''),
+        'response': episode.get('agent_response', {}),
+        'outcome': episode.get('outcome'),
+        'metrics': episode.get('performance_metrics', {})
+    }
+
+
+async def _chunks(items: AsyncIterator[Dict[str, Any]], size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    batch = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _stream(items: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    for item in items:
+        yield item
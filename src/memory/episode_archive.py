@@ -0,0 +1,183 @@
+import asyncio
+import gzip
+import itertools
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+ARCHIVE_PREFIX = 'episodic-archive/'
+SEGMENT_MAX_BYTES = int(os.environ.get('ARCHIVE_SEGMENT_MAX_BYTES', str(16 * 1024 * 1024)))
+# Uncompressed bytes per gzip member; a single-episode read fetches one member
+BLOCK_BYTES = 64 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+def index_key(segment_key: str) -> str:
+    return segment_key[:-len('.jsonl.gz')] + '.index.json'
+
+
+class EpisodeArchiveWriter:
+    """Appends episodes to size-bounded gzip JSONL segments in S3
+
+    A segment is a run of gzip members of about BLOCK_BYTES each, which
+    concatenate into one valid gzip stream for bulk reads. The sidecar
+    index maps each episode id to the byte range of its member, so a single
+    episode comes back with one ranged GET. Segments are uploaded when they
+    reach max_bytes and on flush(); their keys collect in `uploaded` until
+    the caller takes them, so it can commit whatever points at them. A
+    sealed segment is kept until both of its puts succeed, and every
+    flush() retries the ones still waiting.
+    """
+
+    def __init__(self, s3, bucket: str, prefix: str = ARCHIVE_PREFIX,
+                 max_bytes: int = SEGMENT_MAX_BYTES, block_bytes: int = BLOCK_BYTES):
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.block_bytes = block_bytes
+        self.segments_written = 0
+        self.uploaded: List[str] = []
+        # Sealed segments not yet in S3: (key, blocks, index), oldest first
+        self._sealed: List[Tuple[str, List[bytes], Dict[str, Tuple[int, int]]]] = []
+        self._new_segment()
+
+    async def append(self, episode: Dict[str, Any]) -> str:
+        """Buffer one episode and return the key of the segment that will hold it"""
+        line = json.dumps(episode, default=str, separators=(',', ':')).encode('utf-8') + b'\n'
+        self._lines.append(line)
+        self._line_ids.append(str(episode['id']))
+        self._line_bytes += len(line)
+        segment_key = self._segment_key
+        if self._line_bytes >= self.block_bytes:
+            self._seal_block()
+            if self._offset >= self.max_bytes:
+                self._seal_segment()
+                try:
+                    await self._upload_sealed()
+                except Exception:
+                    # The segment stays sealed; the caller's flush() retries it
+                    logger.warning('Archive segment upload failed; retrying on flush', exc_info=True)
+        return segment_key
+
+    async def flush(self) -> Optional[str]:
+        """Upload the open segment and any earlier ones still waiting; key of the last uploaded"""
+        self._seal_block()
+        self._seal_segment()
+        return await self._upload_sealed()
+
+    def _seal_segment(self) -> None:
+        if self._blocks:
+            self._sealed.append((self._segment_key, self._blocks, self._index))
+            self._new_segment()
+
+    async def _upload_sealed(self) -> Optional[str]:
+        uploaded = None
+        while self._sealed:
+            sealed = self._sealed[0]
+            segment_key, blocks, index = sealed
+            await asyncio.to_thread(
+                self.s3.put_object, Bucket=self.bucket, Key=segment_key, Body=b''.join(blocks),
+                ContentType='application/gzip'
+            )
+            # The index goes last: a segment is only readable once it is complete
+            await asyncio.to_thread(
+                self.s3.put_object, Bucket=self.bucket, Key=index_key(segment_key),
+                Body=json.dumps({'episodes': index}).encode('utf-8'), ContentType='application/json'
+            )
+            # A concurrent flush may have uploaded the same segment meanwhile
+            if self._sealed and self._sealed[0] is sealed:
+                self._sealed.pop(0)
+                self.segments_written += 1
+                self.uploaded.append(segment_key)
+            uploaded = segment_key
+        return uploaded
+
+    def _new_segment(self) -> None:
+        self._segment_key = f"{self.prefix}{time.strftime('%Y/%m/%d', time.gmtime())}/{uuid.uuid4().hex}.jsonl.gz"
+        self._blocks: List[bytes] = []
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._offset = 0
+        self._lines: List[bytes] = []
+        self._line_ids: List[str] = []
+        self._line_bytes = 0
+
+    def _seal_block(self) -> None:
+        if not self._lines:
+            return
+        block = gzip.compress(b''.join(self._lines), mtime=0)
+        for episode_id in self._line_ids:
+            self._index[episode_id] = (self._offset, len(block))
+        self._blocks.append(block)
+        self._offset += len(block)
+        self._lines, self._line_ids, self._line_bytes = [], [], 0
+
+
+class EpisodeArchiveReader:
+    """Point reads through the sidecar index and streaming reads of whole segments"""
+
+    def __init__(self, s3, bucket: str, prefix: str = ARCHIVE_PREFIX, cached_indexes: int = 64):
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix
+        self.cached_indexes = cached_indexes
+        self._indexes: 'OrderedDict[str, Dict[str, List[int]]]' = OrderedDict()
+
+    async def get(self, segment_key: str, episode_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch one episode with a ranged GET of its gzip member"""
+        index = await self._index(segment_key)
+        if episode_id not in index:
+            return None
+        offset, length = index[episode_id]
+        response = await asyncio.to_thread(
+            self.s3.get_object, Bucket=self.bucket, Key=segment_key,
+            Range=f'bytes={offset}-{offset + length - 1}'
+        )
+        block = await asyncio.to_thread(response['Body'].read)
+        for line in gzip.decompress(block).splitlines():
+            episode = json.loads(line)
+            if str(episode['id']) == episode_id:
+                return episode
+        return None
+
+    async def iter_segment(self, segment_key: str, batch: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        """Stream every episode in a segment without holding it in memory"""
+        response = await asyncio.to_thread(self.s3.get_object, Bucket=self.bucket, Key=segment_key)
+        lines = gzip.GzipFile(fileobj=response['Body'])
+        while True:
+            chunk = await asyncio.to_thread(list, itertools.islice(lines, batch))
+            if not chunk:
+                return
+            for line in chunk:
+                yield json.loads(line)
+
+    async def iter_segments(self, prefix: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Stream every episode under a prefix (for example one day), segment by segment"""
+        paginator = self.s3.get_paginator('list_objects_v2')
+        pages = iter(paginator.paginate(Bucket=self.bucket, Prefix=prefix or self.prefix))
+        while True:
+            page = await asyncio.to_thread(next, pages, None)
+            if page is None:
+                return
+            for entry in page.get('Contents', []):
+                if entry['Key'].endswith('.jsonl.gz'):
+                    async for episode in self.iter_segment(entry['Key']):
+                        yield episode
+
+    async def _index(self, segment_key: str) -> Dict[str, List[int]]:
+        if segment_key in self._indexes:
+            self._indexes.move_to_end(segment_key)
+            return self._indexes[segment_key]
+        response = await asyncio.to_thread(
+            self.s3.get_object, Bucket=self.bucket, Key=index_key(segment_key)
+        )
+        index = json.loads(await asyncio.to_thread(response['Body'].read))['episodes']
+        self._indexes[segment_key] = index
+        if len(self._indexes) > self.cached_indexes:
+            self._indexes.popitem(last=False)
+        return index
@@ -0,0 +1,141 @@
+import asyncio
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+
+CONSOLIDATION_SEGMENTS = int(os.environ.get('CONSOLIDATION_SEGMENTS', '4'))
+SCAN_PAGE_SIZE = 500
+# Writers' clocks and in-flight writes may trail the run start by a little
+CLOCK_SKEW_SECONDS = 5
+_DONE = object()
+
+
+async def parallel_scan(table, total_segments: int = CONSOLIDATION_SEGMENTS,
+                        page_size: int = SCAN_PAGE_SIZE, **scan_kwargs) -> AsyncIterator[Dict[str, Any]]:
+    """Stream a table through Segment/TotalSegments workers, one page at a time
+
+    At most two pages per segment are held in memory; a slow consumer
+    pauses the workers rather than letting pages pile up.
+    """
+    pages: asyncio.Queue = asyncio.Queue(maxsize=2 * total_segments)
+
+    async def scan_segment(segment: int) -> None:
+        kwargs = dict(scan_kwargs, Segment=segment, TotalSegments=total_segments, Limit=page_size)
+        while True:
+            page = await asyncio.to_thread(table.scan, **kwargs)
+            await pages.put(page.get('Items', []))
+            if 'LastEvaluatedKey' not in page:
+                return
+            kwargs['ExclusiveStartKey'] = page['LastEvaluatedKey']
+
+    async def scan_all() -> None:
+        try:
+            await asyncio.gather(*(scan_segment(segment) for segment in range(total_segments)))
+        except Exception as e:
+            await pages.put(e)
+        else:
+            await pages.put(_DONE)
+
+    producer = asyncio.get_running_loop().create_task(scan_all())
+    try:
+        while True:
+            page = await pages.get()
+            if page is _DONE:
+                return
+            if isinstance(page, Exception):
+                raise page
+            for item in page:
+                yield item
+    finally:
+        producer.cancel()
+
+
+async def write_items(table, items: AsyncIterator[Dict[str, Any]], batch_size: int = 25) -> int:
+    """Put a stream of items with BatchWriteItem, batch_size at a time"""
+    return await _batched(table, items, batch_size, lambda writer, item: writer.put_item(Item=item))
+
+
+async def delete_items(table, keys: AsyncIterator[Dict[str, Any]], batch_size: int = 25) -> int:
+    """Delete a stream of keys with BatchWriteItem, batch_size at a time"""
+    return await _batched(table, keys, batch_size, lambda writer, key: writer.delete_item(Key=key))
+
+
+async def _batched(table, stream: AsyncIterator[Dict[str, Any]], batch_size: int,
+                   request: Callable[[Any, Dict[str, Any]], None]) -> int:
+    def send(batch: List[Dict[str, Any]]) -> None:
+        # batch_writer resends unprocessed items itself
+        with table.batch_writer() as writer:
+            for entry in batch:
+                request(writer, entry)
+
+    count = 0
+    batch: List[Dict[str, Any]] = []
+    async for entry in stream:
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            await asyncio.to_thread(send, batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        await asyncio.to_thread(send, batch)
+        count += len(batch)
+    return count
+
+
+class CheckpointStore:
+    """High-water marks per consolidation pass, one item each"""
+
+    def __init__(self, table):
+        self.table = table
+
+    def get(self, name: str) -> int:
+        item = self.table.get_item(Key={'checkpoint_id': name}).get('Item')
+        return int(item['high_water_mark']) if item else 0
+
+    def put(self, name: str, high_water_mark: int) -> None:
+        self.table.put_item(Item={
+            'checkpoint_id': name,
+            'high_water_mark': high_water_mark,
+            'updated_at': int(time.time())
+        })
+
+
+class ConsolidationEngine:
+    """Incremental consolidation passes over parallel table scans
+
+    Each pass handles only records whose timestamp attribute moved past the
+    pass's high-water mark since its last successful run, and reached
+    min_age seconds. The filter runs server side, so only those records are
+    transferred; the scan itself still reads every item. Records stream
+    through the pass's pipeline as they arrive. The mark advances only when
+    the whole pass succeeds, so a failed run is retried from the same point.
+    """
+
+    def __init__(self, checkpoints: CheckpointStore, total_segments: int = CONSOLIDATION_SEGMENTS):
+        self.checkpoints = checkpoints
+        self.total_segments = total_segments
+
+    async def run(self, name: str, table, timestamp_attribute: str,
+                  pipeline: Callable[[AsyncIterator[Dict[str, Any]]], Awaitable[Any]],
+                  min_age: int = 0) -> Dict[str, Any]:
+        low = await asyncio.to_thread(self.checkpoints.get, name)
+        high = int(time.time()) - max(min_age, CLOCK_SKEW_SECONDS)
+        if high <= low:
+            return {'pass': name, 'records': 0, 'result': None}
+
+        records = 0
+
+        async def changed() -> AsyncIterator[Dict[str, Any]]:
+            nonlocal records
+            async for item in parallel_scan(
+                table, self.total_segments,
+                FilterExpression='#ts > :low AND #ts <= :high',
+                ExpressionAttributeNames={'#ts': timestamp_attribute},
+                ExpressionAttributeValues={':low': low, ':high': high}
+            ):
+                records += 1
+                yield item
+
+        result = await pipeline(changed())
+        await asyncio.to_thread(self.checkpoints.put, name, high)
+        return {'pass': name, 'records': records, 'result': result}
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import os
+import time
+import weakref
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set
+
+SEMANTIC_FLUSH_INTERVAL = float(os.environ.get('SEMANTIC_FLUSH_INTERVAL', '5'))
+
+
+@dataclass
+class _Pending:
+    usage: int = 0
+    confidence: Optional[Decimal] = None
+    knowledge: Optional[Dict[str, Any]] = None
+    last_updated: int = 0
+
+
+class SemanticUsageBuffer:
+    """Aggregates semantic-memory touches per concept between flushes
+
+    Usage increments add up and the latest confidence and knowledge win, so
+    a hot concept costs one small UpdateItem (ADD usage_count, SET the rest)
+    per flush_interval however often it is used. ADD is applied atomically
+    by DynamoDB, so concurrent processes never lose each other's counts. A
+    failed update goes back into the buffer for the next flush; if the
+    failure came after DynamoDB applied it, the increment counts twice.
+    """
+
+    def __init__(self, table, flush_interval: float = SEMANTIC_FLUSH_INTERVAL):
+        self.table = table
+        self.flush_interval = flush_interval
+        self.updates_sent = 0
+        self._pending: Dict[str, _Pending] = {}
+        # Timers belong to one loop, and each warm invocation runs its own
+        self._timers = weakref.WeakKeyDictionary()
+        self._flushes: Set[asyncio.Task] = set()
+        self._failures: List[BaseException] = []
+
+    async def record(self, concept: str, increment: int = 1, confidence: Optional[float] = None,
+                     knowledge: Optional[Dict[str, Any]] = None) -> None:
+        """Buffer one use of a concept; never waits on DynamoDB"""
+        pending = self._pending.setdefault(concept, _Pending())
+        pending.usage += increment
+        if confidence is not None:
+            pending.confidence = Decimal(str(confidence))
+        if knowledge is not None:
+            # The resource layer rejects floats, so numbers become Decimals
+            pending.knowledge = json.loads(json.dumps(knowledge, default=str), parse_float=Decimal)
+        pending.last_updated = int(time.time())
+        self._schedule_flush()
+
+    def pending_knowledge(self, concept: str) -> Optional[Dict[str, Any]]:
+        """Knowledge recorded here but not yet flushed, for read-your-writes"""
+        pending = self._pending.get(concept)
+        return pending.knowledge if pending else None
+
+    async def flush(self) -> None:
+        """Send everything buffered so far and wait for in-flight updates"""
+        self._start_flush()
+        while self._flushes:
+            await asyncio.gather(*list(self._flushes), return_exceptions=True)
+        if self._failures:
+            failures, self._failures = self._failures, []
+            raise failures[0]
+
+    async def close(self) -> None:
+        """Flush before the handler returns"""
+        await self.flush()
+
+    def _schedule_flush(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop not in self._timers:
+            self._timers[loop] = loop.call_later(self.flush_interval, self._start_flush)
+
+    def _start_flush(self) -> None:
+        timer = self._timers.pop(asyncio.get_running_loop(), None)
+        if timer is not None:
+            timer.cancel()
+        pending, self._pending = self._pending, {}
+        for concept, update in pending.items():
+            task = asyncio.get_running_loop().create_task(self._update(concept, update))
+            self._flushes.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._flushes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self._failures.append(task.exception())
+
+    async def _update(self, concept: str, update: _Pending) -> None:
+        assignments = ['last_updated = :last_updated']
+        values: Dict[str, Any] = {':usage': update.usage, ':last_updated': update.last_updated}
+        if update.confidence is not None:
+            assignments.append('confidence = :confidence')
+            values[':confidence'] = update.confidence
+        if update.knowledge is not None:
+            assignments.append('knowledge = :knowledge')
+            values[':knowledge'] = update.knowledge
+        try:
+            await asyncio.to_thread(
+                self.table.update_item,
+                Key={'concept': concept},
+                UpdateExpression=f"ADD usage_count :usage SET {', '.join(assignments)}",
+                ExpressionAttributeValues=values
+            )
+        except Exception:
+            self._requeue(concept, update)
+            raise
+        self.updates_sent += 1
+
+    def _requeue(self, concept: str, update: _Pending) -> None:
+        pending = self._pending.setdefault(concept, _Pending())
+        pending.usage += update.usage
+        # Anything recorded since the failed flush is newer
+        if pending.confidence is None:
+            pending.confidence = update.confidence
+        if pending.knowledge is None:
+            pending.knowledge = update.knowledge
+        pending.last_updated = max(pending.last_updated, update.last_updated)
+        self._schedule_flush()
+
+
+_shared_buffer: Optional[SemanticUsageBuffer] = None
+
+
+def get_semantic_usage_buffer(table) -> SemanticUsageBuffer:
+    """Return the process-wide buffer, so every AgentMemory aggregates into it"""
+    global _shared_buffer
+    if _shared_buffer is None:
+        _shared_buffer = SemanticUsageBuffer(table)
+    return _shared_buffer
@@ -0,0 +1,198 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+WORKING_MEMORY_TTL = 3600
+WORKING_MEMORY_CACHE_SIZE = int(os.environ.get('WORKING_MEMORY_CACHE_SIZE', '1024'))
+# Cached copies older than this are checked against the stored version before use
+WORKING_MEMORY_REVALIDATE_SECONDS = float(os.environ.get('WORKING_MEMORY_REVALIDATE_SECONDS', '5'))
+# Attempts for a write that was not based on a read, each against the latest stored version
+BLIND_WRITE_ATTEMPTS = 3
+
+
+class WorkingMemoryConflictError(Exception):
+    """Raised when another writer updated a session since it was cached"""
+
+    def __init__(self, session_ids: List[str]):
+        super().__init__(f"Working memory changed elsewhere for sessions: {', '.join(session_ids)}")
+        self.session_ids = session_ids
+
+
+@dataclass
+class _Session:
+    context: Optional[Dict[str, Any]]
+    version: int
+    expires_at: float
+    checked_at: float = 0.0
+    dirty: bool = False
+    # Written without being read first, so it replaces whatever is stored
+    blind: bool = False
+
+
+class WorkingMemoryCache:
+    """Read-through, write-behind cache of working memory per session
+
+    Reads come from memory for revalidate_after seconds after the copy was
+    read or written; past that a version-only get_item confirms the copy is
+    still current before it is served. Writes only update the cached copy;
+    flush() writes each changed session once with a put_item conditional on
+    the version read, so repeated writes within a workflow step cost one
+    round trip. A failed condition means another process wrote the
+    session: the cached copy is dropped and the next read goes back to
+    DynamoDB. A put for a session that was never read is a plain
+    overwrite, retried against the stored version. Least recently used
+    clean sessions are evicted past max_sessions; unflushed ones stay until
+    they are written.
+    """
+
+    def __init__(self, table, max_sessions: int = WORKING_MEMORY_CACHE_SIZE, ttl: int = WORKING_MEMORY_TTL,
+                 revalidate_after: float = WORKING_MEMORY_REVALIDATE_SECONDS):
+        self.table = table
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.revalidate_after = revalidate_after
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.writes = 0
+        self._sessions: 'OrderedDict[str, _Session]' = OrderedDict()
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        session = self._sessions.get(session_id)
+        if session is not None and (session.dirty or await self._current(session_id, session)):
+            self._sessions.move_to_end(session_id)
+            self.hits += 1
+            return session.context
+
+        self.misses += 1
+        response = await asyncio.to_thread(self.table.get_item, Key={'session_id': session_id})
+        item = response.get('Item')
+        # The write must be conditioned on a stored version even if the item has expired
+        version = int(item.get('version', 0)) if item else 0
+        # DynamoDB deletes expired items lazily, so check the TTL ourselves
+        if item and int(item.get('ttl', 0)) <= time.time():
+            item = None
+        self._remember(session_id, _Session(
+            context=item.get('context') if item else None,
+            version=version,
+            expires_at=int(item['ttl']) if item else time.time() + self.ttl,
+            checked_at=time.time()
+        ))
+        return item.get('context') if item else None
+
+    def put(self, session_id: str, context: Dict[str, Any]) -> None:
+        """Update the cached session; it reaches DynamoDB on the next flush()"""
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = _Session(context=None, version=0, expires_at=0, blind=True)
+        session.context = context
+        session.expires_at = time.time() + self.ttl
+        session.dirty = True
+        self._remember(session_id, session)
+
+    async def flush(self) -> None:
+        """Write every changed session once; call at workflow step boundaries"""
+        dirty = [(session_id, session) for session_id, session in self._sessions.items() if session.dirty]
+        results = await asyncio.gather(
+            *(self._write(session_id, session) for session_id, session in dirty),
+            return_exceptions=True
+        )
+        conflicts = []
+        for (session_id, _), result in zip(dirty, results):
+            if isinstance(result, self.table.meta.client.exceptions.ConditionalCheckFailedException):
+                self._sessions.pop(session_id, None)
+                conflicts.append(session_id)
+            elif isinstance(result, BaseException):
+                raise result
+        self._evict()
+        if conflicts:
+            raise WorkingMemoryConflictError(conflicts)
+
+    async def _current(self, session_id: str, session: _Session) -> bool:
+        """Whether a clean cached copy may be served, checking its version once it is stale"""
+        now = time.time()
+        if session.expires_at <= now:
+            return False
+        if now - session.checked_at < self.revalidate_after:
+            return True
+        self.revalidations += 1
+        if await self._stored_version(session_id) != session.version:
+            return False
+        session.checked_at = now
+        return True
+
+    async def _stored_version(self, session_id: str) -> int:
+        response = await asyncio.to_thread(
+            self.table.get_item,
+            Key={'session_id': session_id},
+            ProjectionExpression='version'
+        )
+        return int(response.get('Item', {}).get('version', 0))
+
+    async def _write(self, session_id: str, session: _Session) -> None:
+        conflict = self.table.meta.client.exceptions.ConditionalCheckFailedException
+        # A put() while the write is in flight marks the session dirty again
+        session.dirty = False
+        try:
+            for attempt in range(BLIND_WRITE_ATTEMPTS):
+                try:
+                    await self._put(session_id, session)
+                    break
+                except conflict:
+                    if not session.blind or attempt == BLIND_WRITE_ATTEMPTS - 1:
+                        raise
+                    session.version = await self._stored_version(session_id)
+        except BaseException:
+            session.dirty = True
+            raise
+        self.writes += 1
+        session.version += 1
+        session.checked_at = time.time()
+        session.blind = False
+
+    async def _put(self, session_id: str, session: _Session) -> None:
+        if session.version == 0:
+            # No versioned item was seen, so none may exist yet
+            condition = {'ConditionExpression': 'attribute_not_exists(version)'}
+        else:
+            condition = {'ConditionExpression': 'version = :version',
+                         'ExpressionAttributeValues': {':version': session.version}}
+        await asyncio.to_thread(
+            self.table.put_item,
+            Item={
+                'session_id': session_id,
+                'timestamp': int(time.time()),
+                'context': session.context,
+                'version': session.version + 1,
+                'ttl': int(session.expires_at)
+            },
+            **condition
+        )
+
+    def _remember(self, session_id: str, session: _Session) -> None:
+        self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        self._evict()
+
+    def _evict(self) -> None:
+        excess = len(self._sessions) - self.max_sessions
+        for session_id in list(self._sessions):
+            if excess <= 0:
+                break
+            if not self._sessions[session_id].dirty:
+                del self._sessions[session_id]
+                excess -= 1
+
+
+_working_memory_cache: Optional[WorkingMemoryCache] = None
+
+
+def get_working_memory_cache(table) -> WorkingMemoryCache:
+    """Return the process-wide working memory cache, kept across warm invocations"""
+    global _working_memory_cache
+    if _working_memory_cache is None:
+        _working_memory_cache = WorkingMemoryCache(table)
+    return _working_memory_cache